@@ -1,15 +1,18 @@
 import os
-import csv
 from datetime import datetime
 from src.ErrorCounter import ErrorCounter
+from src.ExporterTypes import KOINLY_FIELDS
+from src.formatters import Column, columns_from_fields, compile_formatter
+from src.writers import OUTPUT_CSV, open_writer
 
 # Initialize the error counter
 error_counter = ErrorCounter()
 
 class Exporter:
-    def __init__(self, wallet_address, transactions):
+    def __init__(self, wallet_address, transactions, output=OUTPUT_CSV):
         self.wallet_address = wallet_address
         self.transactions = transactions
+        self.output = output
 
     def export(self, export_format):
         """
@@ -27,36 +30,29 @@ class Exporter:
 
     def _export_to_koinly(self):
         file_path = os.path.join("reports", f"voi_{self.wallet_address}_koinly.csv")
-        self._write_csv(file_path, [
-            "Date", "Sent Amount", "Sent Currency", "Received Amount", 
-            "Received Currency", "Fee Amount", "Fee Currency", 
-            "Net Worth Amount", "Net Worth Currency", "Label", 
-            "Description", "TxHash"
-        ], self._format_koinly_row)
-        print(f"Koinly CSV exported to {file_path}")
+        file_path = self._write_csv(file_path, self._format_koinly_row.header, self._format_koinly_row)
+        if file_path:
+            print(f"Koinly CSV exported to {file_path}")
 
     def _export_to_cryptotax(self):
         file_path = os.path.join("reports", f"voi_{self.wallet_address}_cryptotax.csv")
-        self._write_csv(file_path, [
-            "Date", "Transaction Type", "Base Currency", "Base Amount", 
-            "Quote Currency", "Quote Amount", "Fee Currency", "Fee Amount"
-        ], self._format_cryptotax_row)
-        print(f"Cryptotax CSV exported to {file_path}")
+        file_path = self._write_csv(file_path, self._format_cryptotax_row.header, self._format_cryptotax_row)
+        if file_path:
+            print(f"Cryptotax CSV exported to {file_path}")
 
     def _export_to_other(self):
         file_path = os.path.join("reports", f"voi_{self.wallet_address}_other_format.csv")
-        self._write_csv(file_path, [
-            "Date", "Transaction Type", "Currency", "Amount", "Fee", "TxHash"
-        ], self._format_other_row)
-        print(f"Other Format CSV exported to {file_path}")
+        file_path = self._write_csv(file_path, self._format_other_row.header, self._format_other_row)
+        if file_path:
+            print(f"Other Format CSV exported to {file_path}")
 
     def _write_csv(self, file_path, header, row_formatter):
         """
-        Generic method to write transactions to a CSV file.
+        Generic method to write transactions to a CSV file (or the output type set on
+        the exporter). Returns the path written, or None if the file could not be written.
         """
         try:
-            with open(file_path, mode="w", newline="") as csv_file:
-                writer = csv.writer(csv_file)
+            with open_writer(file_path, self.output) as writer:
                 writer.writerow(header)
                 for tx in self.transactions:
                     try:
@@ -65,49 +61,14 @@ class Exporter:
                     except KeyError as e:
                         error_counter.increment("ROW_FORMAT_ERROR")
                         print(f"Error formatting row: {e}")
+            return writer.path
         except Exception as e:
             error_counter.increment("FILE_WRITE_ERROR")
             print(f"Error writing CSV file: {e}")
+            return None
 
-    def _format_koinly_row(self, tx):
-        return [
-            self._format_date(tx.get("timestamp")),
-            tx.get("sent_amount", ""),
-            tx.get("sent_currency", "VOI"),
-            tx.get("received_amount", ""),
-            tx.get("received_currency", "VOI"),
-            tx.get("fee", ""),
-            tx.get("fee_currency", "VOI"),
-            tx.get("net_worth_amount", ""),
-            tx.get("net_worth_currency", ""),
-            tx.get("label", ""),
-            tx.get("description", "VOI transaction"),
-            tx.get("tx_hash", "")
-        ]
-
-    def _format_cryptotax_row(self, tx):
-        return [
-            self._format_date(tx.get("timestamp")),
-            tx.get("transaction_type", "transfer"),
-            tx.get("base_currency", "VOI"),
-            tx.get("base_amount", ""),
-            tx.get("quote_currency", ""),
-            tx.get("quote_amount", ""),
-            tx.get("fee_currency", "VOI"),
-            tx.get("fee", "")
-        ]
-
-    def _format_other_row(self, tx):
-        return [
-            self._format_date(tx.get("timestamp")),
-            tx.get("transaction_type", "transfer"),
-            tx.get("currency", "VOI"),
-            tx.get("amount", ""),
-            tx.get("fee", ""),
-            tx.get("tx_hash", "")
-        ]
-
-    def _format_date(self, timestamp):
+    @staticmethod
+    def _format_date(timestamp):
         """
         Format timestamp to ISO 8601 date string.
         """
@@ -117,6 +78,42 @@ class Exporter:
             error_counter.increment("DATE_FORMAT_ERROR")
             return "Invalid Date"
 
+    # Row formatters compiled from column specs (see formatters.py)
+    _format_koinly_row = staticmethod(compile_formatter(columns_from_fields(KOINLY_FIELDS, {
+        "Date": Column("", "timestamp", None, _format_date.__func__),
+        "Sent Amount": "sent_amount",
+        "Sent Currency": Column("", "sent_currency", "VOI"),
+        "Received Amount": "received_amount",
+        "Received Currency": Column("", "received_currency", "VOI"),
+        "Fee Amount": "fee",
+        "Fee Currency": Column("", "fee_currency", "VOI"),
+        "Net Worth Amount": "net_worth_amount",
+        "Net Worth Currency": "net_worth_currency",
+        "Label": "label",
+        "Description": Column("", "description", "VOI transaction"),
+        "TxHash": "tx_hash",
+    }), "format_koinly_row"))
+
+    _format_cryptotax_row = staticmethod(compile_formatter([
+        Column("Date", "timestamp", None, _format_date.__func__),
+        Column("Transaction Type", "transaction_type", "transfer"),
+        Column("Base Currency", "base_currency", "VOI"),
+        Column("Base Amount", "base_amount"),
+        Column("Quote Currency", "quote_currency"),
+        Column("Quote Amount", "quote_amount"),
+        Column("Fee Currency", "fee_currency", "VOI"),
+        Column("Fee Amount", "fee"),
+    ], "format_cryptotax_row"))
+
+    _format_other_row = staticmethod(compile_formatter([
+        Column("Date", "timestamp", None, _format_date.__func__),
+        Column("Transaction Type", "transaction_type", "transfer"),
+        Column("Currency", "currency", "VOI"),
+        Column("Amount", "amount"),
+        Column("Fee", "fee"),
+        Column("TxHash", "tx_hash"),
+    ], "format_other_row"))
+
 
 def ensure_reports_directory():
     """
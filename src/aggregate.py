@@ -0,0 +1,77 @@
+from ExporterTypes import TX_TYPE_INCOME, TX_TYPE_STAKING
+
+# Aggregation windows in seconds
+WINDOWS = {
+    "hour": 3600,
+    "day": 86400,
+    "week": 7 * 86400,
+}
+
+AGGREGATED_TX_TYPES = (TX_TYPE_STAKING, TX_TYPE_INCOME)
+
+
+class RewardAggregator:
+    """
+    Streaming group-by that merges reward rows per (tx_type, asset) per time window.
+
+    Rows must arrive in time order (ascending or descending, as the indexer returns
+    them). Non-reward rows pass straight through; open buckets are emitted before the
+    first row of any kind from another window, so the output keeps the input's time
+    order across windows and memory holds at most one window of rewards.
+    Each bucket becomes one row whose amount is summed in base units; its txids are
+    kept in `txids` under the bucket id referenced from the row's description.
+    """
+    def __init__(self, window=WINDOWS["day"], tx_types=AGGREGATED_TX_TYPES):
+        self.window = window
+        self.tx_types = frozenset(tx_types)
+        self.txids = {}
+        self.rows_in = 0
+        self.rows_out = 0
+
+    def aggregate(self, rows):
+        buckets = {}
+        current_window = None
+        for row in rows:
+            self.rows_in += 1
+            row_window = row["timestamp"] // self.window
+            if row_window != current_window:
+                yield from self._flush(buckets)
+                current_window = row_window
+            if row["tx_type"] not in self.tx_types:
+                self.rows_out += 1
+                yield row
+                continue
+
+            key = (row["tx_type"], row["asset_id"])
+            bucket = buckets.get(key)
+            if bucket is None:
+                buckets[key] = [row, row["raw_amount"], [row["tx_hash"]]]
+            else:
+                bucket[1] += row["raw_amount"]
+                bucket[2].append(row["tx_hash"])
+                # Keep the latest reward as the template so the row is dated at the end of the bucket
+                if row["timestamp"] > bucket[0]["timestamp"]:
+                    bucket[0] = row
+        yield from self._flush(buckets)
+
+    def _flush(self, buckets):
+        for (tx_type, asset_id), (template, raw_amount, txids) in buckets.items():
+            self.rows_out += 1
+            if len(txids) == 1:
+                yield template
+                continue
+            bucket_start = template["timestamp"] // self.window * self.window
+            bucket_id = f"{tx_type}-{asset_id}-{bucket_start}"
+            self.txids[bucket_id] = txids
+            row = dict(template)
+            row["received_amount"] = raw_amount / 10 ** template["decimals"]
+            row["raw_amount"] = raw_amount
+            # Rewards are paid by the distributor; the wallet pays no fee on them
+            row["fee"] = ""
+            row["tx_hash"] = txids[0]
+            row["description"] = f"{len(txids)} {tx_type.lower()} rewards in {template['currency']} (txids: {bucket_id})"
+            yield row
+        buckets.clear()
+
+    def compression_ratio(self):
+        return self.rows_in / self.rows_out if self.rows_out else 1.0
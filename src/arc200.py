@@ -0,0 +1,224 @@
+import argparse
+import base64
+import hashlib
+import time
+from collections import namedtuple
+from functools import lru_cache
+
+STANDARD_ARC200 = "arc200"
+STANDARD_ARC72 = "arc72"
+
+# ARC-28 event signatures of the ARC-200 (fungible) and ARC-72 (NFT) standards
+EVENT_SIGNATURES = [
+    (STANDARD_ARC200, "arc200_Transfer(address,address,uint256)", ["from", "to", "value"]),
+    (STANDARD_ARC200, "arc200_Approval(address,address,uint256)", ["owner", "spender", "value"]),
+    (STANDARD_ARC72, "arc72_Transfer(address,address,uint256)", ["from", "to", "token_id"]),
+    (STANDARD_ARC72, "arc72_Approval(address,address,uint256)", ["owner", "approved", "token_id"]),
+    (STANDARD_ARC72, "arc72_ApprovalForAll(address,address,bool)", ["owner", "operator", "approved"]),
+]
+
+TRANSFER_EVENTS = {"arc200_Transfer", "arc72_Transfer"}
+
+# A decoded event; `values` maps the argument names above to Python values
+LogEvent = namedtuple("LogEvent", ["app_id", "standard", "name", "values"])
+
+EventSpec = namedtuple("EventSpec", ["standard", "name", "arg_names", "decoders", "size"])
+
+
+def sha512_256(data):
+    return hashlib.new("sha512_256", data).digest()
+
+
+@lru_cache(maxsize=65536)
+def encode_address(public_key):
+    """
+    Encode a 32-byte public key as an Algorand/VOI address (base32 with a 4-byte checksum).
+    """
+    return base64.b32encode(public_key + sha512_256(public_key)[-4:]).decode().rstrip("=")
+
+
+ZERO_ADDRESS = encode_address(bytes(32))
+
+
+def _decode_uint(data):
+    return int.from_bytes(data, "big")
+
+
+def _decode_bool(data):
+    return data[0] & 0x80 != 0
+
+
+# ABI static types: (byte size, decoder)
+ABI_TYPES = {
+    "address": (32, encode_address),
+    "uint64": (8, _decode_uint),
+    "uint256": (32, _decode_uint),
+    "bool": (1, _decode_bool),
+}
+
+
+def event_selector(signature):
+    """
+    ARC-28 selector: the first 4 bytes of SHA-512/256 of the event signature.
+    """
+    return sha512_256(signature.encode())[:4]
+
+
+def _event_spec(standard, signature, arg_names):
+    name, _, args = signature.partition("(")
+    types = args.rstrip(")").split(",")
+    decoders = []
+    offset = 4
+    for abi_type in types:
+        size, decode = ABI_TYPES[abi_type]
+        decoders.append((offset, offset + size, decode))
+        offset += size
+    return EventSpec(standard, name, tuple(arg_names), tuple(decoders), offset)
+
+
+# Selector -> EventSpec, computed once; a log is matched with one dict lookup on its first 4 bytes
+EVENTS = {event_selector(signature): _event_spec(standard, signature, arg_names)
+          for standard, signature, arg_names in EVENT_SIGNATURES}
+# Transfer events, whose first two arguments are the from and to addresses
+TRANSFER_SPECS = {selector: spec for selector, spec in EVENTS.items() if spec.name in TRANSFER_EVENTS}
+
+
+def decode_log(app_id, log, names=None):
+    """
+    Decode one base64 application log into a LogEvent, or None if it is not a known
+    event (or not one of `names`, if given).
+    """
+    try:
+        data = base64.b64decode(log)
+    except ValueError:
+        return None
+    spec = EVENTS.get(data[:4])
+    if spec is None or len(data) != spec.size or (names is not None and spec.name not in names):
+        return None
+    values = {name: decode(data[start:end]) for name, (start, end, decode) in zip(spec.arg_names, spec.decoders)}
+    return LogEvent(app_id, spec.standard, spec.name, values)
+
+
+def _app_id(tx):
+    app = tx.get("application-transaction", {})
+    return app.get("application-id") or tx.get("created-application-index")
+
+
+def logged_app_ids(tx):
+    """
+    Yield the ids of the applications that logged in a transaction or its inner transactions.
+    """
+    if tx.get("logs"):
+        yield _app_id(tx)
+    for inner in tx.get("inner-txns", ()):
+        yield from logged_app_ids(inner)
+
+
+def iter_events(tx, names=None):
+    """
+    Yield the known events (of `names`, if given) logged by a transaction and its inner
+    transactions, in execution order.
+    """
+    logs = tx.get("logs")
+    if logs:
+        app_id = _app_id(tx)
+        for log in logs:
+            event = decode_log(app_id, log, names)
+            if event is not None:
+                yield event
+    for inner in tx.get("inner-txns", ()):
+        yield from iter_events(inner, names)
+
+
+def transfer_events(tx, wallet_address):
+    """
+    Yield the ARC-200/ARC-72 Transfer events of a transaction that move tokens to or from the wallet.
+
+    Mints are transfers from ZERO_ADDRESS. The wallet is compared as a raw public key
+    before decoding, so unrelated transfers cost a base64 decode and two slice compares.
+    """
+    wallet_key = decode_address(wallet_address)
+    yield from _transfer_events(tx, wallet_key)
+
+
+def _transfer_events(tx, wallet_key):
+    logs = tx.get("logs")
+    if logs:
+        app_id = None
+        for log in logs:
+            try:
+                data = base64.b64decode(log)
+            except ValueError:
+                continue
+            spec = TRANSFER_SPECS.get(data[:4])
+            if spec is None or len(data) != spec.size or wallet_key not in (data[4:36], data[36:68]):
+                continue
+            if app_id is None:
+                app_id = _app_id(tx)
+            yield LogEvent(app_id, spec.standard, spec.name, {
+                name: decode(data[start:end]) for name, (start, end, decode) in zip(spec.arg_names, spec.decoders)})
+    for inner in tx.get("inner-txns", ()):
+        yield from _transfer_events(inner, wallet_key)
+
+
+def encode_event(name, values):
+    """
+    Encode an event log (base64) from its name in EVENT_SIGNATURES and argument values.
+    """
+    for selector, spec in EVENTS.items():
+        if spec.name == name:
+            break
+    else:
+        raise ValueError(f"Unknown event: {name}")
+    data = bytearray(selector)
+    for arg_name, (start, end, decode) in zip(spec.arg_names, spec.decoders):
+        value = values[arg_name]
+        if decode is encode_address:
+            data += decode_address(value)
+        elif decode is _decode_bool:
+            data += b"\x80" if value else b"\x00"
+        else:
+            data += value.to_bytes(end - start, "big")
+    return base64.b64encode(bytes(data)).decode()
+
+
+@lru_cache(maxsize=1024)
+def decode_address(address):
+    """
+    Return the 32-byte public key of an address.
+    """
+    return base64.b32decode(address + "=" * (-len(address) % 8))[:32]
+
+
+def _sample_transactions(count, wallet_address, logs_per_tx=4):
+    other = encode_address(bytes(range(32)))
+    logs = [
+        encode_event("arc200_Transfer", {"from": wallet_address, "to": other, "value": 10 ** 9}),
+        encode_event("arc200_Approval", {"owner": wallet_address, "spender": other, "value": 0}),
+        encode_event("arc200_Transfer", {"from": other, "to": wallet_address, "value": 5 * 10 ** 8}),
+        base64.b64encode(b"not an event").decode(),
+    ]
+    for i in range(count):
+        yield {"id": f"T{i}", "application-transaction": {"application-id": 390001 + i % 7},
+               "logs": [logs[(i + j) % len(logs)] for j in range(logs_per_tx)]}
+
+
+def benchmark(count=100000):
+    """
+    Decode the logs of synthetic log-heavy transactions and time it.
+    """
+    wallet_address = encode_address(bytes(31) + b"\x01")
+    transactions = list(_sample_transactions(count, wallet_address))
+    start = time.perf_counter()
+    transfers = sum(1 for tx in transactions for _ in transfer_events(tx, wallet_address))
+    elapsed = time.perf_counter() - start
+    logs = count * 4
+    print(f"{logs} logs, {transfers} transfers: {elapsed:.2f}s, {elapsed / logs * 1e9:.0f} ns/log")
+    return elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark ARC-200/ARC-72 log decoding")
+    parser.add_argument("--transactions", type=int, default=100000, help="Number of synthetic transactions")
+    args = parser.parse_args()
+    benchmark(args.transactions)
@@ -0,0 +1,166 @@
+from bisect import bisect_right
+from collections import defaultdict
+from decimal import Decimal
+from itertools import accumulate
+
+VOI_ASSET_ID = 0
+
+BALANCES_HEADER = ["Date", "Asset ID", "Currency", "Balance", "Balance (base units)", "Round"]
+
+
+class BalanceSeries:
+    """
+    Running balance of one asset: parallel integer columns sorted by (round, intra-round offset).
+    """
+    def __init__(self, asset_id, rounds, timestamps, balances):
+        self.asset_id = asset_id
+        self.rounds = rounds
+        self.timestamps = timestamps
+        self.balances = balances
+
+    def at_time(self, timestamp):
+        """
+        Balance after every transaction with round-time <= timestamp (0 before the first).
+        """
+        pos = bisect_right(self.timestamps, timestamp)
+        return self.balances[pos - 1] if pos else 0
+
+    def at_round(self, round_number):
+        """
+        Balance after every transaction in rounds <= round_number (0 before the first).
+        """
+        pos = bisect_right(self.rounds, round_number)
+        return self.balances[pos - 1] if pos else 0
+
+    def final(self):
+        return self.balances[-1] if self.balances else 0
+
+
+class BalanceEngine:
+    """
+    Folds a wallet's indexer transactions into per-asset balance time series.
+
+    Amounts stay in integer base units. Fees, close-to remainders, rewards and inner
+    transactions are included, so the series matches on-chain balances when the
+    complete history has been fetched.
+    """
+    def __init__(self, wallet_address):
+        self.wallet_address = wallet_address
+        # asset id -> list of (round, intra-round offset, timestamp, delta)
+        self.events = defaultdict(list)
+        self.series = None
+
+    def add_transactions(self, transactions):
+        for tx in transactions:
+            self._add_transaction(tx, tx.get("confirmed-round", 0), tx.get("intra-round-offset", 0),
+                                  tx.get("round-time", 0))
+        self.series = None
+
+    def _add(self, asset_id, key, delta):
+        if delta:
+            self.events[asset_id].append(key + (delta,))
+
+    def _add_transaction(self, tx, round_number, offset, timestamp):
+        wallet = self.wallet_address
+        key = (round_number, offset, timestamp)
+        sender = tx.get("sender")
+
+        if sender == wallet:
+            self._add(VOI_ASSET_ID, key, -tx.get("fee", 0))
+            self._add(VOI_ASSET_ID, key, tx.get("sender-rewards", 0))
+
+        payment = tx.get("payment-transaction")
+        if payment:
+            amount = payment.get("amount", 0)
+            close_amount = payment.get("close-amount", 0)
+            if sender == wallet:
+                self._add(VOI_ASSET_ID, key, -amount - close_amount)
+            if payment.get("receiver") == wallet:
+                self._add(VOI_ASSET_ID, key, amount)
+                self._add(VOI_ASSET_ID, key, tx.get("receiver-rewards", 0))
+            if payment.get("close-remainder-to") == wallet:
+                self._add(VOI_ASSET_ID, key, close_amount)
+                self._add(VOI_ASSET_ID, key, tx.get("close-rewards", 0))
+
+        transfer = tx.get("asset-transfer-transaction")
+        if transfer:
+            asset_id = transfer.get("asset-id", 0)
+            amount = transfer.get("amount", 0)
+            close_amount = transfer.get("close-amount", 0)
+            # Clawbacks move assets out of `sender` in the transfer, not the transaction sender
+            source = transfer.get("sender") or sender
+            if source == wallet:
+                self._add(asset_id, key, -amount - close_amount)
+            if transfer.get("receiver") == wallet:
+                self._add(asset_id, key, amount)
+            if transfer.get("close-to") == wallet:
+                self._add(asset_id, key, close_amount)
+
+        created_asset = tx.get("created-asset-index")
+        if created_asset and sender == wallet:
+            self._add(created_asset, key, tx.get("asset-config-transaction", {}).get("params", {}).get("total", 0))
+
+        # Inner transactions share the outer transaction's position in the round
+        for inner in tx.get("inner-txns", []):
+            self._add_transaction(inner, round_number, offset, timestamp)
+
+    def build(self):
+        """
+        Sort each asset's events and compute cumulative balances. Returns {asset_id: BalanceSeries}.
+        """
+        if self.series is None:
+            self.series = {}
+            for asset_id, events in self.events.items():
+                events.sort(key=lambda event: (event[0], event[1]))
+                self.series[asset_id] = BalanceSeries(
+                    asset_id,
+                    [event[0] for event in events],
+                    [event[2] for event in events],
+                    list(accumulate(event[3] for event in events)),
+                )
+        return self.series
+
+    def balances_at_time(self, timestamp):
+        return {asset_id: series.at_time(timestamp) for asset_id, series in self.build().items()}
+
+    def balances_at_round(self, round_number):
+        return {asset_id: series.at_round(round_number) for asset_id, series in self.build().items()}
+
+    def final_balances(self):
+        return {asset_id: series.final() for asset_id, series in self.build().items()}
+
+
+def to_units(balance, decimals):
+    """
+    Convert a base-unit integer balance to a decimal amount without float rounding.
+    """
+    return Decimal(balance).scaleb(-decimals)
+
+
+def balance_rows(engine, snapshots, asset_info):
+    """
+    Build balance CSV rows for each (date label, timestamp) snapshot.
+
+    `asset_info(asset_id)` returns {"unit-name", "decimals"}. Assets with a zero
+    balance at a snapshot are skipped.
+    """
+    series = engine.build()
+    rows = []
+    for date_label, timestamp in snapshots:
+        for asset_id in sorted(series):
+            pos = bisect_right(series[asset_id].timestamps, timestamp)
+            if not pos:
+                continue
+            balance = series[asset_id].balances[pos - 1]
+            if not balance:
+                continue
+            info = asset_info(asset_id)
+            rows.append([
+                date_label,
+                asset_id,
+                info["unit-name"],
+                str(to_units(balance, info["decimals"])),
+                balance,
+                series[asset_id].rounds[pos - 1],
+            ])
+    return rows
@@ -0,0 +1,253 @@
+import json
+import logging
+import os
+import sqlite3
+import struct
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+
+# Namespaces and how long their entries stay valid, in seconds (None: never expire)
+NS_ASSETS = "assets"
+NS_NULL_MAP = "koinly_null_map"
+NS_PAGES = "pages"
+NAMESPACE_TTLS = {
+    NS_ASSETS: 7 * 86400,
+    NS_NULL_MAP: None,
+    # Pages after the first are made of confirmed transactions and never change
+    NS_PAGES: None,
+}
+
+# Cache location: "dir:<path>", "sqlite:<path>" or "s3://<bucket>/<prefix>"; unset disables caching
+CACHE_ENV_VAR = "VOI_CACHE"
+# Endpoint of an S3-compatible store (e.g. MinIO); unset uses AWS
+S3_ENDPOINT_ENV_VAR = "VOI_CACHE_S3_ENDPOINT"
+
+# Entries are an expiry timestamp (0: never) followed by zlib-compressed JSON
+HEADER = struct.Struct(">d")
+COMPRESS_LEVEL = 6
+S3_CONCURRENCY = 16
+
+
+def encode_entry(value, expires_at):
+    return HEADER.pack(expires_at or 0) + zlib.compress(json.dumps(value).encode(), COMPRESS_LEVEL)
+
+
+def decode_entry(data, now):
+    """
+    Return the cached value, or None if the entry has expired.
+    """
+    (expires_at,) = HEADER.unpack_from(data)
+    if expires_at and expires_at <= now:
+        return None
+    return json.loads(zlib.decompress(data[HEADER.size:]))
+
+
+class Cache(ABC):
+    """
+    Namespaced key/value cache of JSON values shared between runs, workers and hosts.
+
+    Backends only store opaque bytes per (namespace, key); expiry and compression are
+    handled here. `ttls` overrides NAMESPACE_TTLS per namespace. A cached None cannot
+    be told apart from a miss, so callers should not store it.
+    """
+    def __init__(self, ttls=None, clock=time.time):
+        self.ttls = dict(NAMESPACE_TTLS, **(ttls or {}))
+        self.clock = clock
+
+    def get(self, namespace, key):
+        return self.get_many(namespace, [key]).get(key)
+
+    def set(self, namespace, key, value):
+        self.set_many(namespace, {key: value})
+
+    def get_many(self, namespace, keys):
+        """
+        Return {key: value} for the keys that are cached and not expired.
+        """
+        now = self.clock()
+        values = {}
+        for key, data in self._get_raw_many(namespace, list(keys)).items():
+            value = decode_entry(data, now)
+            if value is not None:
+                values[key] = value
+        return values
+
+    def set_many(self, namespace, items):
+        ttl = self.ttls.get(namespace)
+        expires_at = self.clock() + ttl if ttl else 0
+        self._set_raw_many(namespace, {key: encode_entry(value, expires_at) for key, value in items.items()})
+
+    @abstractmethod
+    def _get_raw_many(self, namespace, keys):
+        """
+        Return {key: stored bytes} for the keys present in the backend.
+        """
+
+    @abstractmethod
+    def _set_raw_many(self, namespace, items):
+        """
+        Store {key: bytes}, replacing existing entries.
+        """
+
+
+class LocalDirCache(Cache):
+    """
+    One file per entry under <root>/<namespace>/.
+    """
+    def __init__(self, root, **kwargs):
+        super().__init__(**kwargs)
+        self.root = root
+
+    def _path(self, namespace, key):
+        return os.path.join(self.root, namespace, quote(key, safe=""))
+
+    def _get_raw_many(self, namespace, keys):
+        entries = {}
+        for key in keys:
+            try:
+                with open(self._path(namespace, key), "rb") as f:
+                    entries[key] = f.read()
+            except FileNotFoundError:
+                pass
+        return entries
+
+    def _set_raw_many(self, namespace, items):
+        os.makedirs(os.path.join(self.root, namespace), exist_ok=True)
+        for key, data in items.items():
+            path = self._path(namespace, key)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+
+class SQLiteCache(Cache):
+    """
+    All entries in one SQLite table; batches are a single query or transaction.
+    """
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS entries (
+        namespace TEXT NOT NULL,
+        key TEXT NOT NULL,
+        value BLOB NOT NULL,
+        PRIMARY KEY (namespace, key)
+    )
+    """
+    # Stay below SQLite's bound parameter limit
+    BATCH_SIZE = 500
+
+    def __init__(self, db_path, **kwargs):
+        super().__init__(**kwargs)
+        self.db_path = db_path
+        self.conn = None
+        self.lock = threading.Lock()
+
+    def _connect(self):
+        if self.conn is None:
+            self.conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            self.conn.execute(self.SCHEMA)
+        return self.conn
+
+    def _get_raw_many(self, namespace, keys):
+        entries = {}
+        with self.lock:
+            conn = self._connect()
+            for start in range(0, len(keys), self.BATCH_SIZE):
+                batch = keys[start:start + self.BATCH_SIZE]
+                placeholders = ", ".join("?" * len(batch))
+                entries.update(conn.execute(
+                    f"SELECT key, value FROM entries WHERE namespace = ? AND key IN ({placeholders})",
+                    [namespace] + batch,
+                ).fetchall())
+        return entries
+
+    def _set_raw_many(self, namespace, items):
+        with self.lock:
+            conn = self._connect()
+            with conn:
+                conn.executemany("INSERT OR REPLACE INTO entries VALUES (?, ?, ?)",
+                                 [(namespace, key, data) for key, data in items.items()])
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+class S3Cache(Cache):
+    """
+    One object per entry at <prefix><namespace>/<key> in an S3 or S3-compatible bucket.
+
+    S3 has no batch read, so batches are issued concurrently. `client` defaults to a
+    boto3 client for `endpoint_url` (boto3 is only imported then).
+    """
+    def __init__(self, bucket, prefix="", client=None, endpoint_url=None, **kwargs):
+        super().__init__(**kwargs)
+        self.bucket = bucket
+        self.prefix = prefix
+        self.client = client
+        self.endpoint_url = endpoint_url
+
+    def _client(self):
+        if self.client is None:
+            import boto3
+            self.client = boto3.client("s3", endpoint_url=self.endpoint_url)
+        return self.client
+
+    def _key(self, namespace, key):
+        return f"{self.prefix}{namespace}/{quote(key, safe='')}"
+
+    def _get_one(self, namespace, key):
+        try:
+            response = self._client().get_object(Bucket=self.bucket, Key=self._key(namespace, key))
+        except Exception as e:
+            code = getattr(e, "response", {}).get("Error", {}).get("Code")
+            if code in ("NoSuchKey", "404"):
+                return None
+            raise
+        return response["Body"].read()
+
+    def _put_one(self, namespace, key, data):
+        self._client().put_object(Bucket=self.bucket, Key=self._key(namespace, key), Body=data)
+
+    def _map(self, fn, args):
+        if len(args) <= 1:
+            return [fn(*arg) for arg in args]
+        with ThreadPoolExecutor(max_workers=min(S3_CONCURRENCY, len(args))) as executor:
+            return list(executor.map(lambda arg: fn(*arg), args))
+
+    def _get_raw_many(self, namespace, keys):
+        self._client()
+        results = self._map(self._get_one, [(namespace, key) for key in keys])
+        return {key: data for key, data in zip(keys, results) if data is not None}
+
+    def _set_raw_many(self, namespace, items):
+        self._client()
+        self._map(self._put_one, [(namespace, key, data) for key, data in items.items()])
+
+
+def open_cache(location=None):
+    """
+    Open the cache at `location` (default: the VOI_CACHE environment variable).
+
+    Returns None when no cache is configured.
+    """
+    location = location or os.environ.get(CACHE_ENV_VAR)
+    if not location:
+        return None
+    if location.startswith("s3://"):
+        bucket, _, prefix = location[len("s3://"):].partition("/")
+        if prefix and not prefix.endswith("/"):
+            prefix += "/"
+        return S3Cache(bucket, prefix, endpoint_url=os.environ.get(S3_ENDPOINT_ENV_VAR))
+    kind, _, path = location.partition(":")
+    if kind == "dir":
+        return LocalDirCache(path)
+    if kind == "sqlite":
+        return SQLiteCache(path)
+    logging.warning("Ignoring unknown cache location %s", location)
+    return None
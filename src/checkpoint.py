@@ -0,0 +1,104 @@
+import json
+import logging
+import os
+
+
+class FetchCheckpoint:
+    """
+    Persists the pagination state of a wallet fetch so an interrupted run can resume.
+
+    Completed pages are appended to a JSON-lines spool file and the last `next-token`,
+    round and page count are saved after each page. A checkpoint only resumes a fetch
+    requested with the same options; anything else starts over. The indexer query
+    parameters are saved too, so a resumed fetch continues the exact same query.
+    """
+    def __init__(self, checkpoint_dir, wallet_address, options=None):
+        self.wallet_address = wallet_address
+        self.state_path = os.path.join(checkpoint_dir, f"{wallet_address}.json")
+        self.spool_path = os.path.join(checkpoint_dir, f"{wallet_address}.jsonl")
+        self.query_key = json.dumps(options or {}, sort_keys=True, default=sorted)
+        self.query_params = None
+        self.next_token = None
+        self.last_round = None
+        self.pages = 0
+        self.count = 0
+        self.spool_size = 0
+        os.makedirs(checkpoint_dir, exist_ok=True)
+
+    def load(self):
+        """
+        Restore saved state. Returns True if there is a fetch to resume.
+        """
+        if not os.path.exists(self.state_path):
+            self.clear()
+            return False
+        try:
+            with open(self.state_path, "r") as f:
+                state = json.load(f)
+        except (ValueError, IOError) as e:
+            logging.warning("Ignoring unreadable checkpoint %s: %s", self.state_path, e)
+            self.clear()
+            return False
+        if state.get("query") != self.query_key or not state.get("next_token"):
+            logging.info("Checkpoint for %s does not match this query, starting over", self.wallet_address)
+            self.clear()
+            return False
+        self.query_params = state.get("query_params")
+        self.next_token = state["next_token"]
+        self.last_round = state.get("last_round")
+        self.pages = state.get("pages", 0)
+        self.count = state.get("count", 0)
+        self.spool_size = state.get("spool_size", 0)
+        # Drop a page written after the last state save; it is fetched again on resume
+        os.truncate(self.spool_path, self.spool_size)
+        return True
+
+    def transactions(self):
+        """
+        Return the transactions saved by previous runs.
+        """
+        with open(self.spool_path, "r") as f:
+            return [json.loads(line) for line in f]
+
+    def record_page(self, transactions, next_token):
+        """
+        Save a completed page and the token for the next one.
+        """
+        with open(self.spool_path, "a") as f:
+            for tx in transactions:
+                f.write(json.dumps(tx))
+                f.write("\n")
+            self.spool_size = f.tell()
+        self.next_token = next_token
+        self.pages += 1
+        self.count += len(transactions)
+        if transactions:
+            self.last_round = transactions[-1].get("confirmed-round", self.last_round)
+
+        state = {
+            "query": self.query_key,
+            "query_params": self.query_params,
+            "next_token": self.next_token,
+            "last_round": self.last_round,
+            "pages": self.pages,
+            "count": self.count,
+            "spool_size": self.spool_size,
+        }
+        tmp_path = self.state_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)
+
+    def clear(self):
+        """
+        Remove the checkpoint once the fetch is no longer needed.
+        """
+        for path in (self.state_path, self.spool_path):
+            if os.path.exists(path):
+                os.remove(path)
+        self.query_params = None
+        self.next_token = None
+        self.last_round = None
+        self.pages = 0
+        self.count = 0
+        self.spool_size = 0
@@ -0,0 +1,262 @@
+import argparse
+
+import json_backend
+from aggregate import WINDOWS
+from concurrency import DEFAULT_MAXIMUM
+from cost_basis import METHODS
+from extsort import ORDER_CHRONOLOGICAL, ORDERS, RUN_SIZE
+from writers import OUTPUTS
+
+# Command-line options shared by voi_exporter.py and report_util.py. Kept free of
+# heavy imports so the CLIs can parse arguments without loading the fetch layer.
+
+# Indexer transaction types accepted by the `tx-type` filter
+TX_TYPES = ["pay", "keyreg", "acfg", "axfer", "afrz", "appl", "stpf", "hb"]
+
+# Large application-call payloads that plain transfer reports do not need
+APP_CALL_PAYLOAD_FIELDS = ["global-state-delta", "local-state-delta", "logs", "application-transaction"]
+
+# Indexer query parameters passed through unchanged from the filter options
+FILTER_PARAMS = {
+    "tx_type": "tx-type",
+    "asset_id": "asset-id",
+    "currency_greater_than": "currency-greater-than",
+    "currency_less_than": "currency-less-than",
+}
+
+
+def add_range_arguments(parser):
+    """
+    Add the date/round range options shared by the CLIs.
+    """
+    parser.add_argument("--start-date", help="Only export transactions on or after this date (YYYY-MM-DD, UTC)")
+    parser.add_argument("--end-date", help="Only export transactions on or before this date (YYYY-MM-DD, UTC)")
+    parser.add_argument("--min-round", type=int, help="Only export transactions at or after this round")
+    parser.add_argument("--max-round", type=int, help="Only export transactions at or before this round")
+
+
+def range_options(args):
+    """
+    Collect the date/round range options from parsed arguments.
+    """
+    options = {}
+    for key in ("start_date", "end_date", "min_round", "max_round"):
+        value = getattr(args, key, None)
+        if value is not None:
+            options[key] = value
+    return options
+
+
+def add_filter_arguments(parser):
+    """
+    Add the transaction type/asset filter options shared by the CLIs.
+    """
+    parser.add_argument("--tx-type", choices=TX_TYPES, help="Only export transactions of this type")
+    parser.add_argument("--asset-id", type=int, help="Only export transactions involving this asset")
+    parser.add_argument("--currency-greater-than", type=int,
+                        help="Only export transactions moving more than this amount (base units)")
+    parser.add_argument("--currency-less-than", type=int,
+                        help="Only export transactions moving less than this amount (base units)")
+    parser.add_argument("--exclude", action="append", default=[],
+                        help="Transaction field to drop after fetching (repeatable); "
+                             "'app-payloads' drops global/local state deltas, logs and app-call details")
+
+
+def filter_options(args):
+    """
+    Collect the transaction type/asset filter options from parsed arguments.
+    """
+    options = {}
+    for key in FILTER_PARAMS:
+        value = getattr(args, key, None)
+        if value is not None:
+            options[key] = value
+    exclude_fields = []
+    for field in getattr(args, "exclude", None) or []:
+        exclude_fields.extend(APP_CALL_PAYLOAD_FIELDS if field == "app-payloads" else [field])
+    if exclude_fields:
+        options["exclude_fields"] = frozenset(exclude_fields)
+    return options
+
+
+def add_fetch_arguments(parser):
+    """
+    Add the options controlling how indexer pages are fetched.
+    """
+    parser.add_argument("--stream-pages", action="store_true", default=False,
+                        help=f"Parse indexer pages incrementally (JSON backend: {json_backend.BACKEND})")
+    parser.add_argument("--restart", action="store_true", default=False,
+                        help="Discard saved progress from an interrupted fetch and start over")
+    parser.add_argument("--reconcile", action="store_true", default=False,
+                        help="Check computed balances against the account and refetch any missing round ranges")
+    parser.add_argument("--indexer", action="append", default=[], metavar="URL",
+                        help="Indexer to fetch from; repeat to fail over between several (default: VOI_INDEXER_URLS "
+                             "or the configured indexer)")
+    parser.add_argument("--hedge", action="store_true", default=False,
+                        help="Resend indexer requests slower than usual to a second indexer and take the first answer")
+    parser.add_argument("--max-concurrency", type=int, default=None, metavar="N",
+                        help="Most indexer requests in flight across all wallets; the exporter adapts below this "
+                             f"to what the indexer sustains (default: {DEFAULT_MAXIMUM})")
+
+
+def fetch_options(args):
+    """
+    Collect the fetch options from parsed arguments.
+    """
+    options = {}
+    if getattr(args, "stream_pages", False):
+        options["stream_pages"] = True
+    if getattr(args, "restart", False):
+        options["restart"] = True
+    if getattr(args, "reconcile", False):
+        options["reconcile"] = True
+    if getattr(args, "indexer", None):
+        options["indexers"] = args.indexer
+    if getattr(args, "hedge", False):
+        options["hedge"] = True
+    if getattr(args, "max_concurrency", None):
+        options["max_concurrency"] = args.max_concurrency
+    return options
+
+
+def add_balance_arguments(parser):
+    """
+    Add the balance snapshot options shared by the CLIs.
+    """
+    parser.add_argument("--balance-date", action="append", default=[],
+                        help="Report balances at the end of this date (YYYY-MM-DD, UTC; repeatable)")
+    parser.add_argument("--year-end", action="append", type=int, default=[],
+                        help="Report balances at the end of this year (repeatable)")
+
+
+def balance_options(args):
+    """
+    Collect the balance snapshot dates from parsed arguments.
+    """
+    dates = list(getattr(args, "balance_date", None) or [])
+    dates.extend(f"{year}-12-31" for year in getattr(args, "year_end", None) or [])
+    return {"balance_dates": sorted(set(dates))} if dates else {}
+
+
+def add_classification_arguments(parser):
+    """
+    Add the classification, reward aggregation and row order options shared by the CLIs.
+    """
+    parser.add_argument("--reward-sender", action="append", default=[],
+                        help="Address whose payments to the wallet are staking rewards (repeatable)")
+    parser.add_argument("--aggregate-rewards", choices=sorted(WINDOWS),
+                        help="Merge staking/income rows per asset per window into one row")
+    parser.add_argument("--portfolio-wallet", action="append", default=[],
+                        help="Another wallet of the same owner; transfers between them are self-transfers (repeatable)")
+    parser.add_argument("--counterparties", action="append", default=[],
+                        help="JSON directory of labelled apps and addresses, on top of data/voi_counterparties.json "
+                             "(repeatable)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Processes classifying large histories in parallel (0: one per CPU; default: 1)")
+    parser.add_argument("--order", choices=ORDERS, default=ORDER_CHRONOLOGICAL,
+                        help="Report row order: chronological (round, offset, txid) or as the indexer returns them")
+    parser.add_argument("--sort-run-size", type=int, default=RUN_SIZE,
+                        help="Rows sorted in memory at a time; larger exports are merged from temporary files")
+
+
+def classification_options(args):
+    """
+    Collect the classification options from parsed arguments.
+    """
+    options = {}
+    if getattr(args, "reward_sender", None):
+        options["reward_senders"] = list(args.reward_sender)
+    if getattr(args, "aggregate_rewards", None):
+        options["aggregate_rewards"] = args.aggregate_rewards
+    if getattr(args, "portfolio_wallet", None):
+        options["portfolio"] = list(args.portfolio_wallet)
+    if getattr(args, "counterparties", None):
+        options["counterparties"] = list(args.counterparties)
+    if getattr(args, "workers", 1) != 1:
+        options["workers"] = args.workers
+    if getattr(args, "order", ORDER_CHRONOLOGICAL) != ORDER_CHRONOLOGICAL:
+        options["order"] = args.order
+    if getattr(args, "sort_run_size", RUN_SIZE) != RUN_SIZE:
+        options["sort_run_size"] = args.sort_run_size
+    return options
+
+
+def parse_asset_prices(value):
+    """
+    Parse an --asset-prices value: "CURRENCY=FILE".
+    """
+    currency, _, path = value.partition("=")
+    if not currency or not path:
+        raise argparse.ArgumentTypeError(f"expected CURRENCY=FILE, got '{value}'")
+    return currency, path
+
+
+def add_cost_basis_arguments(parser):
+    """
+    Add the price and cost basis options shared by the CLIs.
+    """
+    parser.add_argument("--prices",
+                        help="CoinGecko historical VOI price CSV, used to add USD prices to the Koinly report "
+                             "and for --cost-basis")
+    parser.add_argument("--asset-prices", action="append", type=parse_asset_prices, default=[],
+                        help="CoinGecko historical price CSV of another asset as CURRENCY=FILE (repeatable)")
+    parser.add_argument("--cost-basis", choices=METHODS,
+                        help="Track lots with this method and write realized gains and year-end positions")
+
+
+def cost_basis_options(args):
+    """
+    Collect the price and cost basis options from parsed arguments.
+    """
+    options = {}
+    if getattr(args, "prices", None):
+        options["prices"] = args.prices
+    if getattr(args, "asset_prices", None):
+        options["asset_prices"] = dict(args.asset_prices)
+    if getattr(args, "cost_basis", None):
+        options["cost_basis"] = args.cost_basis
+    return options
+
+
+def add_follow_arguments(parser):
+    """
+    Add the follow mode options of voi_exporter.py.
+    """
+    parser.add_argument("--follow", action="store_true",
+                        help="After the export, keep polling for new rounds and add their transactions to the report")
+    parser.add_argument("--poll-interval", type=float, default=10,
+                        help="Seconds between checks for new rounds in follow mode (default: 10)")
+
+
+def parse_output(value):
+    """
+    Parse an --output value: "TYPE" for every format or "FORMAT=TYPE" for one.
+    """
+    format, _, output = value.rpartition("=")
+    if output not in OUTPUTS:
+        raise argparse.ArgumentTypeError(f"unknown output '{output}' (choose from {', '.join(OUTPUTS)})")
+    return format or "*", output
+
+
+def add_output_arguments(parser):
+    """
+    Add the report output options shared by the CLIs.
+    """
+    parser.add_argument("--output", action="append", type=parse_output, default=[],
+                        help=f"Report file type ({', '.join(OUTPUTS)}), for all formats or as FORMAT=TYPE "
+                             "for one (repeatable)")
+    parser.add_argument("--summary", action="store_true",
+                        help="Also write yearly totals per asset and transaction type (CSV and JSON)")
+
+
+def output_options(args):
+    """
+    Collect the report output options from parsed arguments.
+    """
+    options = {}
+    outputs = dict(getattr(args, "output", None) or [])
+    if outputs:
+        options["outputs"] = outputs
+    if getattr(args, "summary", False):
+        options["summary"] = True
+    return options
@@ -0,0 +1,121 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+DEFAULT_INITIAL = 4
+DEFAULT_MINIMUM = 1
+DEFAULT_MAXIMUM = 16
+# The limit is multiplied by this on a 429 or timeout
+DECREASE_FACTOR = 0.5
+# Seconds of completed requests the throughput is measured over
+THROUGHPUT_WINDOW = 10.0
+
+
+def is_throttled(error):
+    """
+    True for errors that mean the indexer is overloaded: HTTP 429 and timeouts.
+    """
+    # Imported here so cli_options can read the defaults without loading the HTTP stack
+    import requests
+
+    if isinstance(error, (requests.Timeout, TimeoutError)):
+        return True
+    response = getattr(error, "response", None)
+    return isinstance(error, requests.HTTPError) and response is not None and response.status_code == 429
+
+
+class AimdLimiter:
+    """
+    Limits the indexer requests in flight across all threads, adapting the limit to
+    what the indexer sustains.
+
+    Like TCP congestion control, every success raises the limit by 1/limit (one more
+    slot per limit's worth of successes) and a 429 or timeout halves it. Requests
+    that started before the last decrease do not decrease it again, so one burst of
+    throttled responses counts once. Other errors leave the limit unchanged.
+    """
+    def __init__(self, initial=DEFAULT_INITIAL, minimum=DEFAULT_MINIMUM, maximum=DEFAULT_MAXIMUM,
+                 clock=time.monotonic):
+        self.minimum = minimum
+        self.maximum = max(minimum, maximum)
+        self.limit = float(min(max(initial, minimum), self.maximum))
+        self.clock = clock
+        self.condition = threading.Condition()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.requests = 0
+        self.throttled = 0
+        self.last_decrease = None
+        self.completed = deque()
+
+    def set_maximum(self, maximum):
+        with self.condition:
+            self.maximum = max(self.minimum, maximum)
+            self.limit = min(self.limit, self.maximum)
+
+    def acquire(self):
+        """
+        Wait for a free slot; returns the request's start time for release().
+        """
+        with self.condition:
+            while self.in_flight >= int(self.limit):
+                self.condition.wait()
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            return self.clock()
+
+    def release(self, start, success=True, throttled=False):
+        with self.condition:
+            now = self.clock()
+            self.in_flight -= 1
+            self.requests += 1
+            self.completed.append(now)
+            self._prune(now)
+            if throttled:
+                self.throttled += 1
+                if self.last_decrease is None or start >= self.last_decrease:
+                    self.limit = max(self.minimum, self.limit * DECREASE_FACTOR)
+                    self.last_decrease = now
+            elif success:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self.condition.notify_all()
+
+    @contextmanager
+    def slot(self):
+        """
+        Hold a slot for one request, releasing it with the request's outcome.
+        """
+        start = self.acquire()
+        try:
+            yield
+        except Exception as e:
+            self.release(start, success=False, throttled=is_throttled(e))
+            raise
+        else:
+            self.release(start)
+
+    def throughput(self):
+        """
+        Requests completed per second over the last THROUGHPUT_WINDOW seconds.
+        """
+        with self.condition:
+            self._prune(self.clock())
+            return len(self.completed) / THROUGHPUT_WINDOW
+
+    def _prune(self, now):
+        # Keeps only the completions inside the window, so the deque stays bounded on long runs
+        while self.completed and self.completed[0] < now - THROUGHPUT_WINDOW:
+            self.completed.popleft()
+
+    def metrics(self):
+        throughput = self.throughput()
+        with self.condition:
+            return {
+                "concurrency": int(self.limit),
+                "in_flight": self.in_flight,
+                "peak_in_flight": self.peak_in_flight,
+                "requests": self.requests,
+                "throttled": self.throttled,
+                "requests_per_second": round(throughput, 2),
+            }
@@ -1,5 +1,3 @@
-from staketaxcsv.common import ExporterTypes as et
-
 class Config:
     """
     Configuration class for the VOI exporter.
@@ -22,6 +20,8 @@ class Config:
         "algod_port": 443,
         "indexer_url": "https://mainnet-idx.voi.nodely.dev",
         "indexer_port": 443,
+        # Indexers requests are routed across, healthiest first; the first is the default
+        "indexer_urls": ["https://mainnet-idx.voi.nodely.dev"],
     }
 
     @classmethod
@@ -0,0 +1,265 @@
+import heapq
+from collections import deque, namedtuple
+from datetime import datetime, timezone
+
+from ExporterTypes import TX_TYPE_SELF_TRANSFER, TX_TYPE_SPEND
+
+METHOD_FIFO = "fifo"
+METHOD_LIFO = "lifo"
+METHOD_HIFO = "hifo"
+METHODS = [METHOD_FIFO, METHOD_LIFO, METHOD_HIFO]
+
+# Network fees are paid in VOI (asset 0) in microVOI; rows carry them in VOI
+FEE_ASSET_ID = "0"
+FEE_CURRENCY = "VOI"
+FEE_DECIMALS = 6
+
+GAINS_HEADER = ["Date", "TxHash", "Kind", "Asset ID", "Currency", "Amount", "Proceeds (USD)", "Cost Basis (USD)",
+                "Gain (USD)", "Acquired", "Unmatched Amount"]
+POSITIONS_HEADER = ["Year", "Asset ID", "Currency", "Amount", "Cost Basis (USD)", "Price (USD)",
+                    "Market Value (USD)", "Unrealized Gain (USD)"]
+
+# One disposal; amounts are in base units, `acquired` is the timestamp of the oldest lot used
+# and `unmatched` the part of the amount no lot covered (history before the export)
+Disposal = namedtuple(
+    "Disposal",
+    ["timestamp", "tx_hash", "kind", "asset_id", "currency", "decimals", "amount", "proceeds", "cost_basis",
+     "acquired", "unmatched"],
+)
+# Holdings of one asset at the end of a year; market_value is None without a price
+Position = namedtuple(
+    "Position",
+    ["year", "asset_id", "currency", "decimals", "amount", "cost_basis", "price", "market_value"],
+)
+
+
+class FifoLots:
+    """
+    Lots of one asset, disposed of oldest first. A lot is [amount, unit cost, timestamp].
+    """
+    def __init__(self):
+        self.lots = deque()
+        self.amount = 0
+        self.cost = 0.0
+
+    def add(self, amount, unit_cost, timestamp):
+        self.lots.append([amount, unit_cost, timestamp])
+        self.amount += amount
+        self.cost += amount * unit_cost
+
+    def _next(self):
+        return self.lots[0]
+
+    def _pop(self):
+        self.lots.popleft()
+
+    def take(self, amount):
+        """
+        Remove `amount` from the lots. Returns (cost basis, oldest lot timestamp, unmatched amount).
+        """
+        cost = 0.0
+        acquired = None
+        while amount and self.lots:
+            lot = self._next()
+            lot_amount, unit_cost, timestamp = lot
+            if acquired is None or timestamp < acquired:
+                acquired = timestamp
+            if lot_amount <= amount:
+                self._pop()
+                taken = lot_amount
+            else:
+                lot[0] = lot_amount - amount
+                taken = amount
+            cost += taken * unit_cost
+            amount -= taken
+            self.amount -= taken
+        self.cost = self.cost - cost if self.lots else 0.0
+        return cost, acquired, amount
+
+
+class LifoLots(FifoLots):
+    """
+    Lots of one asset, disposed of newest first.
+    """
+    def _next(self):
+        return self.lots[-1]
+
+    def _pop(self):
+        self.lots.pop()
+
+
+class HifoLots(FifoLots):
+    """
+    Lots of one asset, disposed of highest unit cost first.
+
+    The lots are a heap of [-unit cost, sequence, lot]; the sequence keeps lots of
+    equal cost in acquisition order.
+    """
+    def __init__(self):
+        super().__init__()
+        self.lots = []
+        self.sequence = 0
+
+    def add(self, amount, unit_cost, timestamp):
+        self.sequence += 1
+        heapq.heappush(self.lots, (-unit_cost, self.sequence, [amount, unit_cost, timestamp]))
+        self.amount += amount
+        self.cost += amount * unit_cost
+
+    def _next(self):
+        return self.lots[0][2]
+
+    def _pop(self):
+        heapq.heappop(self.lots)
+
+
+LOT_QUEUES = {METHOD_FIFO: FifoLots, METHOD_LIFO: LifoLots, METHOD_HIFO: HifoLots}
+
+
+def paid_fee(row):
+    """
+    Return the network fee in microVOI the wallet paid in a row (0 if it did not pay it).
+
+    Rows carry the transaction fee on both sides; only the sending side pays it, also for
+    self-transfers (fee-only spend rows outside the default format).
+    """
+    if row["fee"] and (row["sent_amount"] != "" or row["tx_type"] == TX_TYPE_SPEND):
+        return round(row["fee"] * 10 ** FEE_DECIMALS)
+    return 0
+
+
+def year_end(year):
+    return int(datetime(year + 1, 1, 1, tzinfo=timezone.utc).timestamp()) - 1
+
+
+class CostBasisEngine:
+    """
+    Tracks acquisition lots per asset from normalized rows (see voi_exporter.report_rows)
+    and computes the realized gain of every disposal.
+
+    Received amounts are acquisitions at their USD value from the PriceStore, sent
+    amounts and network fees are disposals at theirs. Self-transfers only pay their
+    fee. Rows must arrive in time order; the holdings at the end of every year the rows
+    pass are recorded as Positions.
+    """
+    def __init__(self, method, prices):
+        self.lot_queue = LOT_QUEUES[method]
+        self.method = method
+        self.prices = prices
+        self.lots = {}
+        # asset id -> (currency, decimals)
+        self.assets = {FEE_ASSET_ID: (FEE_CURRENCY, FEE_DECIMALS)}
+        self.disposals = []
+        self.positions = []
+        self.missing_prices = set()
+        # currency -> (start, end, decimals, USD per base unit) of the last price looked up
+        self.price_spans = {}
+        self.year = None
+        self.year_end = None
+
+    def _unit_price(self, currency, decimals, timestamp):
+        # USD per base unit; rows arrive in time order, so the last span nearly always applies
+        span = self.price_spans.get(currency)
+        if span is not None and span[0] <= timestamp < span[1] and span[2] == decimals:
+            return span[3]
+        price, start, end = self.prices.price_span(currency, timestamp)
+        if price is None:
+            self.missing_prices.add(currency)
+            unit_price = 0.0
+        else:
+            unit_price = price / 10 ** decimals
+        self.price_spans[currency] = (start, end, decimals, unit_price)
+        return unit_price
+
+    def _lots(self, asset_id):
+        lots = self.lots.get(asset_id)
+        if lots is None:
+            lots = self.lots[asset_id] = self.lot_queue()
+        return lots
+
+    def _dispose(self, row, kind, asset_id, currency, decimals, amount, timestamp):
+        unit_price = self._unit_price(currency, decimals, timestamp)
+        cost, acquired, unmatched = self._lots(asset_id).take(amount)
+        self.disposals.append(Disposal(timestamp, row["tx_hash"], kind, asset_id, currency, decimals, amount,
+                                       amount * unit_price, cost, acquired, unmatched))
+
+    def add_row(self, row):
+        timestamp = row["timestamp"]
+        if self.year_end is None or timestamp > self.year_end:
+            self._close_years(timestamp)
+        tx_type = row["tx_type"]
+        amount = row["raw_amount"]
+        if amount and tx_type != TX_TYPE_SELF_TRANSFER:
+            asset_id = row["asset_id"]
+            currency = row["currency"]
+            decimals = row["decimals"]
+            if asset_id not in self.assets:
+                self.assets[asset_id] = (currency, decimals)
+            if row["received_amount"] != "":
+                self._lots(asset_id).add(amount, self._unit_price(currency, decimals, timestamp), timestamp)
+            elif row["sent_amount"] != "":
+                self._dispose(row, "sent", asset_id, currency, decimals, amount, timestamp)
+        fee = paid_fee(row)
+        if fee:
+            self._dispose(row, "fee", FEE_ASSET_ID, FEE_CURRENCY, FEE_DECIMALS, fee, timestamp)
+
+    def consume(self, rows):
+        """
+        Add rows as they pass through, yielding each unchanged.
+        """
+        for row in rows:
+            self.add_row(row)
+            yield row
+
+    def _close_years(self, timestamp):
+        year = datetime.fromtimestamp(timestamp, tz=timezone.utc).year
+        if self.year is not None:
+            for closed in range(self.year, year):
+                self._record_positions(closed)
+        self.year = year
+        self.year_end = year_end(year)
+
+    def _record_positions(self, year):
+        timestamp = year_end(year)
+        for asset_id in sorted(self.lots, key=str):
+            lots = self.lots[asset_id]
+            if not lots.amount:
+                continue
+            currency, decimals = self.assets[asset_id]
+            price = self.prices.price_at(currency, timestamp)
+            market_value = None if price is None else lots.amount * price / 10 ** decimals
+            self.positions.append(Position(year, asset_id, currency, decimals, lots.amount, lots.cost, price,
+                                           market_value))
+
+    def finish(self):
+        """
+        Record the positions at the end of the last year. Call once all rows are added.
+        """
+        if self.year is not None:
+            self._record_positions(self.year)
+            self.year = None
+            self.year_end = None
+
+
+def format_date(timestamp):
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime("%Y-%m-%d %H:%M:%S") if timestamp else ""
+
+
+def gain_rows(disposals):
+    for d in disposals:
+        scale = 10 ** d.decimals
+        yield [
+            format_date(d.timestamp), d.tx_hash, d.kind, d.asset_id, d.currency, d.amount / scale,
+            round(d.proceeds, 2), round(d.cost_basis, 2), round(d.proceeds - d.cost_basis, 2),
+            format_date(d.acquired), d.unmatched / scale if d.unmatched else "",
+        ]
+
+
+def position_rows(positions):
+    for p in positions:
+        known = p.market_value is not None
+        yield [
+            p.year, p.asset_id, p.currency, p.amount / 10 ** p.decimals, round(p.cost_basis, 2),
+            p.price if known else "", round(p.market_value, 2) if known else "",
+            round(p.market_value - p.cost_basis, 2) if known else "",
+        ]
@@ -0,0 +1,95 @@
+import json
+import os
+from collections import namedtuple
+
+from arc200 import encode_address, sha512_256
+
+COUNTERPARTIES_FILE = "voi_counterparties.json"
+
+CATEGORY_DEX_POOL = "dex_pool"
+CATEGORY_EXCHANGE = "exchange"
+CATEGORY_STAKING = "staking"
+CATEGORY_BRIDGE = "bridge"
+CATEGORY_TOKEN = "token"
+
+# Description of a transfer (sent, received) with a counterparty of each category
+CATEGORY_DESCRIPTIONS = {
+    CATEGORY_DEX_POOL: ("Swap on {label}", "Swap on {label}"),
+    CATEGORY_EXCHANGE: ("Deposit to {label}", "Withdrawal from {label}"),
+    CATEGORY_STAKING: ("Stake with {label}", "Staking reward from {label}"),
+    CATEGORY_BRIDGE: ("Bridge out via {label}", "Bridge in via {label}"),
+}
+DEFAULT_DESCRIPTIONS = ("Sent to {label}", "Received from {label}")
+
+Counterparty = namedtuple("Counterparty", ["label", "category"])
+
+
+def application_address(app_id):
+    """
+    Return the address of an application's account.
+    """
+    return encode_address(sha512_256(b"appID" + int(app_id).to_bytes(8, "big")))
+
+
+def describe(counterparty, sent):
+    templates = CATEGORY_DESCRIPTIONS.get(counterparty.category, DEFAULT_DESCRIPTIONS)
+    return templates[0 if sent else 1].format(label=counterparty.label)
+
+
+class CounterpartyIndex:
+    """
+    Directory of known addresses and applications (DEX pools, exchanges, staking
+    contracts, ...) with a label and category each.
+
+    Loaded from JSON files of {"apps": {app id: {"label", "category"}}, "addresses":
+    {address: {...}}}; later files override earlier ones. An app's account address is
+    indexed along with its id, so payments to a pool match too. Lookups are one dict
+    access; entries with the same label and category share one tuple. refresh()
+    reloads the files when any of them changed.
+    """
+    def __init__(self, paths):
+        self.paths = list(paths)
+        self.mtimes = None
+        self.addresses = {}
+        self.apps = {}
+
+    def _mtimes(self):
+        return tuple(os.stat(path).st_mtime_ns if os.path.exists(path) else None for path in self.paths)
+
+    def refresh(self):
+        """
+        Load the files if they changed since the last load. Returns True if they were reloaded.
+        """
+        mtimes = self._mtimes()
+        if mtimes == self.mtimes:
+            return False
+        self.load()
+        self.mtimes = mtimes
+        return True
+
+    def load(self):
+        entries = {}
+        addresses = {}
+        apps = {}
+        for path in self.paths:
+            if not os.path.exists(path):
+                continue
+            with open(path, "r") as f:
+                data = json.load(f)
+            for app_id, entry in data.get("apps", {}).items():
+                key = (entry["label"], entry["category"])
+                apps[int(app_id)] = addresses[application_address(app_id)] = entries.setdefault(key, Counterparty(*key))
+            for address, entry in data.get("addresses", {}).items():
+                key = (entry["label"], entry["category"])
+                addresses[address] = entries.setdefault(key, Counterparty(*key))
+        self.addresses = addresses
+        self.apps = apps
+
+    def address(self, address):
+        return self.addresses.get(address)
+
+    def app(self, app_id):
+        return self.apps.get(app_id)
+
+    def __len__(self):
+        return len(self.addresses) + len(self.apps)
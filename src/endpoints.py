@@ -0,0 +1,192 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+
+import json_backend
+
+# Weight of the newest request in the moving averages of latency and error rate
+EWMA_ALPHA = 0.2
+# Latencies kept per endpoint for the hedge delay percentile
+LATENCY_WINDOW = 100
+# A hedge is only sent once the primary endpoint has this many latency samples
+HEDGE_MIN_SAMPLES = 10
+HEDGE_PERCENTILE = 95
+# Seconds an endpoint is skipped after a failure, doubled per consecutive failure up to the maximum
+COOLDOWN = 1.0
+MAX_COOLDOWN = 60.0
+
+# Errors that mark the endpoint unhealthy; the request is retried on the next endpoint
+FAILOVER_ERRORS = (requests.RequestException, json_backend.JSONDecodeError, TimeoutError)
+
+
+def is_client_error(error):
+    """
+    True for HTTP 4xx responses other than 429: the request itself is wrong (e.g. an
+    unknown account), so another endpoint would answer the same.
+    """
+    response = getattr(error, "response", None)
+    return (isinstance(error, requests.HTTPError) and response is not None
+            and 400 <= response.status_code < 500 and response.status_code != 429)
+
+
+def percentile(values, percent):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+
+class Endpoint:
+    """
+    One indexer base URL and its recent health: moving averages of latency (seconds)
+    and error rate, the last latencies, and a cooldown after failures.
+    """
+    def __init__(self, url):
+        self.url = url.rstrip("/")
+        self.latency = None
+        self.error_rate = 0.0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.requests = 0
+        self.errors = 0
+        self.hedges = 0
+        self.consecutive_errors = 0
+        self.cooldown_until = 0.0
+
+    def record_success(self, latency):
+        self.requests += 1
+        self.latency = latency if self.latency is None else self.latency + EWMA_ALPHA * (latency - self.latency)
+        self.error_rate -= EWMA_ALPHA * self.error_rate
+        self.latencies.append(latency)
+        self.consecutive_errors = 0
+
+    def record_error(self, now):
+        self.requests += 1
+        self.errors += 1
+        self.error_rate += EWMA_ALPHA * (1 - self.error_rate)
+        self.consecutive_errors += 1
+        self.cooldown_until = now + min(MAX_COOLDOWN, COOLDOWN * 2 ** (self.consecutive_errors - 1))
+
+    def score(self):
+        # Expected seconds per successful request; untried endpoints score 0 so each gets tried
+        if self.latency is None:
+            return 0.0
+        return self.latency / max(1.0 - self.error_rate, 0.01)
+
+    def stats(self):
+        return {
+            "url": self.url,
+            "latency_ms": None if self.latency is None else round(self.latency * 1000, 1),
+            "error_rate": round(self.error_rate, 3),
+            "requests": self.requests,
+            "errors": self.errors,
+            "hedges": self.hedges,
+        }
+
+
+class EndpointPool:
+    """
+    Routes indexer requests across several equivalent endpoints.
+
+    Each call goes to the healthiest endpoint (lowest latency over success rate, see
+    Endpoint.score), skipping endpoints cooling down after a failure unless all are. A
+    failed request fails over to the next endpoint; HTTP 4xx answers other than 429 are
+    raised as is. With `hedge`, a request still running after the primary endpoint's
+    95th percentile latency is also sent to the next endpoint, and the first success
+    wins. The pool is shared by all threads.
+    """
+    def __init__(self, urls, hedge=False, hedge_percentile=HEDGE_PERCENTILE, clock=time.monotonic):
+        if not urls:
+            raise ValueError("At least one indexer URL is required")
+        self.endpoints = [Endpoint(url) for url in dict.fromkeys(urls)]
+        self.hedge = hedge and len(self.endpoints) > 1
+        self.hedge_percentile = hedge_percentile
+        self.clock = clock
+        self.lock = threading.Lock()
+        self._executor = None
+
+    def __len__(self):
+        return len(self.endpoints)
+
+    def ranked(self):
+        """
+        Return the endpoints from healthiest to least healthy, those cooling down last.
+        """
+        now = self.clock()
+        with self.lock:
+            return sorted(self.endpoints, key=lambda endpoint: (endpoint.cooldown_until > now, endpoint.score()))
+
+    def hedge_delay(self, endpoint):
+        """
+        Seconds to wait for `endpoint` before hedging, or None without enough samples.
+        """
+        with self.lock:
+            if len(endpoint.latencies) < HEDGE_MIN_SAMPLES:
+                return None
+            return percentile(endpoint.latencies, self.hedge_percentile)
+
+    def _timed(self, fn, endpoint, session):
+        start = self.clock()
+        try:
+            result = fn(endpoint.url, session)
+        except FAILOVER_ERRORS as e:
+            with self.lock:
+                if is_client_error(e):
+                    endpoint.record_success(self.clock() - start)
+                else:
+                    endpoint.record_error(self.clock())
+            raise
+        with self.lock:
+            endpoint.record_success(self.clock() - start)
+        return result
+
+    def _hedged(self, fn, primary, secondary, session_factory):
+        if self._executor is None:
+            with self.lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(thread_name_prefix="indexer-hedge")
+        delay = self.hedge_delay(primary)
+        futures = [self._executor.submit(lambda: self._timed(fn, primary, session_factory()))]
+        done, _ = wait(futures, timeout=delay)
+        if not done:
+            with self.lock:
+                secondary.hedges += 1
+            futures.append(self._executor.submit(lambda: self._timed(fn, secondary, session_factory())))
+        error = None
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    return future.result()
+                except FAILOVER_ERRORS as e:
+                    if is_client_error(e):
+                        raise
+                    error = e
+        raise error
+
+    def call(self, fn, session, session_factory=None, hedge=True):
+        """
+        Run `fn(base_url, session)` against the healthiest endpoint, failing over to the
+        others in turn. Raises the last error if every endpoint fails.
+
+        Hedged requests run on pool threads with a session from `session_factory`; pass
+        hedge=False for requests that must stay on the caller's session (streams).
+        """
+        ranked = self.ranked()
+        hedge = hedge and self.hedge and session_factory is not None
+        error = None
+        for i, endpoint in enumerate(ranked):
+            try:
+                if hedge and i + 1 < len(ranked) and self.hedge_delay(endpoint) is not None:
+                    return self._hedged(fn, endpoint, ranked[i + 1], session_factory)
+                return self._timed(fn, endpoint, session)
+            except FAILOVER_ERRORS as e:
+                if is_client_error(e):
+                    raise
+                error = e
+        raise error
+
+    def stats(self):
+        with self.lock:
+            return [endpoint.stats() for endpoint in self.endpoints]
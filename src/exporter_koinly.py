@@ -2,29 +2,32 @@ import json
 import logging
 import os
 
-from staketaxcsv.common.Cache import Cache
-from staketaxcsv import settings_csv
-
 # Path to the Koinly null map file
 KOINLY_NULL_MAP_JSON = os.path.join(os.path.dirname(os.path.realpath(__file__)), "../_reports/koinly_null_map.json")
 LOCAL_MAP = "local_map"
+NULL_MAP_KEY = "koinly"
 
 
 class NullMap:
     """
     Handles Koinly-compatible null mappings for symbols.
     """
-    def __init__(self, json_path=None):
+    def __init__(self, json_path=None, use_cache=None, cache=None):
         self.null_map = []
-        self.cache = None
-        self.use_cache = settings_csv.DB_CACHE
+        self.cache = cache
+        if use_cache is None:
+            # Shared through the cache when one is configured (see cache.py)
+            from cache import CACHE_ENV_VAR
+            use_cache = cache is not None or bool(os.environ.get(CACHE_ENV_VAR))
+        self.use_cache = use_cache
         self.json_path = json_path if json_path else KOINLY_NULL_MAP_JSON
 
         logging.info("Koinly NullMap: use_cache=%s, json_path=%s", self.use_cache, self.json_path)
 
     def _cache(self):
         if not self.cache:
-            self.cache = Cache()
+            from cache import open_cache
+            self.cache = open_cache()
         return self.cache
 
     def load(self):
@@ -32,7 +35,8 @@ class NullMap:
         Load null mappings from cache or JSON file.
         """
         if self.use_cache:
-            self.null_map = self._cache().get_koinly_null_map()
+            from cache import NS_NULL_MAP
+            self.null_map = self._cache().get(NS_NULL_MAP, NULL_MAP_KEY)
             if not self.null_map:
                 self.null_map = []
         else:
@@ -48,7 +52,8 @@ class NullMap:
         Save null mappings to cache or JSON file.
         """
         if self.use_cache:
-            self._cache().set_koinly_null_map(self.null_map)
+            from cache import NS_NULL_MAP
+            self._cache().set(NS_NULL_MAP, NULL_MAP_KEY, self.null_map)
         else:
             if self.json_path == LOCAL_MAP:
                 return
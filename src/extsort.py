@@ -0,0 +1,64 @@
+import heapq
+import os
+import pickle
+import tempfile
+from itertools import islice
+from operator import itemgetter
+
+# Report row orders: oldest first, or as the indexer returned them (newest first)
+ORDER_CHRONOLOGICAL = "chronological"
+ORDER_INDEXER = "indexer"
+ORDERS = [ORDER_CHRONOLOGICAL, ORDER_INDEXER]
+
+# Rows kept in memory per sorted run
+RUN_SIZE = 100000
+
+# Chronological order of normalized rows; the txid breaks ties so output is deterministic
+ROW_ORDER = itemgetter("round", "intra_round_offset", "tx_hash")
+
+
+# Items pickled together; reading a run back holds one block per run in memory
+BLOCK_SIZE = 1024
+
+
+def _write_run(items, tmp_dir):
+    f = tempfile.TemporaryFile(dir=tmp_dir or os.environ.get("VOI_SORT_TMPDIR") or None)
+    for start in range(0, len(items), BLOCK_SIZE):
+        pickle.dump(items[start:start + BLOCK_SIZE], f, pickle.HIGHEST_PROTOCOL)
+    f.seek(0)
+    return f
+
+
+def _read_run(f):
+    while True:
+        try:
+            yield from pickle.load(f)
+        except EOFError:
+            return
+
+
+def external_sort(items, key=ROW_ORDER, run_size=RUN_SIZE, tmp_dir=None):
+    """
+    Yield `items` sorted by `key`, holding at most `run_size` items in memory.
+
+    Items are read in runs of `run_size`, each run sorted and spilled to a temporary
+    file, and the runs k-way merged with a heap. Input that fits in one run is sorted
+    in memory without touching disk. The sort is stable. Runs go to `tmp_dir`, else
+    VOI_SORT_TMPDIR, else the system temp directory.
+    """
+    items = iter(items)
+    run = sorted(islice(items, run_size), key=key)
+    if len(run) < run_size:
+        yield from run
+        return
+
+    files = []
+    try:
+        while run:
+            files.append(_write_run(run, tmp_dir))
+            run = sorted(islice(items, run_size), key=key)
+        yield from heapq.merge(*(_read_run(f) for f in files), key=key)
+    finally:
+        for f in files:
+            f.close()
+
@@ -0,0 +1,120 @@
+from ExporterTypes import (
+    CL_FIELDS,
+    CP_FIELDS,
+    CR_FIELDS,
+    DIVLY_FIELDS,
+    FORMAT_COINLEDGER,
+    FORMAT_COINPANDA,
+    FORMAT_COINTRACKER,
+    FORMAT_DEFAULT,
+    FORMAT_DIVLY,
+    FORMAT_KOINLY,
+    KOINLY_FIELDS,
+    ROW_FIELDS,
+)
+from formatters import Column, columns_from_fields, compile_formatter, date_transform, mapping_transform
+
+# Specs for the normalized rows built by voi_exporter.classify_transaction. The row
+# `label` is "sent", "received", "reward", "income" or "cost" (fee-only spend rows, see
+# portfolio.self_transfer_fees); each spec maps "cost" to an outgoing type.
+ISO_DATE = date_transform("%Y-%m-%d %H:%M:%S")
+US_DATE = date_transform("%m/%d/%Y %H:%M:%S")
+
+FORMAT_COLUMNS = {
+    FORMAT_DEFAULT: columns_from_fields(ROW_FIELDS, {
+        "timestamp": Column("", "timestamp", transform=ISO_DATE),
+        "tx_type": "tx_type",
+        "received_amount": "received_amount",
+        "received_currency": "received_currency",
+        "sent_amount": "sent_amount",
+        "sent_currency": "sent_currency",
+        "fee": "fee",
+        "fee_currency": "fee_currency",
+        "comment": "description",
+        "txid": "tx_hash",
+    }),
+    FORMAT_KOINLY: columns_from_fields(KOINLY_FIELDS + ["Asset ID", "Price (USD)"], {
+        "Date": Column("", "timestamp", transform=ISO_DATE),
+        "Sent Amount": "sent_amount",
+        "Sent Currency": "sent_currency",
+        "Received Amount": "received_amount",
+        "Received Currency": "received_currency",
+        "Fee Amount": "fee",
+        "Fee Currency": "fee_currency",
+        "Net Worth Amount": "net_worth_amount",
+        "Net Worth Currency": "net_worth_currency",
+        "Label": "label",
+        "Description": "description",
+        "TxHash": "tx_hash",
+        "Asset ID": "asset_id",
+    }),
+    FORMAT_COINPANDA: columns_from_fields(CP_FIELDS, {
+        "Timestamp (UTC)": Column("", "timestamp", transform=ISO_DATE),
+        "Type": Column("", "label", transform=mapping_transform({"sent": "Send", "cost": "Send"}, "Receive")),
+        "Sent Amount": "sent_amount",
+        "Sent Currency": "sent_currency",
+        "Received Amount": "received_amount",
+        "Received Currency": "received_currency",
+        "Fee Amount": "fee",
+        "Fee Currency": "fee_currency",
+        "Label": Column("", "label", transform=mapping_transform(
+            {"reward": "Staking", "income": "Income", "cost": "Cost"})),
+        "Description": "description",
+        "TxHash": "tx_hash",
+    }),
+    FORMAT_COINTRACKER: columns_from_fields(CR_FIELDS, {
+        "Date": Column("", "timestamp", transform=US_DATE),
+        "Received Quantity": "received_amount",
+        "Received Currency": "received_currency",
+        "Sent Quantity": "sent_amount",
+        "Sent Currency": "sent_currency",
+        "Fee Amount": "fee",
+        "Fee Currency": "fee_currency",
+        "Tag": Column("", "label", transform=mapping_transform({"reward": "staked", "income": "income"})),
+        "Transaction ID": "tx_hash",
+    }),
+    FORMAT_COINLEDGER: columns_from_fields(CL_FIELDS, {
+        "Date (UTC)": Column("", "timestamp", transform=US_DATE),
+        "Platform (Optional)": Column("", None, "VOI"),
+        "Asset Sent": "sent_currency",
+        "Amount Sent": "sent_amount",
+        "Asset Received": "received_currency",
+        "Amount Received": "received_amount",
+        "Fee Currency (Optional)": "fee_currency",
+        "Fee Amount (Optional)": "fee",
+        "Type": Column("", "label", transform=mapping_transform(
+            {"sent": "Withdrawal", "cost": "Withdrawal", "received": "Deposit", "reward": "Staking",
+             "income": "Income"})),
+        "Description (Optional)": "description",
+        "TxHash (Optional)": "tx_hash",
+    }),
+    FORMAT_DIVLY: columns_from_fields(DIVLY_FIELDS, {
+        "date": Column("", "timestamp", transform=date_transform("%Y-%m-%d")),
+        "time (UTC)": Column("", "timestamp", transform=date_transform("%H:%M:%S", "00:00:00")),
+        "transaction_type": Column("", "label", transform=mapping_transform(
+            {"sent": "withdrawal", "cost": "withdrawal"}, "deposit")),
+        "label": Column("", "label", transform=mapping_transform({"reward": "staking", "income": "income"})),
+        "sent_amount": "sent_amount",
+        "sent_currency": "sent_currency",
+        "received_amount": "received_amount",
+        "received_currency": "received_currency",
+        "fee_amount": "fee",
+        "fee_currency": "fee_currency",
+        "custom_description": "description",
+        "tx_hash": "tx_hash",
+    }),
+}
+
+_compiled = {}
+
+
+def get_formatter(format):
+    """
+    Return the compiled row formatter of a report format (compiled on first use).
+
+    Raises KeyError for formats without a spec.
+    """
+    formatter = _compiled.get(format)
+    if formatter is None:
+        formatter = _compiled[format] = compile_formatter(FORMAT_COLUMNS[format], f"format_{format}_row")
+    return formatter
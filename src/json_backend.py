@@ -0,0 +1,180 @@
+import codecs
+import json
+import logging
+import time
+
+# Pick the fastest available JSON parser: orjson, then simplejson, then the stdlib
+try:
+    import orjson
+
+    BACKEND = "orjson"
+    JSONDecodeError = orjson.JSONDecodeError
+
+    def loads(data):
+        """
+        Parse a JSON document from bytes or str.
+        """
+        return orjson.loads(data)
+
+except ImportError:
+    try:
+        import simplejson as _json
+
+        BACKEND = "simplejson"
+    except ImportError:
+        _json = json
+        BACKEND = "json"
+    JSONDecodeError = _json.JSONDecodeError
+
+    def loads(data):
+        """
+        Parse a JSON document from bytes or str.
+        """
+        if isinstance(data, (bytes, bytearray)):
+            data = data.decode("utf-8")
+        return _json.loads(data)
+
+
+_WHITESPACE = " \t\n\r"
+
+
+class PageStream:
+    """
+    Incrementally parses an indexer page, yielding the items of one top-level array.
+
+    Only the current item is materialized; the raw page is consumed chunk by chunk.
+    Other top-level fields (e.g. `next-token`) are collected into `fields` and are
+    complete once iteration has finished.
+    """
+    def __init__(self, chunks, array_key="transactions"):
+        self.chunks = iter(chunks)
+        self.array_key = array_key
+        self.fields = {}
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._raw_decode = json.JSONDecoder().raw_decode
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self):
+        """
+        Append the next chunk to the buffer. Returns False once the input is exhausted.
+        """
+        if self._eof:
+            return False
+        # Drop consumed text so the buffer stays around one item in size
+        self._buffer = self._buffer[self._pos:]
+        self._pos = 0
+        for chunk in self.chunks:
+            if chunk:
+                self._buffer += self._decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+                return True
+        self._buffer += self._decoder.decode(b"", final=True)
+        self._eof = True
+        return False
+
+    def _skip_whitespace(self):
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer) or not self._fill():
+                return
+
+    def _expect(self, chars):
+        """
+        Consume and return the next non-whitespace character, which must be one of chars.
+        """
+        self._skip_whitespace()
+        if self._pos >= len(self._buffer):
+            raise JSONDecodeError(f"Expected one of {chars!r}, got end of input", self._buffer, self._pos)
+        char = self._buffer[self._pos]
+        if char not in chars:
+            raise JSONDecodeError(f"Expected one of {chars!r}", self._buffer, self._pos)
+        self._pos += 1
+        return char
+
+    def _value(self):
+        """
+        Decode the next complete JSON value, reading more input as needed.
+        """
+        self._skip_whitespace()
+        while True:
+            try:
+                value, end = self._raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError as e:
+                if self._fill():
+                    continue
+                raise JSONDecodeError(e.msg, e.doc, e.pos) from e
+            # A number may be cut off at the chunk boundary; make sure it has ended
+            if end == len(self._buffer) and not self._eof and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def __iter__(self):
+        self._expect("{")
+        self._skip_whitespace()
+        if self._buffer[self._pos:self._pos + 1] == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self._value()
+            self._expect(":")
+            if key == self.array_key:
+                self._expect("[")
+                self._skip_whitespace()
+                if self._buffer[self._pos:self._pos + 1] == "]":
+                    self._pos += 1
+                else:
+                    while True:
+                        yield self._value()
+                        if self._expect(",]") == "]":
+                            break
+            else:
+                self.fields[key] = self._value()
+            if self._expect(",}") == "}":
+                return
+
+
+def _benchmark_page(count):
+    """
+    Build a synthetic indexer page with app-call heavy transactions.
+    """
+    transactions = []
+    for i in range(count):
+        transactions.append({
+            "id": f"TX{i:052d}",
+            "confirmed-round": 1000000 + i,
+            "round-time": 1700000000 + 3 * i,
+            "fee": 1000,
+            "sender": "A" * 58,
+            "tx-type": "appl",
+            "note": "aGVsbG8gd29ybGQ=",
+            "payment-transaction": {"amount": i, "receiver": "B" * 58},
+            "global-state-delta": [{"key": "a2V5", "value": {"action": 2, "uint": i}}] * 8,
+            "logs": ["gAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA="] * 4,
+        })
+    return json.dumps({"current-round": 2000000, "next-token": "abc", "transactions": transactions}).encode("utf-8")
+
+
+def _best_of(func, repeat=3):
+    """
+    Return the fastest wall-clock time of several runs.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    page = _benchmark_page(5000)
+    logging.info("Benchmark page: %.1f MB, backend=%s", len(page) / 1e6, BACKEND)
+    logging.info("stdlib json.loads: %.3fs", _best_of(lambda: json.loads(page)))
+    logging.info("%s loads: %.3fs", BACKEND, _best_of(lambda: loads(page)))
+    logging.info("PageStream, 64KB chunks: %.3fs", _best_of(
+        lambda: sum(1 for _ in PageStream(page[i:i + 65536] for i in range(0, len(page), 65536)))
+    ))
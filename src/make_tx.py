@@ -23,6 +23,10 @@ from staketaxcsv.common.ExporterTypes import (
 from staketaxcsv.settings_csv import DONATION_WALLETS
 
 
+# Each builder returns one Row; to build many rows at once without a Row per event,
+# see row_buffer.RowBuffer, which takes the same arguments as batches of Events.
+
+
 def make_swap_tx(txinfo, sent_amount, sent_currency, received_amount, received_currency, txid=None, empty_fee=False, z_index=0):
     """
     Creates a transaction for a token swap.
@@ -46,11 +50,10 @@ def make_reward_tx(txinfo, reward_amount, reward_currency, txid=None, empty_fee=
 
 def make_transfer_in_tx(txinfo, received_amount, received_currency, z_index=0):
     """
-    Creates a transaction for a transfer received by the wallet.
+    Creates a transaction for a transfer received by the wallet (the sender paid the fee).
     """
-    txinfo.fee = ""
-    txinfo.fee_currency = ""
-    return _make_tx_received(txinfo, received_amount, received_currency, TX_TYPE_TRANSFER, z_index=z_index)
+    return _make_tx_received(txinfo, received_amount, received_currency, TX_TYPE_TRANSFER, empty_fee=True,
+                             z_index=z_index)
 
 
 def make_transfer_out_tx(txinfo, sent_amount, sent_currency, dest_address=None, z_index=0):
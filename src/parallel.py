@@ -0,0 +1,126 @@
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from row_buffer import RowBuffer
+from shared_tables import AssetTable, PriceTable
+
+# Transactions per chunk sent to a worker; chunks only end where the round changes
+CHUNK_SIZE = 5000
+# Below this many transactions classification stays in-process: starting workers costs more
+PARALLEL_MIN_TRANSACTIONS = 20000
+
+# Set in each worker by _init_worker
+_wallet_address = None
+_assets = None
+_reward_senders = frozenset()
+_counterparties = None
+_prices = None
+# The transactions being classified, when workers are forked from the parent
+_transactions = None
+
+
+def worker_count(workers):
+    """
+    Resolve the workers option: 0 means one per CPU.
+    """
+    return workers if workers > 0 else os.cpu_count() or 1
+
+
+def transaction_asset_id(tx):
+    return str(tx.get("asset-transfer-transaction", {}).get("asset-id", 0))
+
+
+def chunk_bounds(transactions, chunk_size=CHUNK_SIZE):
+    """
+    Split a list of transactions into (start, end) ranges of about `chunk_size`, cut only
+    between rounds.
+
+    A group's transactions share a round, so no chunk splits a round or a group.
+    """
+    start = 0
+    count = len(transactions)
+    while start < count:
+        end = min(start + chunk_size, count)
+        while end < count and transactions[end].get("confirmed-round") == transactions[end - 1].get("confirmed-round"):
+            end += 1
+        yield start, end
+        start = end
+
+
+def _init_worker(wallet_address, assets, reward_senders, counterparties, prices, transactions):
+    global _wallet_address, _assets, _reward_senders, _counterparties, _prices, _transactions
+    _wallet_address = wallet_address
+    _assets = assets
+    _reward_senders = reward_senders
+    _counterparties = counterparties
+    _prices = prices
+    _transactions = transactions
+
+
+def _classify_chunk(chunk):
+    # Imported here so the pool can start workers without the parent's __main__
+    from voi_exporter import NORMALIZED_FIELDS, transaction_rows
+
+    if isinstance(chunk, tuple):
+        chunk = _transactions[chunk[0]:chunk[1]]
+    rows = []
+    for tx in chunk:
+        rows += transaction_rows(tx, _wallet_address, _assets, None, _reward_senders, _counterparties, _prices)
+    # Sent back by column: one list per field pickles smaller than a dict per row
+    buffer = RowBuffer(len(rows), NORMALIZED_FIELDS)
+    buffer.add_rows(rows)
+    return buffer
+
+
+def _pool_context():
+    # Forked workers inherit the initializer arguments without pickling, so the transactions
+    # stay in shared (copy-on-write) memory and only chunk bounds cross the process boundary.
+    # A fork copies locks held by other threads (caches, the registry, the request limiter)
+    # in their held state, so with other threads running workers are started fresh instead.
+    methods = multiprocessing.get_all_start_methods()
+    if "fork" in methods and threading.active_count() == 1:
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def classify_parallel(transactions, wallet_address, assets, reward_senders=frozenset(), workers=0,
+                      chunk_size=CHUNK_SIZE, counterparties=None, prices=None):
+    """
+    Classify transactions in a process pool, yielding rows in the input order.
+
+    `assets` must hold every asset and token contract id the transactions use ({id:
+    {"unit-name", "decimals"}}, or an AssetTable); workers only read it, so they never
+    query the registry or indexer. A dict is written to a memory-mapped AssetTable
+    first, which workers share instead of each holding a copy. A PriceStore, if given
+    to value the rows, is written to a PriceTable the same way. The CounterpartyIndex,
+    if any, is handed to each worker once when the pool starts. Chunks are cut at round
+    boundaries; each chunk's rows come back as a RowBuffer's columns and are reassembled
+    in order. Where processes can be forked and no other thread is running, workers read
+    the transactions from the parent's memory instead of receiving them.
+    """
+    transactions = transactions if isinstance(transactions, list) else list(transactions)
+    context = _pool_context()
+    bounds = chunk_bounds(transactions, chunk_size)
+    if context.get_start_method() == "fork":
+        shared, chunks = transactions, bounds
+    else:
+        shared, chunks = None, (transactions[start:end] for start, end in bounds)
+    with tempfile.TemporaryDirectory(prefix="voi-tables-") as tmp_dir:
+        table = assets if isinstance(assets, AssetTable) else AssetTable.write(os.path.join(tmp_dir, "assets"), assets)
+        price_table = prices
+        if prices is not None and not isinstance(prices, PriceTable):
+            price_table = PriceTable.write(os.path.join(tmp_dir, "prices"), prices)
+        try:
+            with ProcessPoolExecutor(worker_count(workers), mp_context=context, initializer=_init_worker,
+                                     initargs=(wallet_address, table, frozenset(reward_senders), counterparties,
+                                               price_table, shared)) as executor:
+                for buffer in executor.map(_classify_chunk, chunks):
+                    yield from buffer.dicts()
+        finally:
+            if table is not assets:
+                table.close()
+            if price_table is not prices:
+                price_table.close()
@@ -0,0 +1,69 @@
+import threading
+from collections import Counter
+
+from ExporterTypes import TX_TYPE_SELF_TRANSFER, TX_TYPE_SPEND, TX_TYPE_TRANSFER
+
+
+class PortfolioIndex:
+    """
+    Finds transfers between wallets of one portfolio, so tax reports do not count an
+    internal move as a disposal in one wallet and an acquisition in another.
+
+    A transfer whose sender and receiver are both portfolio wallets is a self-transfer.
+    Membership is a set lookup per row, so marking is one linear pass however many
+    wallets and rows there are. The index keeps each self-transfer's txid (with the
+    wallets whose exports contained it) and a count per (sender, receiver) pair; one
+    index is shared by the exports of all the portfolio's wallets (which may run in
+    parallel), so these span the whole portfolio.
+    """
+    def __init__(self, wallets):
+        self.wallets = frozenset(wallets)
+        self.txids = {}
+        self.pairs = Counter()
+        self.lock = threading.Lock()
+
+    def is_self_transfer(self, row):
+        return (row["tx_type"] == TX_TYPE_TRANSFER
+                and row["sender"] in self.wallets and row["receiver"] in self.wallets)
+
+    def summary(self):
+        return f"Found {len(self.txids)} self-transfers between {len(self.pairs)} pairs of own wallets."
+
+    def mark(self, wallet_address, rows):
+        """
+        Yield `wallet_address`'s rows with self-transfers retyped as TX_TYPE_SELF_TRANSFER.
+        """
+        for row in rows:
+            if not self.is_self_transfer(row):
+                yield row
+                continue
+            with self.lock:
+                seen_by = self.txids.get(row["tx_hash"])
+                if seen_by is None:
+                    seen_by = self.txids[row["tx_hash"]] = set()
+                    self.pairs[(row["sender"], row["receiver"])] += 1
+                seen_by.add(wallet_address)
+            row = dict(row)
+            row["tx_type"] = TX_TYPE_SELF_TRANSFER
+            row["label"] = "transfer"
+            row["description"] = f"Transfer between own wallets {row['sender']} -> {row['receiver']}"
+            yield row
+
+
+def self_transfer_fees(rows):
+    """
+    Prepare marked rows for tax formats: self-transfers are dropped, except that the
+    sending side's network fee is kept as a fee-only spend row.
+    """
+    for row in rows:
+        if row["tx_type"] != TX_TYPE_SELF_TRANSFER:
+            yield row
+        elif row["sent_amount"] != "" and row["fee"]:
+            row = dict(row)
+            row["tx_type"] = TX_TYPE_SPEND
+            row["label"] = "cost"
+            row["sent_amount"] = ""
+            row["received_amount"] = ""
+            row["raw_amount"] = 0
+            row["description"] = f"Network fee: {row['description']}"
+            yield row
@@ -0,0 +1,34 @@
+import logging
+import os
+
+
+def enrich_koinly_csv(transactions_file_path, historical_file_path, output_file_path=None):
+    """
+    Add historical USD prices and net worth to a Koinly CSV (same output as reports/voipu-koinly.py).
+
+    `historical_file_path` is a CoinGecko historical data export (snapped_at, price).
+    The output is written next to the input with a 'pu_' prefix unless a path is given.
+    """
+    # pandas is only needed here; importing it lazily keeps plain exports fast to start
+    import pandas as pd
+
+    historical_data = pd.read_csv(historical_file_path)
+    price_map = dict(zip(pd.to_datetime(historical_data["snapped_at"]).dt.date, historical_data["price"]))
+
+    transactions = pd.read_csv(transactions_file_path)
+    dates = pd.to_datetime(transactions["Date"]).dt.date
+    prices = dates.map(price_map).fillna(0)
+
+    sent = pd.to_numeric(transactions["Sent Amount"], errors="coerce").fillna(0)
+    received = pd.to_numeric(transactions["Received Amount"], errors="coerce").fillna(0)
+    amount = sent.where(sent > 0, received.where(received > 0, 0))
+
+    transactions["Price (USD)"] = prices
+    transactions["Net Worth Amount"] = amount * prices
+
+    if not output_file_path:
+        directory, original_file_name = os.path.split(transactions_file_path)
+        output_file_path = os.path.join(directory, "pu_" + original_file_name)
+    transactions.to_csv(output_file_path, index=False)
+    logging.info("Updated transactions saved to %s", output_file_path)
+    return output_file_path
@@ -0,0 +1,74 @@
+import csv
+from bisect import bisect_right
+from datetime import datetime, timezone
+
+
+def parse_snapped_at(value):
+    """
+    Parse a CoinGecko `snapped_at` value ("2024-03-01 00:00:00 UTC") to a UNIX timestamp.
+    """
+    return int(datetime.strptime(value[:19], "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc).timestamp())
+
+
+class PriceStore:
+    """
+    Local USD price history per currency, loaded from CoinGecko historical data exports.
+
+    Each currency's snapshots are kept as parallel sorted timestamp/price lists, so a
+    lookup is one bisect. The price at a time is the last snapshot at or before it.
+    """
+    def __init__(self):
+        self.series = {}
+
+    @classmethod
+    def from_files(cls, paths):
+        """
+        Load {currency: CoinGecko CSV path}.
+        """
+        store = cls()
+        for currency, path in paths.items():
+            store.load_coingecko(currency, path)
+        return store
+
+    def load_coingecko(self, currency, path):
+        with open(path, newline="") as f:
+            snapshots = [(parse_snapped_at(row["snapped_at"]), float(row["price"]))
+                         for row in csv.DictReader(f) if row.get("price")]
+        self.add(currency, snapshots)
+
+    def add(self, currency, snapshots):
+        """
+        Add (timestamp, price) snapshots for a currency.
+        """
+        # Later snapshots for the same timestamp replace earlier ones
+        prices = dict(zip(*self.series.get(currency, ([], []))))
+        prices.update(snapshots)
+        merged = sorted(prices.items())
+        self.series[currency] = ([timestamp for timestamp, _ in merged], [price for _, price in merged])
+
+    def price_at(self, currency, timestamp):
+        """
+        Return the USD price of `currency` at `timestamp`, or None if it is not known.
+        """
+        series = self.series.get(currency)
+        if series is None:
+            return None
+        pos = bisect_right(series[0], timestamp)
+        return series[1][pos - 1] if pos else None
+
+    def price_span(self, currency, timestamp):
+        """
+        Return (price, start, end): the price at `timestamp` and the interval [start, end)
+        over which it applies, so callers reading in time order can skip most lookups.
+        """
+        series = self.series.get(currency)
+        if series is None:
+            return None, float("-inf"), float("inf")
+        timestamps = series[0]
+        pos = bisect_right(timestamps, timestamp)
+        start = timestamps[pos - 1] if pos else float("-inf")
+        end = timestamps[pos] if pos < len(timestamps) else float("inf")
+        return (series[1][pos - 1] if pos else None), start, end
+
+    def __contains__(self, currency):
+        return currency in self.series
@@ -1,11 +1,15 @@
 import logging
 import time
 from requests.exceptions import JSONDecodeError, Timeout, ConnectionError
+import json_backend
 
 # Define request types
 REQUEST_TYPE_GET = "GET"
 REQUEST_TYPE_POST = "POST"
 
+# Chunk size used when streaming response bodies
+STREAM_CHUNK_SIZE = 65536
+
 
 def get_with_retries(session, url, params=None, headers=None, retries=4, backoff_factor=2, timeout=10):
     """
@@ -16,6 +20,21 @@ def get_with_retries(session, url, params=None, headers=None, retries=4, backoff
     )
 
 
+def get_stream_with_retries(session, url, params=None, headers=None, retries=4, backoff_factor=2, timeout=10,
+                            array_key="transactions"):
+    """
+    Perform a streaming GET request with retry logic.
+
+    Returns a json_backend.PageStream yielding the items of `array_key` as the body
+    arrives. Retries cover establishing the response only; errors while the body is
+    being read propagate to the caller.
+    """
+    response = _make_request_with_retries(
+        REQUEST_TYPE_GET, session, url, params, headers, retries, backoff_factor, timeout, stream=True
+    )
+    return json_backend.PageStream(response.iter_content(STREAM_CHUNK_SIZE), array_key)
+
+
 def post_with_retries(session, url, data=None, headers=None, retries=3, backoff_factor=1, timeout=10):
     """
     Perform a POST request with retry logic.
@@ -25,23 +44,28 @@ def post_with_retries(session, url, data=None, headers=None, retries=3, backoff_
     )
 
 
-def _make_request_with_retries(request_type, session, url, data, headers, retries, backoff_factor, timeout):
+def _make_request_with_retries(request_type, session, url, data, headers, retries, backoff_factor, timeout,
+                               stream=False):
     """
     Generic function to handle GET and POST requests with retries.
+
+    Returns the parsed JSON body, or the raw response when `stream` is set.
     """
     for attempt in range(retries):
         try:
             if request_type == REQUEST_TYPE_GET:
-                response = session.get(url, params=data, headers=headers, timeout=timeout)
+                response = session.get(url, params=data, headers=headers, timeout=timeout, stream=stream)
             elif request_type == REQUEST_TYPE_POST:
                 response = session.post(url, json=data, headers=headers, timeout=timeout)
             else:
                 raise ValueError(f"Unsupported request type: {request_type}")
 
             response.raise_for_status()  # Raise an exception for HTTP errors
-            return response.json()  # Return parsed JSON response
+            if stream:
+                return response
+            return json_backend.loads(response.content)  # Return parsed JSON response
 
-        except (JSONDecodeError, Timeout, TimeoutError, ConnectionError) as e:
+        except (JSONDecodeError, json_backend.JSONDecodeError, Timeout, TimeoutError, ConnectionError) as e:
             logging.warning(f"Request attempt {attempt + 1} failed: {e}")
             if attempt < retries - 1:
                 wait_time = backoff_factor * (2 ** attempt)
@@ -0,0 +1,91 @@
+import logging
+
+from balances import BalanceEngine
+
+# Stop bisecting once the suspect window is this many rounds; refetching it is cheaper than more probes
+MIN_WINDOW_ROUNDS = 5000
+
+# Give up after this many refetched windows
+MAX_REPAIRS = 10
+
+
+def compare_balances(computed, actual):
+    """
+    Return {asset_id: (computed, actual)} for every asset whose balances differ.
+    """
+    mismatches = {}
+    for asset_id in set(computed) | set(actual):
+        computed_balance = computed.get(asset_id, 0)
+        actual_balance = actual.get(asset_id, 0)
+        if computed_balance != actual_balance:
+            mismatches[asset_id] = (computed_balance, actual_balance)
+    return mismatches
+
+
+def find_missing_window(computed_at_round, actual_at_round, lo, hi, min_window=MIN_WINDOW_ROUNDS):
+    """
+    Bisect (lo, hi] down to a window where computed and actual balances start to differ.
+
+    Balances must agree at `lo` and differ at `hi`; each probe compares
+    computed_at_round(r) with actual_at_round(r). Returns the (lo, hi) window, whose
+    rounds lo + 1 .. hi contain the first missing transaction.
+    """
+    while hi - lo > min_window:
+        mid = (lo + hi) // 2
+        if computed_at_round(mid) == actual_at_round(mid):
+            lo = mid
+        else:
+            hi = mid
+    return lo, hi
+
+
+class Reconciler:
+    """
+    Checks an export against on-chain account state and repairs pagination gaps.
+
+    Network access is injected:
+      fetch_holdings() -> (round, {asset_id: balance}) for the account's current state
+      fetch_balance_at_round(asset_id, round) -> historical balance of one asset
+      fetch_range(min_round, max_round) -> transactions in that inclusive round range
+    """
+    def __init__(self, wallet_address, fetch_holdings, fetch_balance_at_round, fetch_range,
+                 min_window=MIN_WINDOW_ROUNDS, max_repairs=MAX_REPAIRS):
+        self.wallet_address = wallet_address
+        self.fetch_holdings = fetch_holdings
+        self.fetch_balance_at_round = fetch_balance_at_round
+        self.fetch_range = fetch_range
+        self.min_window = min_window
+        self.max_repairs = max_repairs
+
+    def run(self, transactions):
+        """
+        Reconcile and repair. Returns (transactions, mismatches remaining, windows refetched).
+        """
+        transactions = list(transactions)
+        seen = {tx.get("id") for tx in transactions}
+        windows = []
+        current_round, actual = self.fetch_holdings()
+
+        while True:
+            engine = BalanceEngine(self.wallet_address)
+            engine.add_transactions(transactions)
+            mismatches = compare_balances(engine.balances_at_round(current_round), actual)
+            if not mismatches or len(windows) >= self.max_repairs:
+                return transactions, mismatches, windows
+
+            asset_id = min(mismatches)
+            series = engine.build().get(asset_id)
+            lo, hi = find_missing_window(
+                lambda round_number: series.at_round(round_number) if series else 0,
+                lambda round_number: self.fetch_balance_at_round(asset_id, round_number),
+                0, current_round, self.min_window,
+            )
+            logging.info("Reconcile %s: asset %s diverges in rounds %d-%d, refetching",
+                         self.wallet_address, asset_id, lo + 1, hi)
+            found = [tx for tx in self.fetch_range(lo + 1, hi) if tx.get("id") not in seen]
+            windows.append((lo + 1, hi, len(found)))
+            if not found:
+                # The window holds nothing new; the difference is not a fetch gap
+                return transactions, mismatches, windows
+            seen.update(tx.get("id") for tx in found)
+            transactions.extend(found)
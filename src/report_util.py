@@ -1,13 +1,33 @@
 import argparse
 import datetime
 import logging
-import os
-from voi_exporter import export_data
-from staketaxcsv.common.ExporterTypes import FORMAT_DEFAULT, FORMATS
-from staketaxcsv.settings_csv import REPORTS_DIR
+from concurrent.futures import ThreadPoolExecutor
+from cli_options import (
+    add_balance_arguments,
+    add_classification_arguments,
+    add_cost_basis_arguments,
+    add_fetch_arguments,
+    add_filter_arguments,
+    add_output_arguments,
+    add_range_arguments,
+    balance_options,
+    classification_options,
+    cost_basis_options,
+    fetch_options,
+    filter_options,
+    output_options,
+    range_options,
+)
+from concurrency import DEFAULT_MAXIMUM
+from portfolio import PortfolioIndex
+from ExporterTypes import FORMAT_BALANCES_CALCULATED, FORMAT_DEFAULT, FORMAT_KOINLY, FORMATS
+
+# Heavy modules (voi_exporter and its HTTP stack, pandas for price enrichment) are imported
+# inside the functions that need them so argument parsing and --help start instantly.
 
 ALL = "all"
 DEBUG_ENV_VAR = "STAKETAX_DEBUG_CACHE"
+REPORTS_DIR = "reports"
 
 
 def main_default():
@@ -22,10 +42,39 @@ def main_default():
 def run_report(wallet_address, export_format, options):
     """
     Generates reports based on the provided wallet address, export format, and options.
+
+    With portfolio wallets, reports are generated for every wallet of the portfolio.
+    The wallets are exported concurrently; their indexer requests share the exporter's
+    adaptive concurrency budget (max_concurrency).
+    """
+    wallets = [wallet_address]
+    portfolio = None
+    if options.get("portfolio"):
+        wallets += [wallet for wallet in options["portfolio"] if wallet != wallet_address]
+        # One index for the whole run, so self-transfers are counted across the portfolio
+        portfolio = PortfolioIndex(wallets)
+        options = dict(options, portfolio=wallets, portfolio_index=portfolio)
+    if len(wallets) == 1:
+        run_wallet(wallet_address, export_format, options)
+    else:
+        workers = min(len(wallets), options.get("max_concurrency") or DEFAULT_MAXIMUM)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="wallet") as executor:
+            for wallet in wallets:
+                executor.submit(run_wallet, wallet, export_format, options)
+    if portfolio is not None:
+        print(portfolio.summary())
+
+    from voi_exporter import print_fetch_metrics
+    print_fetch_metrics()
+
+
+def run_wallet(wallet_address, export_format, options):
+    """
+    Generates one wallet's reports.
     """
     if options.get("historical"):
-        # Placeholder for historical balance processing, if implemented
         print(f"Generating historical balances for wallet {wallet_address}")
+        generate_csv(wallet_address, FORMAT_BALANCES_CALCULATED, options)
     elif export_format == ALL:
         # Generate reports in all available formats
         for fmt in FORMATS:
@@ -39,12 +88,34 @@ def generate_csv(wallet_address, export_format, options):
     """
     Generates a CSV report for a specific format and wallet address.
     """
-    path = os.path.join(REPORTS_DIR, f"{wallet_address}.{export_format}.csv")
+    from voi_exporter import export_data
+
     try:
-        export_data(export_format, wallet_address)
-        print(f"Report generated successfully: {path}")
+        paths = export_data(export_format, wallet_address, options)
+        for path in paths:
+            print(f"Report generated successfully: {path}")
     except Exception as e:
         logging.error(f"Error generating report for wallet {wallet_address} in format {export_format}: {e}")
+        return
+
+    if options.get("prices") and export_format == FORMAT_KOINLY and paths:
+        enrich_prices(paths[0], options["prices"])
+
+
+def enrich_prices(koinly_path, historical_file_path):
+    """
+    Add historical USD prices to a Koinly CSV (plain or compressed).
+    """
+    from price_enrichment import enrich_koinly_csv
+
+    if koinly_path.endswith(".xlsx"):
+        logging.error(f"Prices can only be added to CSV output, not {koinly_path}")
+        return
+    try:
+        output_path = enrich_koinly_csv(koinly_path, historical_file_path)
+        print(f"Price-enriched report generated: {output_path}")
+    except (IOError, KeyError, ValueError) as e:
+        logging.error(f"Error adding prices to {koinly_path}: {e}")
 
 
 def parse_args():
@@ -67,7 +138,7 @@ def parse_args():
         "--historical",
         action="store_true",
         default=False,
-        help="Generate historical balances report",
+        help="Generate a balances report (see --balance-date and --year-end)",
     )
     parser.add_argument(
         "--debug",
@@ -80,6 +151,13 @@ def parse_args():
         type=int,
         help="Maximum number of transactions to process",
     )
+    add_range_arguments(parser)
+    add_filter_arguments(parser)
+    add_fetch_arguments(parser)
+    add_balance_arguments(parser)
+    add_classification_arguments(parser)
+    add_cost_basis_arguments(parser)
+    add_output_arguments(parser)
 
     args = parser.parse_args()
 
@@ -91,6 +169,13 @@ def parse_args():
         logging.basicConfig(level=logging.DEBUG)
     if args.limit:
         options["limit"] = args.limit
+    options.update(range_options(args))
+    options.update(filter_options(args))
+    options.update(fetch_options(args))
+    options.update(balance_options(args))
+    options.update(classification_options(args))
+    options.update(cost_basis_options(args))
+    options.update(output_options(args))
 
     return args.wallet_address, args.format, options
 
@@ -0,0 +1,159 @@
+import json
+import logging
+import os
+from bisect import bisect_left
+
+# Seconds per bucket of the index: only the first and last known round of each are kept
+POINT_INTERVAL = 86400
+
+
+def compact_points(points):
+    """
+    Keep the first and last of each POINT_INTERVAL's points (sorted (round, timestamp) pairs).
+
+    The kept pairs still bracket every bucket boundary as tightly as the full list, so
+    date lookups at day granularity lose nothing, and the index grows by at most two
+    points a day instead of one per transaction.
+    """
+    kept = []
+    for i, point in enumerate(points):
+        bucket = point[1] // POINT_INTERVAL
+        if (0 < i < len(points) - 1 and points[i - 1][1] // POINT_INTERVAL == bucket
+                and points[i + 1][1] // POINT_INTERVAL == bucket):
+            continue
+        kept.append(point)
+    return kept
+
+
+class RoundIndex:
+    """
+    Local round <-> timestamp index used to translate date ranges into round ranges.
+
+    The (round, round-time) pairs seen while fetching transactions or probing block
+    headers are recorded, so later date lookups need few or no extra API calls. The
+    index is kept sparse (see compact_points).
+    """
+    def __init__(self, json_path=None):
+        self.json_path = json_path
+        self.rounds = []  # Sorted round numbers
+        self.timestamps = []  # round-time of the matching round (non-decreasing)
+
+    def load(self):
+        """
+        Load the index from the JSON file, if present.
+        """
+        if self.json_path and os.path.exists(self.json_path):
+            try:
+                with open(self.json_path, "r") as f:
+                    points = json.load(f).get("points", [])
+            except (ValueError, IOError) as e:
+                logging.warning("Ignoring unreadable round index %s: %s", self.json_path, e)
+                return
+            self.add_points(points)
+
+    def flush(self):
+        """
+        Save the index to the JSON file.
+
+        The file is replaced atomically. A failed write (read-only install, full disk) is
+        logged and leaves the previous file; the index is only an optimization.
+        """
+        if not self.json_path:
+            return
+        self.add_points(())
+        tmp_path = f"{self.json_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump({"points": list(zip(self.rounds, self.timestamps))}, f)
+            os.replace(tmp_path, self.json_path)
+        except OSError as e:
+            logging.warning("Could not save round index %s: %s", self.json_path, e)
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def add(self, round_number, timestamp):
+        """
+        Record the timestamp of one round (a probed block header); use add_points for batches.
+        """
+        if round_number is None or timestamp is None:
+            return
+        pos = bisect_left(self.rounds, round_number)
+        if pos < len(self.rounds) and self.rounds[pos] == round_number:
+            return
+        self.rounds.insert(pos, round_number)
+        self.timestamps.insert(pos, timestamp)
+
+    def add_points(self, points):
+        """
+        Record many (round, timestamp) pairs: merged with the known ones in one sort, then compacted.
+        """
+        merged = dict(zip(self.rounds, self.timestamps))
+        for round_number, timestamp in points:
+            if round_number is not None and timestamp is not None:
+                merged.setdefault(round_number, timestamp)
+        kept = compact_points(sorted(merged.items()))
+        self.rounds = [round_number for round_number, _ in kept]
+        self.timestamps = [timestamp for _, timestamp in kept]
+
+    def add_transactions(self, transactions):
+        """
+        Record the confirmed round and round-time of fetched transactions.
+        """
+        self.add_points((tx.get("confirmed-round"), tx.get("round-time")) for tx in transactions)
+
+    def first_round_at_or_after(self, timestamp, block_time_lookup=None, latest_round=None):
+        """
+        Return the first round whose round-time is >= timestamp.
+
+        Known points bracket the answer; when block_time_lookup(round) is given the
+        bracket is narrowed by binary search over block headers, recording each probe.
+        Without a lookup, a conservative (earlier) round is returned, or None if the
+        index knows nothing before the timestamp.
+        """
+        pos = bisect_left(self.timestamps, timestamp)
+        lo = self.rounds[pos - 1] if pos > 0 else None
+        hi = self.rounds[pos] if pos < len(self.rounds) else None
+
+        if block_time_lookup is None:
+            return lo + 1 if lo is not None else None
+
+        lo = lo if lo is not None else -1
+        if hi is None:
+            if latest_round is None:
+                return lo + 1 if lo >= 0 else None
+            hi = latest_round + 1
+
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            mid_time = block_time_lookup(mid)
+            self.add(mid, mid_time)
+            if mid_time < timestamp:
+                lo = mid
+            else:
+                hi = mid
+        return hi
+
+    def round_bounds(self, start_ts=None, end_ts=None, block_time_lookup=None, latest_round=None):
+        """
+        Map a [start_ts, end_ts) time range to an inclusive (min_round, max_round) range.
+
+        Either bound is None when it cannot be determined; callers should then rely on
+        time filters alone for that side of the range.
+        """
+        min_round = None
+        max_round = None
+        if start_ts is not None:
+            min_round = self.first_round_at_or_after(start_ts, block_time_lookup, latest_round)
+        if end_ts is not None:
+            if block_time_lookup is not None:
+                first_after_end = self.first_round_at_or_after(end_ts, block_time_lookup, latest_round)
+                if first_after_end is not None:
+                    max_round = first_after_end - 1
+            else:
+                # Without probing, only a known round at or after end_ts gives a safe upper bound
+                pos = bisect_left(self.timestamps, end_ts)
+                if pos < len(self.rounds):
+                    max_round = self.rounds[pos] - 1
+        return min_round, max_round
@@ -0,0 +1,172 @@
+from collections import namedtuple
+from functools import partial
+from operator import itemgetter
+
+from ExporterTypes import ROW_FIELDS
+from formatters import Column, compile_formatter
+
+# Buffer columns: the stake.tax row fields plus the ordering index within a transaction
+BUFFER_FIELDS = ROW_FIELDS + ["z_index"]
+
+# Normalized row keys (see voi_exporter.classify_transaction) that have another name here
+ROW_ALIASES = {"description": "comment", "tx_hash": "txid"}
+
+# One classified event of a transaction; the same arguments make_tx's builders take.
+# txid defaults to txinfo.txid; empty_fee leaves the fee columns blank.
+Event = namedtuple(
+    "Event",
+    ["txinfo", "tx_type", "sent_amount", "sent_currency", "received_amount", "received_currency",
+     "txid", "empty_fee", "z_index"],
+    defaults=["", "", "", "", None, False, 0],
+)
+
+
+def received(txinfo, tx_type, amount, currency, txid=None, empty_fee=False, z_index=0):
+    return Event(txinfo, tx_type, "", "", amount, currency, txid, empty_fee, z_index)
+
+
+def sent(txinfo, tx_type, amount, currency, empty_fee=False, z_index=0):
+    return Event(txinfo, tx_type, amount, currency, "", "", None, empty_fee, z_index)
+
+
+def exchange(txinfo, tx_type, sent_amount, sent_currency, received_amount, received_currency,
+             txid=None, empty_fee=False, z_index=0):
+    return Event(txinfo, tx_type, sent_amount, sent_currency, received_amount, received_currency,
+                 txid, empty_fee, z_index)
+
+
+class RowBuffer:
+    """
+    Columnar buffer of report rows built in batches.
+
+    With the default BUFFER_FIELDS, add_events() produces the same values as make_tx's
+    Row builders, but appends whole batches into preallocated column lists instead of
+    building a Row object per event, and never modifies the TxInfo objects. With other
+    `fields`, add_rows() stores row dicts (such as voi_exporter's normalized rows) by
+    column. clear() keeps the allocated columns for the next batch.
+
+    A pickled buffer only holds its filled rows, one list per field, which is how
+    parallel.py's workers send rows back.
+    """
+    def __init__(self, capacity=1024, fields=BUFFER_FIELDS):
+        self.fields = list(fields)
+        self.field_index = {field: i for i, field in enumerate(self.fields)}
+        self.capacity = max(capacity, 1)
+        self.size = 0
+        self.columns = [[None] * self.capacity for _ in self.fields]
+
+    def __len__(self):
+        return self.size
+
+    def _reserve(self, size):
+        if size <= self.capacity:
+            return
+        capacity = self.capacity
+        while capacity < size:
+            capacity *= 2
+        padding = [None] * (capacity - self.capacity)
+        for column in self.columns:
+            column.extend(padding)
+        self.capacity = capacity
+
+    def add_events(self, events):
+        """
+        Append rows for a batch of Events. Returns the number of rows added.
+        """
+        if self.fields != BUFFER_FIELDS:
+            raise ValueError("Events need a buffer with the BUFFER_FIELDS columns")
+        if not isinstance(events, (list, tuple)):
+            events = list(events)
+        start = self.size
+        self._reserve(start + len(events))
+        (timestamps, tx_types, received_amounts, received_currencies, sent_amounts, sent_currencies, fees,
+         fee_currencies, comments, txids, urls, exchanges, wallet_addresses, z_indexes) = self.columns
+
+        for i, event in enumerate(events, start):
+            (txinfo, tx_type, sent_amount, sent_currency, received_amount, received_currency,
+             txid, empty_fee, z_index) = event
+            fee = "" if empty_fee else txinfo.fee
+            timestamps[i] = txinfo.timestamp
+            tx_types[i] = tx_type
+            received_amounts[i] = received_amount
+            received_currencies[i] = received_currency
+            sent_amounts[i] = sent_amount
+            sent_currencies[i] = sent_currency
+            fees[i] = fee
+            fee_currencies[i] = txinfo.fee_currency if fee else ""
+            comments[i] = txinfo.comment
+            txids[i] = txid or txinfo.txid
+            urls[i] = txinfo.url
+            exchanges[i] = txinfo.exchange
+            wallet_addresses[i] = txinfo.wallet_address
+            z_indexes[i] = z_index
+        self.size = start + len(events)
+        return len(events)
+
+    def add_rows(self, rows):
+        """
+        Append a batch of row dicts holding every field. Returns the number of rows added.
+        """
+        if len(self.fields) > 1:
+            values = list(map(itemgetter(*self.fields), rows))
+        else:
+            # itemgetter with one key returns the value itself, not a 1-tuple
+            values = [(row[self.fields[0]],) for row in rows]
+        start = self.size
+        self._reserve(start + len(values))
+        for column, column_values in zip(self.columns, zip(*values)):
+            column[start:start + len(values)] = column_values
+        self.size = start + len(values)
+        return len(values)
+
+    def clear(self):
+        self.size = 0
+
+    def column(self, field):
+        return self.columns[self.field_index[field]][:self.size]
+
+    def rows(self):
+        """
+        Iterate rows as tuples in field order.
+        """
+        size = self.size
+        return zip(*(column[:size] for column in self.columns))
+
+    def dicts(self):
+        """
+        Iterate rows as dicts keyed by field.
+        """
+        return map(dict, map(partial(zip, self.fields), self.rows()))
+
+    def to_dicts(self):
+        return list(self.dicts())
+
+    def __getstate__(self):
+        state = dict(vars(self))
+        state["capacity"] = max(self.size, 1)
+        state["columns"] = [column[:state["capacity"]] for column in self.columns]
+        return state
+
+    def formatter(self, columns):
+        """
+        Compile report columns (see format_specs) to format this buffer's row tuples.
+
+        Sources are mapped to tuple positions; sources the buffer does not hold become
+        constant columns with their default.
+        """
+        mapped = []
+        for column in columns:
+            field = column.source
+            if field not in self.field_index:
+                field = ROW_ALIASES.get(field, field)
+            if field in self.field_index:
+                mapped.append(column._replace(source=self.field_index[field]))
+            else:
+                mapped.append(Column(column.header, None, column.default))
+        return compile_formatter(mapped, "format_buffer_row")
+
+    def format(self, columns):
+        """
+        Yield the buffer's rows formatted with `columns`.
+        """
+        return map(self.formatter(columns), self.rows())
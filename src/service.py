@@ -0,0 +1,316 @@
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from ExporterTypes import FORMAT_KOINLY, FORMATS
+
+# voi_exporter is imported when the service starts, not at module import, so the job
+# store and single-flight helpers can be used (and tested) without the HTTP stack.
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_WORKERS = 4
+JOBS_DIR = "jobs"
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls with the same key into one.
+
+    The first caller runs the function; callers arriving while it runs wait and get
+    the same result (or exception). Nothing is cached once the call finishes. Each
+    call in flight counts the callers waiting on it (waiters).
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+
+    def do(self, key, fn):
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = {"done": threading.Event(), "result": None, "error": None, "waiters": 0}
+            else:
+                call["waiters"] += 1
+        if not leader:
+            call["done"].wait()
+        else:
+            try:
+                call["result"] = fn()
+            except BaseException as e:
+                call["error"] = e
+            finally:
+                with self.lock:
+                    del self.calls[key]
+                call["done"].set()
+        if call["error"] is not None:
+            raise call["error"]
+        return call["result"]
+
+
+class JobStore:
+    """
+    On-disk job queue: one JSON file per job under `jobs_dir`, plus its output directory.
+
+    Job state survives a restart; jobs that were queued or running when the service
+    stopped are returned by `pending()` so they can be queued again.
+    """
+    def __init__(self, jobs_dir):
+        self.jobs_dir = jobs_dir
+        self.lock = threading.Lock()
+        os.makedirs(jobs_dir, exist_ok=True)
+
+    def _path(self, job_id):
+        return os.path.join(self.jobs_dir, f"{job_id}.json")
+
+    def output_dir(self, job_id):
+        return os.path.join(self.jobs_dir, job_id)
+
+    def create(self, wallet_address, formats, options):
+        now = int(time.time())
+        job = {
+            "id": uuid.uuid4().hex,
+            "wallet": wallet_address,
+            "formats": list(formats),
+            "options": options,
+            "status": STATUS_QUEUED,
+            "files": [],
+            "error": None,
+            "created": now,
+            "updated": now,
+        }
+        self.save(job)
+        return job
+
+    def get(self, job_id):
+        # Job ids are hex; anything else cannot name a job file
+        if not job_id.isalnum():
+            return None
+        try:
+            with open(self._path(job_id), "r") as f:
+                return json.load(f)
+        except (IOError, ValueError):
+            return None
+
+    def save(self, job):
+        job["updated"] = int(time.time())
+        tmp_path = self._path(job["id"]) + ".tmp"
+        with self.lock:
+            with open(tmp_path, "w") as f:
+                json.dump(job, f)
+            os.replace(tmp_path, self._path(job["id"]))
+
+    def update(self, job, **fields):
+        job.update(fields)
+        self.save(job)
+        return job
+
+    def pending(self):
+        """
+        Return unfinished jobs, oldest first.
+        """
+        jobs = []
+        for name in os.listdir(self.jobs_dir):
+            if name.endswith(".json"):
+                job = self.get(name[:-len(".json")])
+                if job and job["status"] in (STATUS_QUEUED, STATUS_RUNNING):
+                    jobs.append(job)
+        return sorted(jobs, key=lambda job: job["created"])
+
+
+def job_options(options):
+    """
+    Convert JSON job options to export options (lists back to the sets the CLI builds).
+    """
+    options = dict(options or {})
+    # Indexer endpoints and the concurrency budget are shared by every job, so they are
+    # set for the service, not per job
+    for key in ("indexers", "hedge", "max_concurrency"):
+        options.pop(key, None)
+    # Built by the exporter from `portfolio`; not something JSON can carry
+    options.pop("portfolio_index", None)
+    if options.get("exclude_fields") is not None:
+        options["exclude_fields"] = frozenset(options["exclude_fields"])
+    return options
+
+
+class ExportService:
+    """
+    Runs export jobs on a worker pool inside one long-lived process.
+
+    The exporter's sessions, token list and registry stay warm between jobs, and
+    concurrent jobs fetching the same wallet with the same query share one fetch.
+    Fetches of one wallet are serialized, since they share its checkpoint.
+    """
+    def __init__(self, reports_dir, workers=DEFAULT_WORKERS):
+        self.reports_dir = os.path.abspath(reports_dir)
+        self.store = JobStore(os.path.join(self.reports_dir, JOBS_DIR))
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="export")
+        self.fetches = SingleFlight()
+        self.wallet_locks = {}
+        self.lock = threading.Lock()
+        self.active = 0
+
+    def start(self):
+        for job in self.store.pending():
+            logging.info("Requeueing job %s for wallet %s", job["id"], job["wallet"])
+            self.store.update(job, status=STATUS_QUEUED)
+            self.executor.submit(self.run_job, job)
+
+    def submit(self, wallet_address, formats, options=None):
+        job = self.store.create(wallet_address, formats, options or {})
+        self.executor.submit(self.run_job, job)
+        return job
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _wallet_lock(self, wallet_address):
+        with self.lock:
+            return self.wallet_locks.setdefault(wallet_address, threading.Lock())
+
+    def fetch(self, wallet_address, options):
+        import voi_exporter
+
+        key = (wallet_address, json.dumps(voi_exporter.query_options(options), sort_keys=True, default=sorted))
+
+        def load():
+            with self._wallet_lock(wallet_address):
+                return voi_exporter.load_transactions(wallet_address, options, self.reports_dir)
+
+        return self.fetches.do(key, load)
+
+    def run_job(self, job):
+        import voi_exporter
+
+        with self.lock:
+            self.active += 1
+        self.store.update(job, status=STATUS_RUNNING)
+        output_dir = self.store.output_dir(job["id"])
+        files = []
+        try:
+            options = job_options(job["options"])
+            for format in job["formats"]:
+                format_options = voi_exporter.export_options(format, options)
+                transactions = self.fetch(job["wallet"], format_options)
+                paths = voi_exporter.write_reports(format, job["wallet"], transactions, format_options, output_dir)
+                if options.get("prices") and format == FORMAT_KOINLY and paths and not paths[0].endswith(".xlsx"):
+                    from price_enrichment import enrich_koinly_csv
+                    paths.append(enrich_koinly_csv(paths[0], options["prices"]))
+                files.extend(os.path.basename(path) for path in paths)
+        except Exception as e:
+            logging.exception("Job %s failed", job["id"])
+            self.store.update(job, status=STATUS_FAILED, files=files, error=str(e))
+        else:
+            self.store.update(job, status=STATUS_DONE, files=files)
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    """
+    JSON API:
+      POST /jobs                        {"wallet", "formats", "options"} -> job
+      GET  /jobs/<id>                   -> job status and output file names
+      GET  /jobs/<id>/files/<name>      -> output file
+      GET  /health                      -> {"status", "active", "fetch"} (see voi_exporter.fetch_metrics)
+    """
+    service = None
+
+    def _send_json(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_file(self, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        content_type = "text/csv" if path.endswith(".csv") else "application/octet-stream"
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        parts = [part for part in self.path.split("?")[0].split("/") if part]
+        if parts == ["health"]:
+            import voi_exporter
+            return self._send_json(200, {"status": "ok", "active": self.service.active,
+                                         "fetch": voi_exporter.fetch_metrics()})
+        if len(parts) < 2 or parts[0] != "jobs":
+            return self._send_json(404, {"error": "not found"})
+        job = self.service.store.get(parts[1])
+        if job is None:
+            return self._send_json(404, {"error": "unknown job"})
+        if len(parts) == 2:
+            return self._send_json(200, job)
+        if len(parts) == 4 and parts[2] == "files" and parts[3] in job["files"]:
+            return self._send_file(os.path.join(self.service.store.output_dir(job["id"]), parts[3]))
+        return self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/jobs":
+            return self._send_json(404, {"error": "not found"})
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            wallet_address = body["wallet"]
+            formats = body.get("formats") or [FORMAT_KOINLY]
+            options = body.get("options") or {}
+        except (ValueError, KeyError, TypeError) as e:
+            return self._send_json(400, {"error": f"invalid request: {e}"})
+        unknown = [format for format in formats if format not in FORMATS]
+        if unknown:
+            return self._send_json(400, {"error": f"unknown formats: {', '.join(unknown)}"})
+        job = self.service.submit(wallet_address, formats, options)
+        self._send_json(202, job)
+
+    def log_message(self, format, *args):
+        logging.info("%s - %s", self.address_string(), format % args)
+
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, reports_dir="reports", workers=DEFAULT_WORKERS):
+    # Load the exporter (HTTP stack, registry, token list) once, before the first job
+    import voi_exporter
+    voi_exporter.load_tokens()
+
+    service = ExportService(reports_dir, workers)
+    ServiceHandler.service = service
+    server = ThreadingHTTPServer((host, port), ServiceHandler)
+    service.start()
+    print(f"Export service listening on http://{host}:{port} ({workers} workers)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="VOI export service")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="Address to listen on")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port to listen on")
+    parser.add_argument("--reports-dir", default="reports", help="Directory for checkpoints and job outputs")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Number of concurrent export jobs")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.reports_dir, args.workers)
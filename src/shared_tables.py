@@ -0,0 +1,194 @@
+import mmap
+import struct
+from bisect import bisect_left, bisect_right
+
+# File layouts, all little-endian with 8-byte aligned sections:
+#   asset table: header, ids int64[count] (sorted), decimals int64[count], unit names char[count][name width]
+#   price table: header, currency names char[currencies][name width] (padded to 8 bytes),
+#                series offsets int64[currencies + 1], timestamps int64[snapshots], prices float64[snapshots]
+HEADER = struct.Struct("<8sQQQ")
+ASSET_MAGIC = b"VOIASSET"
+PRICE_MAGIC = b"VOIPRICE"
+
+
+def _padded(size):
+    return size + -size % 8
+
+
+def _pack_names(names, width):
+    return b"".join(name.ljust(width, b"\0") for name in names)
+
+
+class MappedTable:
+    """
+    Read-only table in a memory-mapped file.
+
+    Processes that open the same file share its pages, so a worker attaches at no
+    copy cost. Pickling a table only sends its path; the receiving process maps the
+    file again.
+    """
+    magic = None
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.mmap)
+        magic, *self.header = HEADER.unpack_from(self.mmap)
+        if magic != self.magic:
+            self.close()
+            raise ValueError(f"Not a {self.magic.decode()} table: {path}")
+        self.offset = HEADER.size
+
+    def _section(self, size, format=None):
+        section = self.view[self.offset:self.offset + size]
+        self.offset += _padded(size)
+        return section.cast(format) if format else section
+
+    def close(self):
+        # The cast views keep the mapping open, so they are released first
+        for value in list(vars(self).values()):
+            if isinstance(value, memoryview):
+                value.release()
+        self.mmap.close()
+
+    def __reduce__(self):
+        return type(self), (self.path,)
+
+
+class AssetTable(MappedTable):
+    """
+    Asset metadata ({asset id: {"unit-name", "decimals"}}) as fixed-width arrays keyed
+    by sorted asset id.
+
+    Reads like the token dict it was written from: get(), [] and `in` take string or
+    integer ids, and a lookup is one bisect. Entries are decoded on first use and kept
+    per process; assignments (the exporter memoizes lookups) only update that local copy.
+    """
+    magic = ASSET_MAGIC
+
+    def __init__(self, path):
+        super().__init__(path)
+        count, name_width, _ = self.header
+        self.ids = self._section(8 * count, "q")
+        self.decimals = self._section(8 * count, "q")
+        self.names = self._section(count * name_width)
+        self.name_width = name_width
+        self.local = {}
+
+    @classmethod
+    def write(cls, path, assets):
+        """
+        Write {asset id: {"unit-name", "decimals"}} to `path` and open it.
+        """
+        entries = sorted((int(asset_id), info["unit-name"].encode(), info["decimals"])
+                         for asset_id, info in assets.items())
+        width = max((len(name) for _, name, _ in entries), default=0)
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(ASSET_MAGIC, len(entries), width, 0))
+            f.write(struct.pack(f"<{len(entries)}q", *(asset_id for asset_id, _, _ in entries)))
+            f.write(struct.pack(f"<{len(entries)}q", *(decimals for _, _, decimals in entries)))
+            f.write(_pack_names((name for _, name, _ in entries), width).ljust(_padded(len(entries) * width), b"\0"))
+        return cls(path)
+
+    def get(self, asset_id, default=None):
+        info = self.local.get(asset_id)
+        if info is not None:
+            return info
+        try:
+            key = int(asset_id)
+        except (TypeError, ValueError):
+            return default
+        pos = bisect_left(self.ids, key)
+        if pos == len(self.ids) or self.ids[pos] != key:
+            return default
+        start = pos * self.name_width
+        name = bytes(self.names[start:start + self.name_width]).rstrip(b"\0").decode()
+        info = self.local[asset_id] = {"unit-name": name, "decimals": self.decimals[pos]}
+        return info
+
+    def __getitem__(self, asset_id):
+        info = self.get(asset_id)
+        if info is None:
+            raise KeyError(asset_id)
+        return info
+
+    def __setitem__(self, asset_id, info):
+        self.local[asset_id] = info
+
+    def __contains__(self, asset_id):
+        return self.get(asset_id) is not None
+
+    def __len__(self):
+        return len(self.ids)
+
+
+class PriceTable(MappedTable):
+    """
+    A PriceStore's series as fixed-width arrays: all snapshots sorted by currency and
+    timestamp, with each currency's range found from a small directory.
+
+    price_at(), price_span() and `in` behave as PriceStore's.
+    """
+    magic = PRICE_MAGIC
+
+    def __init__(self, path):
+        super().__init__(path)
+        currencies, snapshots, name_width = self.header
+        names = bytes(self._section(currencies * name_width))
+        offsets = self._section(8 * (currencies + 1), "q")
+        self.timestamps = self._section(8 * snapshots, "q")
+        self.prices = self._section(8 * snapshots, "d")
+        # currency -> (start, end) of its snapshots
+        self.series = {
+            names[i * name_width:(i + 1) * name_width].rstrip(b"\0").decode(): (offsets[i], offsets[i + 1])
+            for i in range(currencies)
+        }
+        offsets.release()
+
+    @classmethod
+    def write(cls, path, store):
+        """
+        Write a PriceStore's series to `path` and open it.
+        """
+        currencies = sorted(store.series)
+        names = [currency.encode() for currency in currencies]
+        width = max((len(name) for name in names), default=0)
+        offsets = [0]
+        for currency in currencies:
+            offsets.append(offsets[-1] + len(store.series[currency][0]))
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(PRICE_MAGIC, len(currencies), offsets[-1], width))
+            f.write(_pack_names(names, width).ljust(_padded(len(currencies) * width), b"\0"))
+            f.write(struct.pack(f"<{len(offsets)}q", *offsets))
+            for currency in currencies:
+                f.write(struct.pack(f"<{len(store.series[currency][0])}q", *map(int, store.series[currency][0])))
+            for currency in currencies:
+                f.write(struct.pack(f"<{len(store.series[currency][1])}d", *store.series[currency][1]))
+        return cls(path)
+
+    def price_at(self, currency, timestamp):
+        """
+        Return the USD price of `currency` at `timestamp`, or None if it is not known.
+        """
+        bounds = self.series.get(currency)
+        if bounds is None:
+            return None
+        pos = bisect_right(self.timestamps, timestamp, *bounds)
+        return self.prices[pos - 1] if pos > bounds[0] else None
+
+    def price_span(self, currency, timestamp):
+        """
+        Return (price, start, end) as PriceStore.price_span does.
+        """
+        bounds = self.series.get(currency)
+        if bounds is None:
+            return None, float("-inf"), float("inf")
+        lo, hi = bounds
+        pos = bisect_right(self.timestamps, timestamp, lo, hi)
+        start = self.timestamps[pos - 1] if pos > lo else float("-inf")
+        end = self.timestamps[pos] if pos < hi else float("inf")
+        return (self.prices[pos - 1] if pos > lo else None), start, end
+
+    def __contains__(self, currency):
+        return currency in self.series
@@ -0,0 +1,84 @@
+import json
+from datetime import datetime, timezone
+
+from cost_basis import FEE_DECIMALS, paid_fee, year_end
+
+SUMMARY_HEADER = ["Year", "Asset ID", "Currency", "Type", "Transactions", "Received", "Sent", "Fees (VOI)"]
+
+
+def year_start(year):
+    return int(datetime(year, 1, 1, tzinfo=timezone.utc).timestamp())
+
+
+class TaxSummary:
+    """
+    Yearly totals per asset and transaction type, accumulated while rows are written.
+
+    Each (year, asset id, tx_type) group holds the row count and the received, sent
+    and fee amounts in base units, so the totals are exact and the report is never
+    read back. The year of the previous row is kept with its bounds, which rows in
+    either time order nearly always fall within.
+    """
+    def __init__(self):
+        # (year, asset id, tx_type) -> [count, received, sent, fees]
+        self.groups = {}
+        # asset id -> (currency, decimals)
+        self.assets = {}
+        self.year = None
+        self.year_start = 0
+        self.year_end = -1
+
+    def add_row(self, row):
+        timestamp = row["timestamp"]
+        if not self.year_start <= timestamp <= self.year_end:
+            self.year = datetime.fromtimestamp(timestamp, tz=timezone.utc).year
+            self.year_start = year_start(self.year)
+            self.year_end = year_end(self.year)
+        asset_id = row["asset_id"]
+        key = (self.year, asset_id, row["tx_type"])
+        group = self.groups.get(key)
+        if group is None:
+            group = self.groups[key] = [0, 0, 0, 0]
+            if asset_id not in self.assets:
+                self.assets[asset_id] = (row["currency"], row["decimals"])
+        group[0] += 1
+        if row["received_amount"] != "":
+            group[1] += row["raw_amount"]
+        elif row["sent_amount"] != "":
+            group[2] += row["raw_amount"]
+        group[3] += paid_fee(row)
+
+    def consume(self, rows):
+        """
+        Add rows as they pass through, yielding each unchanged.
+        """
+        for row in rows:
+            self.add_row(row)
+            yield row
+
+    def totals(self):
+        """
+        Return the groups as dicts sorted by year, asset and type, amounts in asset units.
+        """
+        totals = []
+        for (year, asset_id, tx_type), (count, received, sent, fees) in sorted(
+                self.groups.items(), key=lambda item: (item[0][0], str(item[0][1]), item[0][2])):
+            currency, decimals = self.assets[asset_id]
+            totals.append({
+                "year": year,
+                "asset_id": asset_id,
+                "currency": currency,
+                "tx_type": tx_type,
+                "transactions": count,
+                "received": received / 10 ** decimals,
+                "sent": sent / 10 ** decimals,
+                "fees": fees / 10 ** FEE_DECIMALS,
+            })
+        return totals
+
+    def rows(self):
+        return [list(total.values()) for total in self.totals()]
+
+    def write_json(self, path):
+        with open(path, "w") as f:
+            json.dump(self.totals(), f, indent=1)
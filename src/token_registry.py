@@ -0,0 +1,203 @@
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import threading
+
+KIND_ASA = "asa"
+KIND_ARC200 = "arc200"
+
+REGISTRY_FILE = "voi_token_registry.sqlite"
+PAGE_LIMIT = 1000
+MMAP_SIZE = 64 * 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS assets (
+    asset_id INTEGER PRIMARY KEY,
+    name TEXT,
+    unit_name TEXT,
+    decimals INTEGER NOT NULL,
+    created_round INTEGER,
+    kind TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class TokenRegistry:
+    """
+    Snapshot of token metadata (ASAs and ARC-200 contracts) keyed by asset/app id.
+
+    Backed by SQLite so the exporter only reads the rows it needs; the database is
+    opened (memory-mapped, read-only) on the first lookup. Lookups may come from
+    several threads (see service.py); they share one connection under a lock.
+    """
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.conn = None
+        self.writable = False
+        self.lookups = {}
+        self.lock = threading.Lock()
+
+    def _connect(self, writable=False):
+        if writable and not self.writable:
+            self.close()
+        if self.conn is None:
+            self.writable = writable
+            if writable:
+                self.conn = sqlite3.connect(self.db_path)
+                self.conn.executescript(SCHEMA)
+            else:
+                self.conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True, check_same_thread=False)
+            self.conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+        return self.conn
+
+    def exists(self):
+        return os.path.exists(self.db_path)
+
+    def get(self, asset_id):
+        """
+        Return {"name", "unit-name", "decimals"} for an asset id, or None if unknown.
+        """
+        asset_id = int(asset_id)
+        if asset_id in self.lookups:
+            return self.lookups[asset_id]
+        info = None
+        if self.exists():
+            with self.lock:
+                row = self._connect().execute(
+                    "SELECT name, unit_name, decimals FROM assets WHERE asset_id = ?", (asset_id,)
+                ).fetchone()
+            if row:
+                info = {"name": row[0], "unit-name": row[1], "decimals": row[2]}
+        self.lookups[asset_id] = info
+        return info
+
+    def upsert(self, rows):
+        """
+        Insert or replace (asset_id, name, unit_name, decimals, created_round, kind) rows.
+        """
+        conn = self._connect(writable=True)
+        with conn:
+            conn.executemany("INSERT OR REPLACE INTO assets VALUES (?, ?, ?, ?, ?, ?)", rows)
+        self.lookups.clear()
+
+    def get_meta(self, key, default=None):
+        if not self.exists():
+            return default
+        row = self._connect().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key, value):
+        conn = self._connect(writable=True)
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, str(value)))
+
+    def count(self):
+        if not self.exists():
+            return 0
+        return self._connect().execute("SELECT COUNT(*) FROM assets").fetchone()[0]
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+            self.writable = False
+
+
+def asset_row(asset):
+    """
+    Convert an indexer asset object to a registry row.
+    """
+    params = asset.get("params", {})
+    asset_id = asset["index"]
+    return (
+        asset_id,
+        params.get("name", ""),
+        params.get("unit-name", f"Asset-{asset_id}"),
+        params.get("decimals", 0),
+        asset.get("created-at-round"),
+        KIND_ASA,
+    )
+
+
+def build_registry(registry, fetch_page, refresh=True):
+    """
+    Page through the indexer's asset listing into the registry.
+
+    `fetch_page(params)` returns one `/v2/assets` page. The listing is ordered by asset
+    id and ids are allocated in creation order, so a refresh continues after the
+    highest id already stored (i.e. only assets created since the last run are fetched).
+    Returns the number of assets written.
+    """
+    params = {"limit": PAGE_LIMIT, "include-all": "true"}
+    last_asset_id = registry.get_meta("last_asset_id") if refresh else None
+    if last_asset_id:
+        params["next"] = last_asset_id
+
+    written = 0
+    max_created_round = int(registry.get_meta("max_created_round", 0) or 0)
+    while True:
+        page = fetch_page(params)
+        assets = page.get("assets", [])
+        if not assets:
+            break
+        rows = [asset_row(asset) for asset in assets]
+        registry.upsert(rows)
+        written += len(rows)
+        max_created_round = max([max_created_round] + [row[4] or 0 for row in rows])
+        # Saved per page so an interrupted build resumes where it stopped
+        registry.set_meta("last_asset_id", rows[-1][0])
+        registry.set_meta("max_created_round", max_created_round)
+        logging.info("Registry: %d assets written (last asset id %s)", written, rows[-1][0])
+
+        next_token = page.get("next-token")
+        if not next_token:
+            break
+        params["next"] = next_token
+    return written
+
+
+def load_arc200_list(registry, json_path):
+    """
+    Add ARC-200 contracts from a JSON file: {"contracts": {"<app id>": {"name", "symbol", "decimals"}}}.
+    """
+    with open(json_path, "r") as f:
+        contracts = json.load(f).get("contracts", {})
+    rows = [
+        (int(app_id), info.get("name", ""), info.get("symbol", f"ARC200-{app_id}"), info.get("decimals", 0),
+         info.get("created-round"), KIND_ARC200)
+        for app_id, info in contracts.items()
+    ]
+    registry.upsert(rows)
+    return len(rows)
+
+
+if __name__ == "__main__":
+    import requests
+    from voi_exporter import get_data_path, indexer_get
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Build the VOI token registry snapshot")
+    parser.add_argument("command", choices=["build", "refresh"],
+                        help="'build' pages through every asset; 'refresh' only fetches assets created since the last run")
+    parser.add_argument("--output", default=get_data_path(REGISTRY_FILE), help="Registry database path")
+    parser.add_argument("--arc200", help="JSON file listing ARC-200 contracts to include")
+    args = parser.parse_args()
+
+    if args.command == "build" and os.path.exists(args.output):
+        os.remove(args.output)
+    registry = TokenRegistry(args.output)
+    with requests.Session() as session:
+        written = build_registry(
+            registry, lambda params: indexer_get(session, "/v2/assets", params=params),
+            refresh=args.command == "refresh",
+        )
+    if args.arc200:
+        written += load_arc200_list(registry, args.arc200)
+    print(f"Wrote {written} tokens; registry now holds {registry.count()} tokens at {args.output}")
+    registry.close()
@@ -1,16 +1,98 @@
 import argparse
 import os
-import csv
+import sys
 import json
+import threading
+import time
 import requests
 from datetime import datetime, timezone
-from ExporterTypes import TX_TYPE_TRANSFER, TX_TYPE_TRADE, TX_TYPE_STAKING, TX_TYPE_INCOME
+from itertools import chain
+from urllib.parse import urlencode
+from ExporterTypes import (
+    FORMAT_BALANCES_CALCULATED, FORMAT_DEFAULT, TX_TYPE_TRANSFER, TX_TYPE_TRADE, TX_TYPE_STAKING, TX_TYPE_INCOME
+)
 from ErrorCounter import ErrorCounter
+from cli_options import (
+    FILTER_PARAMS,
+    add_balance_arguments,
+    add_classification_arguments,
+    add_cost_basis_arguments,
+    add_fetch_arguments,
+    add_filter_arguments,
+    add_follow_arguments,
+    add_output_arguments,
+    add_range_arguments,
+    balance_options,
+    classification_options,
+    cost_basis_options,
+    fetch_options,
+    filter_options,
+    output_options,
+    range_options,
+)
+from query import get_stream_with_retries, get_with_retries
+from config import Config
+from endpoints import FAILOVER_ERRORS, EndpointPool, is_client_error
+from concurrency import THROUGHPUT_WINDOW, AimdLimiter
+from round_index import RoundIndex
+from checkpoint import FetchCheckpoint
+from token_registry import REGISTRY_FILE, TokenRegistry
+from balances import BALANCES_HEADER, BalanceEngine, balance_rows
+from reconcile import Reconciler
+from aggregate import WINDOWS, RewardAggregator
+from cache import NS_ASSETS, NS_PAGES, open_cache
+from writers import OUTPUT_CSV, OUTPUT_XLSX, open_writer, select_output
+from format_specs import FORMAT_COLUMNS, get_formatter
+from portfolio import PortfolioIndex, self_transfer_fees
+from extsort import ORDER_CHRONOLOGICAL, RUN_SIZE, external_sort
+from cost_basis import GAINS_HEADER, POSITIONS_HEADER, CostBasisEngine, gain_rows, position_rows
+from price_store import PriceStore
+from summary import SUMMARY_HEADER, TaxSummary
+from parallel import PARALLEL_MIN_TRANSACTIONS, classify_parallel, transaction_asset_id, worker_count
+from arc200 import STANDARD_ARC200, STANDARD_ARC72, ZERO_ADDRESS, logged_app_ids, transfer_events
+from counterparties import CATEGORY_STAKING, COUNTERPARTIES_FILE, CounterpartyIndex, describe
 import base64  # For decoding transaction notes
 
 # Initialize the error counter
 error_counter = ErrorCounter()
 
+INDEXER_URL = "https://mainnet-idx.voi.nodely.dev"
+PAGE_LIMIT = 1000
+ROUND_INDEX_FILE = "voi_round_index.json"
+CHECKPOINT_DIR = "checkpoints"
+# Attempts per indexer request (each trying every endpoint), and the backoff in seconds
+# before the first retry, doubled for each further one
+REQUEST_ATTEMPTS = 4
+RETRY_BACKOFF = 2
+
+# Options that change which transactions are fetched; a checkpoint only resumes a matching fetch
+QUERY_OPTION_KEYS = ["start_date", "end_date", "min_round", "max_round", "exclude_fields"] + list(FILTER_PARAMS)
+
+# Seconds between checks for new rounds in follow mode
+FOLLOW_POLL_INTERVAL = 10
+
+# Options follow mode cannot honour: the range must stay open, and appended rows are not
+# aggregated or added to the cost basis and summary
+FOLLOW_CONFLICTING_OPTION_KEYS = ["end_date", "max_round", "balance_dates", "aggregate_rewards", "cost_basis",
+                                  "summary"]
+
+# Balances need the complete history up to the balance date, so these options are ignored for them
+BALANCE_IGNORED_OPTION_KEYS = ["start_date", "min_round", "exclude_fields"] + list(FILTER_PARAMS)
+
+
+# One pooled session per thread, reused across fetches so connections stay warm
+_local = threading.local()
+_cache_lock = threading.Lock()
+_tokens = None
+_registry = None
+_cache = False
+_counterparties = None
+_endpoints = None
+# Adaptive budget of indexer requests in flight, shared by every export in the process
+_limiter = AimdLimiter()
+# Serializes round index load/flush between concurrent exports
+_round_index_lock = threading.Lock()
+
 
 def get_data_path(file_name):
     """
@@ -20,40 +102,479 @@ def get_data_path(file_name):
     return os.path.join(base_dir, "data", file_name)
 
 
-def fetch_asset_info(asset_id):
+def get_session():
+    """
+    Return this thread's requests session, creating it on first use.
+    """
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = _local.session = requests.Session()
+    return session
+
+
+def configure_endpoints(urls=None, hedge=False):
+    """
+    Set the indexer endpoints requests are routed across (see endpoints.EndpointPool).
+
+    Without `urls`, VOI_INDEXER_URLS (comma-separated) or Config's indexer_urls are used.
+    """
+    global _endpoints
+    if not urls:
+        env_urls = os.environ.get("VOI_INDEXER_URLS")
+        urls = env_urls.split(",") if env_urls else Config.get_node_setting("indexer_urls")
+    with _cache_lock:
+        _endpoints = EndpointPool([url.strip() for url in urls if url.strip()], hedge=hedge)
+    return _endpoints
+
+
+def get_endpoints():
+    """
+    Return the process's indexer EndpointPool, configured with the defaults on first use.
+    """
+    return _endpoints or configure_endpoints()
+
+
+def use_endpoints(options):
+    """
+    Apply the indexers, hedge and max_concurrency options, keeping the current pool
+    (and its health history) when they already match it.
+    """
+    if options.get("max_concurrency"):
+        _limiter.set_maximum(options["max_concurrency"])
+    urls = options.get("indexers")
+    hedge = options.get("hedge", False)
+    if not urls and not hedge:
+        return get_endpoints()
+    endpoints = get_endpoints()
+    current = [endpoint.url for endpoint in endpoints.endpoints]
+    urls = list(dict.fromkeys(url.strip().rstrip("/") for url in urls)) if urls else current
+    if urls == current and (hedge and len(urls) > 1) == endpoints.hedge:
+        return endpoints
+    return configure_endpoints(urls, hedge)
+
+
+def indexer_get(session, path, params=None, stream=False, retries=None):
+    """
+    GET an indexer path from the healthiest endpoint, failing over to the others.
+
+    A request that fails on every endpoint with a timeout, connection error, bad body
+    or 429 is retried with backoff, up to `retries` attempts (REQUEST_ATTEMPTS by
+    default). Streamed pages are never hedged, since they stay on the caller's session.
+
+    Each single HTTP attempt holds a slot of the process-wide AimdLimiter, released
+    before any backoff, so all wallets of a batch share one adaptive concurrency budget
+    and every timeout or 429 reduces it.
+    """
+    endpoints = get_endpoints()
+    attempts = retries or REQUEST_ATTEMPTS
+    get = get_stream_with_retries if stream else get_with_retries
+    # Copied because a hedged request may still be sending after the caller moves on
+    params = dict(params) if params else None
+
+    def request(base_url, session):
+        with _limiter.slot():
+            return get(session, f"{base_url}{path}", params=params, retries=1)
+
+    for attempt in range(attempts):
+        try:
+            return endpoints.call(request, session, session_factory=get_session, hedge=not stream)
+        except FAILOVER_ERRORS as e:
+            if attempt == attempts - 1 or is_client_error(e):
+                raise
+            print(f"Indexer request {path} failed on every endpoint ({e}); retrying.")
+            time.sleep(RETRY_BACKOFF * 2 ** attempt)
+
+
+def fetch_metrics():
+    """
+    Return the indexer request metrics of this process: the AimdLimiter's concurrency
+    and throughput, and each endpoint's latency and error rate.
+    """
+    return dict(_limiter.metrics(), indexers=get_endpoints().stats())
+
+
+def print_fetch_metrics():
+    metrics = fetch_metrics()
+    if not metrics["requests"]:
+        return
+    print(f"Indexer requests: {metrics['requests']} ({metrics['requests_per_second']}/s over the last "
+          f"{THROUGHPUT_WINDOW:.0f}s), concurrency {metrics['concurrency']} (peak {metrics['peak_in_flight']} "
+          f"in flight), {metrics['throttled']} throttled")
+
+
+def load_tokens():
+    """
+    Return the static token list from voi_tokens.json, read once per process.
+
+    Assets resolved from the registry or indexer are memoized into the same dict.
+    """
+    global _tokens
+    with _cache_lock:
+        if _tokens is None:
+            tokens_file_path = get_data_path("voi_tokens.json")
+            try:
+                with open(tokens_file_path, "r") as f:
+                    _tokens = json.load(f).get("tokens", {})
+            except FileNotFoundError:
+                _tokens = {}
+                error_counter.increment("FILE_ERROR", "voi_tokens.json")
+                print(f"Error: The '{tokens_file_path}' file does not exist. Using dynamic asset fetching.")
+        return _tokens
+
+
+def get_registry():
+    """
+    Return the process-wide token registry (opened on first lookup).
+    """
+    global _registry
+    with _cache_lock:
+        if _registry is None:
+            _registry = TokenRegistry(get_data_path(REGISTRY_FILE))
+        return _registry
+
+
+def get_cache():
+    """
+    Return the process-wide shared cache, or None if VOI_CACHE is not set (see cache.py).
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is False:
+            _cache = open_cache()
+        return _cache
+
+
+def get_counterparties(paths=()):
+    """
+    Return the counterparty index of voi_counterparties.json plus `paths`, reloaded if
+    any of the files changed since the last call.
+    """
+    global _counterparties
+    paths = [get_data_path(COUNTERPARTIES_FILE)] + list(paths)
+    with _cache_lock:
+        if _counterparties is None or _counterparties.paths != paths:
+            _counterparties = CounterpartyIndex(paths)
+        _counterparties.refresh()
+        return _counterparties
+
+
+def fetch_asset_info(asset_id, cache=None):
     """
     Fetch dynamic asset information (name, decimals) from the VOI API.
+
+    Successful lookups are shared through `cache` when one is given.
     """
-    url = f"https://mainnet-idx.voi.nodely.dev/v2/assets/{asset_id}"
+    asset_info = cache.get(NS_ASSETS, str(asset_id)) if cache is not None else None
+    if asset_info is not None:
+        return asset_info
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        asset_data = response.json()
-        return {
+        asset_data = indexer_get(get_session(), f"/v2/assets/{asset_id}", retries=1)
+        asset_info = {
             "unit-name": asset_data.get("params", {}).get("unit-name", f"Asset-{asset_id}"),
             "decimals": asset_data.get("params", {}).get("decimals", 0),
         }
-    except requests.RequestException as e:
+        if cache is not None:
+            cache.set(NS_ASSETS, str(asset_id), asset_info)
+        return asset_info
+    except FAILOVER_ERRORS as e:
         error_counter.increment("ASSET_INFO_ERROR", asset_id)
         print(f"Error fetching asset info for {asset_id}: {e}")
         return {"unit-name": f"Asset-{asset_id}", "decimals": 0}
 
 
-def fetch_transactions(wallet_address):
+class FetchError(Exception):
+    """
+    Raised when fetching a wallet's transactions stops part way through.
+
+    Carries how far the fetch got so callers can report a partial failure instead of
+    treating the wallet as empty.
+    """
+    def __init__(self, wallet_address, pages, transactions_fetched, last_round, cause):
+        self.wallet_address = wallet_address
+        self.pages = pages
+        self.transactions_fetched = transactions_fetched
+        self.last_round = last_round
+        self.cause = cause
+        super().__init__(
+            f"Fetch for wallet {wallet_address} stopped after {pages} pages "
+            f"({transactions_fetched} transactions, last round {last_round}): {cause}"
+        )
+
+
+def resolve_asset(asset_id, tokens, registry=None):
+    """
+    Look up asset metadata: voi_tokens.json entries first, then the token registry
+    snapshot, then the shared cache and the indexer. Results are memoized in `tokens`.
+    """
+    asset_info = tokens.get(asset_id)
+    if asset_info is None:
+        asset_info = registry.get(asset_id) if registry is not None else None
+        if asset_info is None:
+            asset_info = fetch_asset_info(asset_id, get_cache())
+        tokens[asset_id] = asset_info
+    return asset_info
+
+
+def page_cache_key(url, params):
+    return f"{url}?{urlencode(sorted(params.items()))}"
+
+
+def fetch_transactions(wallet_address, query_params=None, exclude_fields=None, stream_pages=False, checkpoint=None,
+                       cache=None):
     """
     Fetch transactions for the given wallet address using the VOI API.
+
+    Follows `next-token` pagination; `query_params` (see build_query_params) are passed
+    through to the indexer so only the requested slice is transferred. Fields listed in
+    `exclude_fields` are dropped from each page as it arrives. With `stream_pages`,
+    transactions are parsed one at a time from the response body instead of decoding
+    each page as a whole.
+
+    With a FetchCheckpoint, every completed page is saved; if the checkpoint was loaded
+    from an interrupted fetch, fetching resumes from its saved query and `next-token`.
+
+    With a cache, pages requested with a `next` token are cached: they only hold
+    confirmed transactions older than the token, so they never change. The first page
+    is always fetched. Raises FetchError if a page cannot be fetched.
     """
-    indexer_url = "https://mainnet-idx.voi.nodely.dev/v2/accounts"
+    path = f"/v2/accounts/{wallet_address}/transactions"
+    # Pages are cached under the default indexer's URL whichever endpoint served them
+    url = f"{INDEXER_URL}{path}"
+    params = {"limit": PAGE_LIMIT}
+    params.update(query_params or {})
+    transactions = []
+    pages = 0
+    if checkpoint is not None:
+        if checkpoint.next_token:
+            params = dict(checkpoint.query_params, next=checkpoint.next_token)
+            transactions = checkpoint.transactions()
+            pages = checkpoint.pages
+            print(f"Resuming wallet {wallet_address} after {pages} pages ({len(transactions)} transactions, "
+                  f"round {checkpoint.last_round}).")
+        else:
+            checkpoint.query_params = dict(params)
+    session = get_session()
     try:
-        response = requests.get(f"{indexer_url}/{wallet_address}/transactions", params={"limit": 1000})
-        response.raise_for_status()
-        transactions = response.json().get("transactions", [])
-        print(f"Fetched {len(transactions)} transactions for wallet {wallet_address}.")
-        return transactions
-    except requests.RequestException as e:
+        while True:
+            cache_key = page_cache_key(url, params) if cache is not None and "next" in params else None
+            page = cache.get(NS_PAGES, cache_key) if cache_key else None
+            from_cache = page is not None
+            if from_cache:
+                page_transactions = page["transactions"]
+            elif stream_pages:
+                page = indexer_get(session, path, params=params, stream=True)
+                page_transactions = page
+            else:
+                page = indexer_get(session, path, params=params)
+                page_transactions = page.get("transactions", [])
+            if cache_key and not from_cache:
+                # Cached before projection so the page serves any exclude_fields
+                page_transactions = raw_transactions = list(page_transactions)
+            if exclude_fields:
+                page_transactions = [project_transaction(tx, exclude_fields) for tx in page_transactions]
+            else:
+                page_transactions = list(page_transactions)
+            if stream_pages and not from_cache:
+                next_token = page.fields.get("next-token")
+            else:
+                next_token = page.get("next-token")
+            if cache_key and not from_cache:
+                cache.set(NS_PAGES, cache_key, {"transactions": raw_transactions, "next-token": next_token})
+            transactions.extend(page_transactions)
+            pages += 1
+            if checkpoint is not None:
+                checkpoint.record_page(page_transactions, next_token)
+            if not next_token or not page_transactions:
+                break
+            params["next"] = next_token
+    except FAILOVER_ERRORS as e:
         error_counter.increment("API_ERROR", wallet_address)
-        print(f"Error fetching transactions: {e}")
-        return []
+        last_round = transactions[-1].get("confirmed-round") if transactions else None
+        raise FetchError(wallet_address, pages, len(transactions), last_round, e) from e
+    print(f"Fetched {len(transactions)} transactions for wallet {wallet_address}.")
+    return transactions
+
+
+def project_transaction(tx, exclude_fields):
+    """
+    Return a copy of the transaction without the excluded fields, including inner transactions.
+    """
+    projected = {key: value for key, value in tx.items() if key not in exclude_fields}
+    if "inner-txns" in projected:
+        projected["inner-txns"] = [project_transaction(inner, exclude_fields) for inner in projected["inner-txns"]]
+    return projected
+
+
+def fetch_block_timestamp(session, round_number):
+    """
+    Fetch the timestamp of a block from its header.
+    """
+    block = indexer_get(session, f"/v2/blocks/{round_number}", params={"header-only": "true"})
+    return block["timestamp"]
+
+
+def fetch_latest_round(session):
+    """
+    Fetch the latest round known to the indexer.
+    """
+    return indexer_get(session, "/health")["round"]
+
+
+def fetch_account_holdings(session, wallet_address):
+    """
+    Fetch the account's current balances as (round, {asset_id: amount}).
+
+    The VOI balance comes from /v2/accounts/{addr}; asset holdings are paged from
+    /v2/accounts/{addr}/assets.
+    """
+    account_path = f"/v2/accounts/{wallet_address}"
+    response = indexer_get(session, account_path, params={"exclude": "all"})
+    holdings = {0: response["account"].get("amount", 0)}
+    params = {"limit": PAGE_LIMIT}
+    while True:
+        page = indexer_get(session, f"{account_path}/assets", params=params)
+        for holding in page.get("assets", []):
+            holdings[holding["asset-id"]] = holding.get("amount", 0)
+        if not page.get("next-token") or not page.get("assets"):
+            break
+        params["next"] = page["next-token"]
+    return response["current-round"], holdings
+
+
+def fetch_balance_at_round(session, wallet_address, asset_id, round_number):
+    """
+    Fetch one asset's balance as of a past round (0 if the account did not exist yet).
+    """
+    params = {"round": round_number}
+    if not asset_id:
+        params["exclude"] = "all"
+    try:
+        account = indexer_get(session, f"/v2/accounts/{wallet_address}", params=params)["account"]
+    except requests.HTTPError as e:
+        if e.response is not None and e.response.status_code == 404:
+            return 0
+        raise
+    if not asset_id:
+        return account.get("amount", 0)
+    for holding in account.get("assets", []):
+        if holding["asset-id"] == asset_id:
+            return holding.get("amount", 0)
+    return 0
+
+
+def reconcile_transactions(wallet_address, transactions, options):
+    """
+    Compare computed end balances with the account's holdings and refetch missing round ranges.
+
+    Returns the (possibly repaired) transactions. Only meaningful for complete histories.
+    """
+    session = get_session()
+    reconciler = Reconciler(
+        wallet_address,
+        lambda: fetch_account_holdings(session, wallet_address),
+        lambda asset_id, round_number: fetch_balance_at_round(session, wallet_address, asset_id, round_number),
+        lambda min_round, max_round: fetch_transactions(
+            wallet_address, {"min-round": min_round, "max-round": max_round},
+            options.get("exclude_fields"), options.get("stream_pages", False),
+        ),
+    )
+    transactions, mismatches, windows = reconciler.run(transactions)
+
+    for min_round, max_round, found in windows:
+        print(f"Reconcile: refetched rounds {min_round}-{max_round}, recovered {found} transactions.")
+    if mismatches:
+        error_counter.increment("RECONCILE_MISMATCH", wallet_address)
+        for asset_id, (computed, actual) in sorted(mismatches.items()):
+            print(f"Reconcile: asset {asset_id} computed balance {computed} != account balance {actual}.")
+    else:
+        print(f"Reconcile: computed balances match account {wallet_address}.")
+    return transactions
+
+
+def parse_date(value):
+    """
+    Convert a YYYY-MM-DD date (UTC) to a UNIX timestamp.
+    """
+    return int(datetime.strptime(value, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp())
+
+
+def build_query_params(options, round_index=None):
+    """
+    Translate date/round range and filter options into indexer query parameters.
+
+    Dates are always sent as `after-time`/`before-time`; when the round index can map
+    them to rounds, the tighter of those rounds and any explicit `min_round`/`max_round`
+    is sent as `min-round`/`max-round` as well. tx_type, asset_id and the currency
+    bounds map directly onto the indexer's own filters.
+    """
+    params = {}
+    for key, param in FILTER_PARAMS.items():
+        if (options or {}).get(key) is not None:
+            params[param] = options[key]
+    start_ts, end_ts, min_round, max_round = range_bounds(options)
+
+    if start_ts is not None:
+        params["after-time"] = format_rfc3339(start_ts)
+    if end_ts is not None:
+        params["before-time"] = format_rfc3339(end_ts)
+
+    if round_index is not None and (start_ts is not None or end_ts is not None):
+        try:
+            session = get_session()
+            date_min_round, date_max_round = round_index.round_bounds(
+                start_ts, end_ts,
+                block_time_lookup=lambda round_number: fetch_block_timestamp(session, round_number),
+                latest_round=fetch_latest_round(session),
+            )
+        except FAILOVER_ERRORS + (KeyError,) as e:
+            print(f"Unable to map dates to rounds, using time filters only: {e}")
+            date_min_round, date_max_round = round_index.round_bounds(start_ts, end_ts)
+        if date_min_round is not None:
+            min_round = max(min_round, date_min_round) if min_round is not None else date_min_round
+        if date_max_round is not None:
+            max_round = min(max_round, date_max_round) if max_round is not None else date_max_round
+
+    if min_round is not None:
+        params["min-round"] = min_round
+    if max_round is not None:
+        params["max-round"] = max_round
+    return params
+
+
+def range_bounds(options):
+    """
+    Return (start_ts, end_ts, min_round, max_round) from the range options.
+
+    end_date is inclusive, so end_ts is the start of the following day (exclusive).
+    """
+    options = options or {}
+    start_ts = parse_date(options["start_date"]) if options.get("start_date") else None
+    end_ts = parse_date(options["end_date"]) + 86400 if options.get("end_date") else None
+    return start_ts, end_ts, options.get("min_round"), options.get("max_round")
+
+
+def filter_range(transactions, options):
+    """
+    Keep only transactions inside the date/round range options.
+
+    The indexer already filters on these; this guards against differences in bound
+    inclusiveness between indexer versions.
+    """
+    start_ts, end_ts, min_round, max_round = range_bounds(options)
+    if start_ts is None and end_ts is None and min_round is None and max_round is None:
+        return transactions
+
+    def in_range(tx):
+        round_time = tx.get("round-time", 0)
+        confirmed_round = tx.get("confirmed-round", 0)
+        return not (
+            (start_ts is not None and round_time < start_ts)
+            or (end_ts is not None and round_time >= end_ts)
+            or (min_round is not None and confirmed_round < min_round)
+            or (max_round is not None and confirmed_round > max_round)
+        )
+
+    return [tx for tx in transactions if in_range(tx)]
 
 
 def decode_base64(data):
@@ -95,105 +616,724 @@ def format_date(timestamp):
         return "1970-01-01 00:00:00"
 
 
-def write_csv(file_path, header, rows):
+def format_rfc3339(timestamp):
     """
-    Write rows of data to a CSV file.
+    Convert a UNIX timestamp to the RFC 3339 format expected by the indexer.
+    """
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def write_csv(file_path, header, rows, output=OUTPUT_CSV):
+    """
+    Write rows of data to a CSV file, streaming them as they are produced.
+
+    `output` selects a gzip/zstd compressed CSV or an XLSX file instead (see
+    writers.py); the extension of `file_path` changes to match. Returns the path
+    written, or None if writing failed.
     """
     try:
-        with open(file_path, mode="w", newline="") as csv_file:
-            writer = csv.writer(csv_file)
+        with open_writer(file_path, output) as writer:
             writer.writerow(header)
             writer.writerows(rows)
-        print(f"CSV exported to {file_path}")
-    except IOError as e:
+        print(f"CSV exported to {writer.path}")
+        return writer.path
+    except (IOError, ImportError) as e:
         error_counter.increment("FILE_WRITE_ERROR", file_path)
         print(f"Error writing to file {file_path}: {e}")
+        return None
+
+
+# Koinly labels for classified transaction types (transfers keep the sent/received label)
+KOINLY_LABELS = {
+    TX_TYPE_STAKING: "reward",
+    TX_TYPE_INCOME: "income",
+}
 
 
-def export_to_koinly(transactions, wallet_address, tokens, reports_dir):
+# Keys of the normalized rows built by classify_transaction and token_rows, in order
+NORMALIZED_FIELDS = [
+    "timestamp", "round", "intra_round_offset", "tx_type", "sent_amount", "sent_currency", "received_amount",
+    "received_currency", "fee", "fee_currency", "net_worth_amount", "net_worth_currency", "label", "description",
+    "tx_hash", "asset_id", "currency", "raw_amount", "decimals", "sender", "receiver", "counterparty", "category",
+]
+
+
+def classify_transaction(tx, wallet_address, tokens, registry=None, reward_senders=(), counterparties=None):
     """
-    Export transactions to the Koinly CSV format.
+    Classify an indexer transaction into a normalized row dict.
+
+    The keys follow Exporter's row dicts (timestamp, sent_amount, ..., tx_hash) plus
+    tx_type, round/intra_round_offset, sender/receiver, asset_id and the amount in base
+    units (raw_amount, decimals) so later stages can aggregate exactly. Incoming
+    payments from `reward_senders` are classified as staking rewards.
+
+    With a CounterpartyIndex, the called app or the other party is looked up: its label
+    and category are added to the row (counterparty, category) and describe the
+    transaction, and payments from staking contracts are staking rewards.
     """
-    file_path = os.path.join(reports_dir, f"voi_{wallet_address}_koinly.csv")
-    header = [
-        "Date", "Sent Amount", "Sent Currency", "Received Amount",
-        "Received Currency", "Fee Amount", "Fee Currency", "Net Worth Amount",
-        "Net Worth Currency", "Label", "Description", "TxHash", "Asset ID", "Price (USD)"
-    ]
-    rows = []
+    sender = tx.get("sender", "")
+    receiver = tx.get("payment-transaction", {}).get("receiver", "")
+    asset_id = str(tx.get("asset-transfer-transaction", {}).get("asset-id", 0))
+    asset_info = resolve_asset(asset_id, tokens, registry)
+    currency = asset_info["unit-name"]
+    decimals = asset_info["decimals"]
 
-    for tx in transactions:
-        tx_hash = tx.get("id", "")
-        sender = tx.get("sender", "")
-        receiver = tx.get("payment-transaction", {}).get("receiver", "")
-        asset_id = str(tx.get("asset-transfer-transaction", {}).get("asset-id", 0))
-        asset_info = tokens.get(asset_id, fetch_asset_info(asset_id))
-        currency = asset_info["unit-name"]
-        decimals = asset_info["decimals"]
-
-        amount = tx.get("payment-transaction", {}).get("amount", 0) / 10 ** decimals
-        if tx.get("asset-transfer-transaction"):
-            amount = tx.get("asset-transfer-transaction", {}).get("amount", 0) / 10 ** decimals
-
-        fee = tx.get("fee", 0) / 1e6
-        date = format_date(tx.get("round-time", 0))
-        label = "sent" if sender == wallet_address else "received"
+    raw_amount = tx.get("payment-transaction", {}).get("amount", 0)
+    if tx.get("asset-transfer-transaction"):
+        raw_amount = tx.get("asset-transfer-transaction", {}).get("amount", 0)
+        receiver = tx.get("asset-transfer-transaction", {}).get("receiver", "")
+    amount = raw_amount / 10 ** decimals
 
-        note = decode_base64(tx.get("note", ""))
-        global_state_data = parse_global_state_delta(tx)
+    label = "sent" if sender == wallet_address else "received"
+    counterparty = None
+    if counterparties is not None:
+        app_id = tx.get("application-transaction", {}).get("application-id")
+        counterparty = counterparties.app(app_id) if app_id else None
+        if counterparty is None:
+            counterparty = counterparties.address(receiver if label == "sent" else sender)
+    tx_type = TX_TYPE_TRANSFER
+    if label == "received" and (sender in reward_senders
+                                or counterparty is not None and counterparty.category == CATEGORY_STAKING):
+        tx_type = TX_TYPE_STAKING
 
+    note = decode_base64(tx.get("note", ""))
+    global_state_data = parse_global_state_delta(tx)
+
+    if counterparty is not None:
+        description = describe(counterparty, label == "sent")
+        if note:
+            description += f" | {note}"
+    else:
         description = note if note else f"Transaction involving {currency}"
-        if global_state_data:
-            description += f" | Global State: {global_state_data}"
-
-        rows.append([
-            date,
-            amount if label == "sent" else "",
-            currency,
-            amount if label == "received" else "",
-            currency,
-            fee,
-            currency,
-            "",  # Net Worth Amount left blank
-            "USD",
-            label,
-            description,
-            tx_hash,
-            asset_id
-        ])
-
-    write_csv(file_path, header, rows)
-
-
-def export_data(format, wallet_address):
+    if global_state_data:
+        description += f" | Global State: {global_state_data}"
+
+    return {
+        "timestamp": tx.get("round-time", 0),
+        "round": tx.get("confirmed-round", 0),
+        "intra_round_offset": tx.get("intra-round-offset", 0),
+        "tx_type": tx_type,
+        "sent_amount": amount if label == "sent" else "",
+        "sent_currency": currency,
+        "received_amount": amount if label == "received" else "",
+        "received_currency": currency,
+        "fee": tx.get("fee", 0) / 1e6,
+        "fee_currency": currency,
+        "net_worth_amount": "",  # Set from prices, if any (see add_net_worth)
+        "net_worth_currency": "USD",
+        "label": KOINLY_LABELS.get(tx_type, label),
+        "description": description,
+        "tx_hash": tx.get("id", ""),
+        "asset_id": asset_id,
+        "currency": currency,
+        "raw_amount": raw_amount,
+        "decimals": decimals,
+        "sender": sender,
+        "receiver": receiver,
+        "counterparty": counterparty.label if counterparty is not None else "",
+        "category": counterparty.category if counterparty is not None else "",
+    }
+
+
+def lookup_token(app_id, tokens, registry=None):
+    """
+    Return an ARC-200/ARC-72 contract's metadata from voi_tokens.json or the token registry, or None.
+    """
+    token_info = tokens.get(str(app_id))
+    if token_info is None and registry is not None:
+        token_info = registry.get(app_id)
+    return token_info
+
+
+def resolve_token(app_id, tokens, registry=None, standard=STANDARD_ARC200):
+    """
+    Look up an ARC-200/ARC-72 contract's metadata in voi_tokens.json, then the token registry.
+
+    Contracts are applications, not ASAs, so unknown ones get a placeholder named
+    "<STANDARD>-<app id>" instead of an indexer lookup. An unknown ARC-200 token's
+    decimals are not known either: its amounts stay in base units, and it is counted
+    as TOKEN_DECIMALS_UNKNOWN. Results are memoized in `tokens`.
+    """
+    key = str(app_id)
+    token_info = lookup_token(app_id, tokens, registry)
+    if token_info is None:
+        token_info = {"unit-name": f"{standard.upper()}-{app_id}", "decimals": 0}
+        if standard == STANDARD_ARC200:
+            error_counter.increment("TOKEN_DECIMALS_UNKNOWN", key)
+            print(f"Unknown ARC-200 token {app_id}: amounts are in base units (add it to voi_tokens.json "
+                  "or the token registry)")
+    if key not in tokens:
+        tokens[key] = token_info
+    return token_info
+
+
+def token_rows(tx, wallet_address, tokens, registry=None, counterparties=None):
+    """
+    Build normalized rows (as classify_transaction) for the ARC-200/ARC-72 transfers a
+    transaction logged to or from the wallet.
+
+    The network fee belongs to the transaction's own row, so these rows carry none.
+    ARC-72 tokens are single units named "<unit>#<token id>", with the asset id
+    "<app id>#<token id>" so cost basis and summaries keep each token apart.
+    """
+    rows = []
+    for event in transfer_events(tx, wallet_address):
+        sender = event.values["from"]
+        receiver = event.values["to"]
+        token_info = resolve_token(event.app_id, tokens, registry, event.standard)
+        if event.standard == STANDARD_ARC72:
+            currency = f"{token_info['unit-name']}#{event.values['token_id']}"
+            asset_id = f"{event.app_id}#{event.values['token_id']}"
+            raw_amount, decimals = 1, 0
+        else:
+            currency = token_info["unit-name"]
+            asset_id = str(event.app_id)
+            raw_amount, decimals = event.values["value"], token_info["decimals"]
+        amount = raw_amount / 10 ** decimals
+        label = "sent" if sender == wallet_address else "received"
+        kind = "mint" if sender == ZERO_ADDRESS else "transfer"
+        description = f"{event.standard.upper()} {kind} of {currency} (app {event.app_id})"
+        counterparty = None
+        if counterparties is not None:
+            counterparty = counterparties.address(receiver if label == "sent" else sender)
+        if counterparty is not None:
+            description = f"{describe(counterparty, label == 'sent')} | {description}"
+        rows.append({
+            "timestamp": tx.get("round-time", 0),
+            "round": tx.get("confirmed-round", 0),
+            "intra_round_offset": tx.get("intra-round-offset", 0),
+            "tx_type": TX_TYPE_TRANSFER,
+            "sent_amount": amount if label == "sent" else "",
+            "sent_currency": currency,
+            "received_amount": amount if label == "received" else "",
+            "received_currency": currency,
+            "fee": 0,
+            "fee_currency": currency,
+            "net_worth_amount": "",
+            "net_worth_currency": "USD",
+            "label": label,
+            "description": description,
+            "tx_hash": tx.get("id", ""),
+            "asset_id": asset_id,
+            "currency": currency,
+            "raw_amount": raw_amount,
+            "decimals": decimals,
+            "sender": sender,
+            "receiver": receiver,
+            "counterparty": counterparty.label if counterparty is not None else "",
+            "category": counterparty.category if counterparty is not None else "",
+        })
+    return rows
+
+
+def add_net_worth(row, prices):
+    """
+    Set a row's net_worth_amount to the USD value of the amount moved, if `prices` (a
+    PriceStore or PriceTable) knows its currency at the row's time.
+    """
+    amount = row["sent_amount"] if row["sent_amount"] != "" else row["received_amount"]
+    if amount == "":
+        return
+    price = prices.price_at(row["currency"], row["timestamp"])
+    if price is not None:
+        row["net_worth_amount"] = amount * price
+
+
+def transaction_rows(tx, wallet_address, tokens, registry=None, reward_senders=(), counterparties=None,
+                     prices=None):
+    """
+    Return all rows of one transaction: its own row, then one per token transfer it logged.
+
+    With `prices`, rows are valued in USD (see add_net_worth).
+    """
+    rows = [classify_transaction(tx, wallet_address, tokens, registry, reward_senders, counterparties)]
+    if tx.get("logs") or tx.get("inner-txns"):
+        rows += token_rows(tx, wallet_address, tokens, registry, counterparties)
+    if prices is not None:
+        for row in rows:
+            add_net_worth(row, prices)
+    return rows
+
+
+def report_rows(format, transactions, wallet_address, tokens, registry=None, options=None, portfolio=None,
+                prices=None):
+    """
+    Classify transactions into the normalized rows of a report, before aggregation.
+
+    Rows are sorted unless options["order"] is "indexer"; with a PortfolioIndex,
+    self-transfers are marked (and reduced to their fee outside the default format).
+    With a PriceStore, rows get their USD net worth. With options["workers"] (0 for
+    one per CPU), large histories are classified in a process pool (see parallel.py). Counterparties come from voi_counterparties.json
+    and the options["counterparties"] files (see get_counterparties).
+    """
+    options = options or {}
+    reward_senders = frozenset(options.get("reward_senders", ()))
+    counterparties = get_counterparties(options.get("counterparties", ()))
+    workers = worker_count(options.get("workers", 1))
+    if workers > 1 and len(transactions) >= PARALLEL_MIN_TRANSACTIONS:
+        # Workers get a read-only table of every asset the transactions use, resolved here once
+        assets = {asset_id: resolve_asset(asset_id, tokens, registry)
+                  for asset_id in {transaction_asset_id(tx) for tx in transactions}}
+        # Unknown contracts are left out: only the workers' decoded events tell their
+        # standard, so workers name them (see resolve_token)
+        for app_id in {app_id for tx in transactions for app_id in logged_app_ids(tx)}:
+            token_info = lookup_token(app_id, tokens, registry)
+            if token_info is not None:
+                assets[str(app_id)] = token_info
+        rows = classify_parallel(transactions, wallet_address, assets, reward_senders, workers,
+                                 counterparties=counterparties, prices=prices)
+    else:
+        rows = chain.from_iterable(
+            transaction_rows(tx, wallet_address, tokens, registry, reward_senders, counterparties, prices)
+            for tx in transactions
+        )
+    if options.get("order", ORDER_CHRONOLOGICAL) == ORDER_CHRONOLOGICAL:
+        rows = external_sort(rows, run_size=options.get("sort_run_size", RUN_SIZE))
+    if portfolio is not None:
+        rows = portfolio.mark(wallet_address, rows)
+        if format != FORMAT_DEFAULT:
+            rows = self_transfer_fees(rows)
+    return rows
+
+
+def portfolio_index(wallet_address, options):
+    """
+    Return the PortfolioIndex for a wallet's export: the one shared by the whole run
+    (options["portfolio_index"]) if given, else a new one over options["portfolio"].
+    """
+    if options.get("portfolio_index") is not None:
+        return options["portfolio_index"]
+    if options.get("portfolio"):
+        return PortfolioIndex(set(options["portfolio"]) | {wallet_address})
+    return None
+
+
+def export_rows(format, transactions, wallet_address, tokens, reports_dir, registry=None, options=None):
+    """
+    Export classified transactions in a format with a row spec in format_specs.py (Koinly, ...).
+
+    Options: reward_senders (addresses whose payments are staking rewards),
+    aggregate_rewards (window name from aggregate.WINDOWS to merge reward rows),
+    portfolio (the other wallets of the owner; transfers between them are
+    self-transfers, kept in the default format and reduced to their fee elsewhere),
+    portfolio_index (a PortfolioIndex shared by every wallet of the run, see
+    portfolio_index), order ("chronological", the default, or "indexer" for the indexer's newest-first
+    order), sort_run_size (rows held in memory while sorting, see extsort),
+    prices and asset_prices (CoinGecko price files; rows get their USD net worth),
+    cost_basis (a cost_basis.METHODS method; realized gains and year-end positions
+    are written alongside, valued with the same prices), summary
+    (also write yearly totals per asset and type as CSV and JSON) and outputs (see
+    writers.select_output). Returns the paths of the files written.
+    """
+    options = options or {}
+    formatter = get_formatter(format)
+    file_path = os.path.join(reports_dir, f"voi_{wallet_address}_{format}.csv")
+    output = select_output(options.get("outputs"), format)
+    portfolio = portfolio_index(wallet_address, options)
+    prices = load_prices(options) if options.get("prices") or options.get("asset_prices") else None
+    rows = report_rows(format, transactions, wallet_address, tokens, registry, options, portfolio, prices)
+
+    cost_basis = None
+    if options.get("cost_basis"):
+        if options.get("order", ORDER_CHRONOLOGICAL) == ORDER_CHRONOLOGICAL:
+            cost_basis = CostBasisEngine(options["cost_basis"], prices if prices is not None else PriceStore())
+            rows = cost_basis.consume(rows)
+        else:
+            print("Skipping cost basis: it needs rows in chronological order.")
+    summary = None
+    if options.get("summary"):
+        summary = TaxSummary()
+        rows = summary.consume(rows)
+
+    aggregator = None
+    if options.get("aggregate_rewards"):
+        aggregator = RewardAggregator(WINDOWS[options["aggregate_rewards"]])
+        rows = aggregator.aggregate(rows)
+
+    paths = [path for path in [write_csv(file_path, formatter.header, map(formatter, rows), output)] if path]
+    if portfolio is not None and not options.get("portfolio_index"):
+        print(portfolio.summary())
+    if cost_basis is not None:
+        paths += write_cost_basis(cost_basis, wallet_address, reports_dir, output)
+    if summary is not None:
+        paths += write_summary(summary, os.path.join(reports_dir, f"voi_{wallet_address}_{format}_summary.csv"),
+                               output)
+
+    if aggregator is None:
+        return paths
+    txids_path = os.path.join(reports_dir, f"voi_{wallet_address}_{format}_reward_txids.json")
+    with open(txids_path, "w") as f:
+        json.dump(aggregator.txids, f, indent=1)
+    print(f"Aggregated {aggregator.rows_in} rows into {aggregator.rows_out} "
+          f"(compression {aggregator.compression_ratio():.1f}x); reward txids in {txids_path}")
+    return paths + [txids_path]
+
+
+def load_prices(options):
+    """
+    Load the PriceStore for the prices (VOI) and asset_prices ({currency: path}) CoinGecko files.
+    """
+    paths = dict(options.get("asset_prices") or {})
+    if options.get("prices"):
+        paths.setdefault("VOI", options["prices"])
+    return PriceStore.from_files(paths)
+
+
+def write_cost_basis(engine, wallet_address, reports_dir, output=OUTPUT_CSV):
+    """
+    Write a finished CostBasisEngine's realized gains and year-end positions. Returns the paths written.
+    """
+    engine.finish()
+    if engine.missing_prices:
+        print(f"No prices for {', '.join(sorted(engine.missing_prices))}; valued at 0.")
+    name = f"voi_{wallet_address}_{engine.method}"
+    paths = [
+        write_csv(os.path.join(reports_dir, f"{name}_gains.csv"), GAINS_HEADER, gain_rows(engine.disposals), output),
+        write_csv(os.path.join(reports_dir, f"{name}_positions.csv"), POSITIONS_HEADER,
+                  position_rows(engine.positions), output),
+    ]
+    return [path for path in paths if path]
+
+
+def write_summary(summary, file_path, output=OUTPUT_CSV):
+    """
+    Write a TaxSummary as a report (`file_path`, in the output type) and as JSON next to it.
+    """
+    paths = [write_csv(file_path, SUMMARY_HEADER, summary.rows(), output)]
+    json_path = os.path.splitext(file_path)[0] + ".json"
+    try:
+        summary.write_json(json_path)
+        print(f"Summary exported to {json_path}")
+        paths.append(json_path)
+    except IOError as e:
+        error_counter.increment("FILE_WRITE_ERROR", json_path)
+        print(f"Error writing to file {json_path}: {e}")
+    return [path for path in paths if path]
+
+
+def export_balances(transactions, wallet_address, tokens, reports_dir, registry=None, balance_dates=None,
+                    output=OUTPUT_CSV):
+    """
+    Export per-asset balances at the end of each balance date (default: now) to CSV.
+
+    Returns the paths of the files written.
+    """
+    engine = BalanceEngine(wallet_address)
+    engine.add_transactions(transactions)
+    return write_balances(engine, tokens, reports_dir, registry, balance_dates, output)
+
+
+def write_balances(engine, tokens, reports_dir, registry=None, balance_dates=None, output=OUTPUT_CSV):
+    """
+    Write a BalanceEngine's balances at the end of each balance date (default: now).
+    """
+    file_path = os.path.join(reports_dir, f"voi_{engine.wallet_address}_balances.csv")
+    if balance_dates:
+        # Balances at the end of each (UTC) day
+        snapshots = [(date, parse_date(date) + 86399) for date in balance_dates]
+    else:
+        now = int(datetime.now(tz=timezone.utc).timestamp())
+        snapshots = [(format_date(now), now)]
+
+    rows = balance_rows(engine, snapshots, lambda asset_id: resolve_asset(str(asset_id), tokens, registry))
+    path = write_csv(file_path, BALANCES_HEADER, rows, output)
+    return [path] if path else []
+
+
+def balance_export_options(options):
+    """
+    Adjust options for a balances export, which needs history from genesis.
+
+    Range start and filter options are dropped; the range end defaults to the last
+    balance date so later transactions are not fetched.
+    """
+    ignored = [key for key in BALANCE_IGNORED_OPTION_KEYS if options.get(key) is not None]
+    if ignored:
+        print(f"Balances need the complete history; ignoring options: {', '.join(ignored)}")
+    options = {key: value for key, value in options.items() if key not in BALANCE_IGNORED_OPTION_KEYS}
+    if options.get("balance_dates") and not options.get("end_date"):
+        options["end_date"] = max(options["balance_dates"])
+    return options
+
+
+def export_data(format, wallet_address, options=None):
     """
     Export transaction data for the specified format and wallet address.
+
+    Supported options: start_date/end_date (YYYY-MM-DD, inclusive), min_round/max_round
+    (inclusive), the indexer filters tx_type, asset_id, currency_greater_than and
+    currency_less_than, exclude_fields (transaction fields to drop after fetching),
+    stream_pages (parse indexer pages incrementally), restart (discard any saved
+    progress instead of resuming), balance_dates (YYYY-MM-DD dates for the balances
+    format), reconcile (check end balances against the account and refetch gaps),
+    indexers and hedge (indexer endpoints, see use_endpoints), reward_senders and
+    aggregate_rewards (see export_rows), and outputs
+    ({format or "*": output type}, see writers.py).
+
+    Returns the paths of the files written. Raises FetchError if the transactions
+    cannot be fetched completely; progress is checkpointed so the next run resumes
+    where this one stopped.
     """
-    reports_dir = os.path.abspath("reports")
-    os.makedirs(reports_dir, exist_ok=True)
+    options = export_options(format, options)
+    transactions = load_transactions(wallet_address, options)
+    return write_reports(format, wallet_address, transactions, options)
+
+
+def export_options(format, options=None):
+    """
+    Return the options a fetch for this format actually uses.
+    """
+    options = options or {}
+    if format == FORMAT_BALANCES_CALCULATED:
+        options = balance_export_options(options)
+    return options
+
+
+def load_transactions(wallet_address, options, reports_dir=None):
+    """
+    Fetch (or resume fetching) a wallet's transactions and apply the range options.
+
+    The checkpoint is cleared once the fetch completes. Raises FetchError as
+    fetch_transactions does.
+    """
+    reports_dir = reports_dir or os.path.abspath("reports")
+    use_endpoints(options)
+    checkpoint = FetchCheckpoint(os.path.join(reports_dir, CHECKPOINT_DIR), wallet_address, query_options(options))
+    if options.get("restart"):
+        checkpoint.clear()
+
+    round_index = RoundIndex(get_data_path(ROUND_INDEX_FILE))
+    with _round_index_lock:
+        round_index.load()
+        # A resumed fetch reuses the query saved in its checkpoint
+        query_params = None if checkpoint.load() else build_query_params(options, round_index)
 
-    tokens_file_path = get_data_path("voi_tokens.json")
     try:
-        with open(tokens_file_path, "r") as f:
-            tokens = json.load(f).get("tokens", {})
-    except FileNotFoundError:
-        tokens = {}
-        error_counter.increment("FILE_ERROR", wallet_address)
-        print(f"Error: The '{tokens_file_path}' file does not exist. Using dynamic asset fetching.")
-
-    transactions = fetch_transactions(wallet_address)
+        transactions = fetch_transactions(
+            wallet_address, query_params, options.get("exclude_fields"), options.get("stream_pages", False),
+            checkpoint, get_cache(),
+        )
+    except FetchError as e:
+        print(f"Error: {e}")
+        print("Progress has been saved; rerun the same command to resume.")
+        raise
+    with _round_index_lock:
+        round_index.load()
+        round_index.add_transactions(transactions)
+        round_index.flush()
+
+    if options.get("reconcile"):
+        partial = [key for key in QUERY_OPTION_KEYS if options.get(key) is not None and key != "exclude_fields"]
+        if partial:
+            print(f"Skipping reconciliation: it needs the complete history (options: {', '.join(partial)}).")
+        else:
+            try:
+                transactions = reconcile_transactions(wallet_address, transactions, options)
+            except FAILOVER_ERRORS + (KeyError,) as e:
+                error_counter.increment("RECONCILE_ERROR", wallet_address)
+                print(f"Error reconciling balances: {e}")
+
+    checkpoint.clear()
+    return filter_range(transactions, options)
+
+
+def write_reports(format, wallet_address, transactions, options, reports_dir=None):
+    """
+    Write the report files for one format. Returns the paths of the files written.
+    """
+    reports_dir = reports_dir or os.path.abspath("reports")
+    os.makedirs(reports_dir, exist_ok=True)
+    tokens = load_tokens()
+    # Opened on first lookup; tokens missing from voi_tokens.json are resolved here before the indexer
+    registry = get_registry()
     if not transactions:
         print("No transactions found for the given wallet.")
+    elif format == FORMAT_BALANCES_CALCULATED:
+        return export_balances(transactions, wallet_address, tokens, reports_dir, registry,
+                               options.get("balance_dates"), select_output(options.get("outputs"), format))
+    elif format in FORMAT_COLUMNS:
+        return export_rows(format, transactions, wallet_address, tokens, reports_dir, registry, options)
+    else:
+        print(f"Format {format} is not supported yet.")
+    return []
+
+
+class ReportFollower:
+    """
+    Keeps one wallet's report current after its initial export.
+
+    Each update fetches only the rounds after the last one seen. Report rows are
+    appended to the report file, which is opened and closed for each update, so
+    compressed reports get one complete gzip member or zstd frame per update and stay
+    readable while the follow runs. The balances report is rewritten from a
+    BalanceEngine the new transactions are folded into.
+    """
+    def __init__(self, format, wallet_address, options, reports_dir):
+        self.format = format
+        self.wallet_address = wallet_address
+        self.options = options
+        self.reports_dir = reports_dir
+        self.output = select_output(options.get("outputs"), format)
+        self.query_params = build_query_params({key: options.get(key) for key in FILTER_PARAMS})
+        self.portfolio = portfolio_index(wallet_address, options)
+        self.last_round = 0
+        self.engine = None
+        # The report (".csv" path) rows are appended to, once written
+        self.file_path = None
+
+    def start(self, transactions, start_round):
+        """
+        Write the initial report from `transactions` (fetched when the indexer was at
+        `start_round`). Returns the paths written.
+        """
+        rounds = [tx.get("confirmed-round", 0) for tx in transactions]
+        # Later transactions of the wallet are all after its newest fetched one
+        self.last_round = max(rounds) if rounds else start_round
+        tokens = load_tokens()
+        registry = get_registry()
+        if self.format == FORMAT_BALANCES_CALCULATED:
+            self.engine = BalanceEngine(self.wallet_address)
+            self.engine.add_transactions(transactions)
+            return write_balances(self.engine, tokens, self.reports_dir, registry, output=self.output)
+
+        paths = export_rows(self.format, transactions, self.wallet_address, tokens, self.reports_dir, registry,
+                            self.options)
+        if paths:
+            self.file_path = os.path.join(self.reports_dir, f"voi_{self.wallet_address}_{self.format}.csv")
+        return paths
+
+    def update(self, latest_round):
+        """
+        Add the wallet's transactions up to `latest_round` to the report.
+
+        Returns the number of transactions added. Raises FetchError as
+        fetch_transactions does; the same rounds are fetched again on the next update.
+        """
+        params = dict(self.query_params, **{"min-round": self.last_round + 1, "max-round": latest_round})
+        transactions = fetch_transactions(self.wallet_address, params, self.options.get("exclude_fields"),
+                                          self.options.get("stream_pages", False), cache=get_cache())
+        self.last_round = latest_round
+        if not transactions:
+            return 0
+        tokens = load_tokens()
+        registry = get_registry()
+        if self.engine is not None:
+            self.engine.add_transactions(transactions)
+            write_balances(self.engine, tokens, self.reports_dir, registry, output=self.output)
+        elif self.file_path is not None:
+            formatter = get_formatter(self.format)
+            rows = report_rows(self.format, transactions, self.wallet_address, tokens, registry, self.options,
+                               self.portfolio)
+            with open_writer(self.file_path, self.output, append=True) as writer:
+                writer.writerows(map(formatter, rows))
+            print(f"Appended {len(transactions)} transactions to {writer.path} (round {latest_round}).")
+        return len(transactions)
+
+
+def check_follow_options(format, options):
+    """
+    Raise ValueError if follow mode cannot keep this format's report current with these options.
+    """
+    options = options or {}
+    conflicting = [key for key in FOLLOW_CONFLICTING_OPTION_KEYS if options.get(key)]
+    if conflicting:
+        raise ValueError(f"Follow mode cannot be combined with: {', '.join(conflicting)}")
+    if format == FORMAT_BALANCES_CALCULATED:
         return
+    if format not in FORMAT_COLUMNS:
+        raise ValueError(f"Format {format} is not supported yet.")
+    if select_output(options.get("outputs"), format) == OUTPUT_XLSX:
+        raise ValueError("Follow mode needs a CSV output; XLSX reports cannot be appended to")
+
+
+def follow_reports(format, wallet_addresses, options=None, reports_dir=None, poll_interval=FOLLOW_POLL_INTERVAL,
+                   max_polls=None):
+    """
+    Export reports for the wallets, then keep them current until interrupted.
+
+    Every `poll_interval` seconds the indexer's latest round is checked; when it has
+    advanced, each wallet's transactions in the new rounds are fetched with one query
+    and added to its report (see ReportFollower). Stops after `max_polls` polls if given.
+    Raises ValueError for options a follow cannot honour (see check_follow_options).
+    """
+    check_follow_options(format, options)
+    options = export_options(format, options)
+    if options.get("portfolio") and options.get("portfolio_index") is None:
+        options = dict(options, portfolio_index=PortfolioIndex(set(options["portfolio"]) | set(wallet_addresses)))
+    use_endpoints(options)
+    reports_dir = reports_dir or os.path.abspath("reports")
+    os.makedirs(reports_dir, exist_ok=True)
+    session = get_session()
+
+    followers = []
+    try:
+        for wallet_address in wallet_addresses:
+            start_round = fetch_latest_round(session)
+            transactions = load_transactions(wallet_address, options, reports_dir)
+            follower = ReportFollower(format, wallet_address, options, reports_dir)
+            followers.append(follower)
+            follower.start(transactions, start_round)
+
+        print(f"Following {len(followers)} wallet(s) every {poll_interval}s; press Ctrl+C to stop.")
+        polls = 0
+        while max_polls is None or polls < max_polls:
+            time.sleep(poll_interval)
+            polls += 1
+            try:
+                latest_round = fetch_latest_round(session)
+            except FAILOVER_ERRORS + (KeyError,) as e:
+                print(f"Error polling the indexer: {e}")
+                continue
+            for follower in followers:
+                if latest_round <= follower.last_round:
+                    continue
+                try:
+                    follower.update(latest_round)
+                except FetchError as e:
+                    print(f"Error: {e}")
+    except KeyboardInterrupt:
+        print("Stopped following.")
 
-    if format == "koinly":
-        export_to_koinly(transactions, wallet_address, tokens, reports_dir)
+
+def query_options(options):
+    """
+    Return the options that determine which transactions are fetched.
+    """
+    return {key: value for key, value in options.items() if key in QUERY_OPTION_KEYS}
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="VOI Exporter")
     parser.add_argument("--format", required=True, help="Specify the export format (e.g., koinly)")
     parser.add_argument("--wallet", required=True, help="Specify the wallet address")
+    add_range_arguments(parser)
+    add_filter_arguments(parser)
+    add_fetch_arguments(parser)
+    add_balance_arguments(parser)
+    add_classification_arguments(parser)
+    add_cost_basis_arguments(parser)
+    add_output_arguments(parser)
+    add_follow_arguments(parser)
     args = parser.parse_args()
 
-    export_data(args.format, args.wallet)
+    options = range_options(args)
+    options.update(filter_options(args))
+    options.update(fetch_options(args))
+    options.update(balance_options(args))
+    options.update(classification_options(args))
+    options.update(cost_basis_options(args))
+    options.update(output_options(args))
+    if args.follow:
+        try:
+            check_follow_options(args.format, options)
+        except ValueError as e:
+            parser.error(str(e))
+    try:
+        if args.follow:
+            follow_reports(args.format, [args.wallet], options, poll_interval=args.poll_interval)
+        else:
+            export_data(args.format, args.wallet, options)
+    except FetchError:
+        sys.exit(1)
+    finally:
+        print_fetch_metrics()
@@ -0,0 +1,167 @@
+import argparse
+import csv
+import gzip
+import io
+import os
+import time
+
+# Report output types; the value is the file extension that replaces ".csv"
+OUTPUT_CSV = "csv"
+OUTPUT_GZIP = "csv.gz"
+OUTPUT_ZSTD = "csv.zst"
+OUTPUT_XLSX = "xlsx"
+OUTPUTS = [OUTPUT_CSV, OUTPUT_GZIP, OUTPUT_ZSTD, OUTPUT_XLSX]
+
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+
+def output_path(file_path, output=OUTPUT_CSV):
+    """
+    Return the report path for an output type: "x.csv" becomes "x.csv.gz", "x.xlsx", ...
+    """
+    base, ext = os.path.splitext(file_path)
+    return f"{base if ext == '.csv' else file_path}.{output}"
+
+
+def _zstd_compressor():
+    # zstd is in the standard library from Python 3.14; older versions need the zstandard package
+    try:
+        from compression import zstd
+        return lambda raw: zstd.ZstdFile(raw, "wb", level=ZSTD_LEVEL)
+    except ImportError:
+        pass
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("zstd output needs Python 3.14+ or the 'zstandard' package") from None
+    return lambda raw: zstandard.ZstdCompressor(level=ZSTD_LEVEL).stream_writer(raw, closefd=True)
+
+
+class CsvWriter:
+    """
+    Streams rows to a plain, gzip or zstd compressed CSV file.
+
+    With `append`, rows are added to an existing file; compressed files get a new
+    gzip member or zstd frame, which decompressors read as one stream.
+    """
+    def __init__(self, path, output=OUTPUT_CSV, append=False):
+        self.path = path
+        mode = "a" if append else "w"
+        if output == OUTPUT_GZIP:
+            self.file = gzip.open(path, mode + "t", newline="", compresslevel=GZIP_LEVEL)
+        elif output == OUTPUT_ZSTD:
+            compressor = _zstd_compressor()
+            self.file = io.TextIOWrapper(compressor(open(path, mode + "b")), newline="")
+        else:
+            self.file = open(path, mode, newline="")
+        self.writer = csv.writer(self.file)
+
+    def writerow(self, row):
+        self.writer.writerow(row)
+
+    def writerows(self, rows):
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.file.close()
+
+
+class XlsxWriter:
+    """
+    Streams rows to an XLSX sheet with openpyxl's write-only mode (constant memory).
+    """
+    def __init__(self, path, sheet_title="Transactions"):
+        from openpyxl import Workbook
+
+        self.path = path
+        self.workbook = Workbook(write_only=True)
+        self.sheet = self.workbook.create_sheet(sheet_title)
+
+    def writerow(self, row):
+        self.sheet.append(row)
+
+    def writerows(self, rows):
+        for row in rows:
+            self.sheet.append(row)
+
+    def close(self):
+        self.workbook.save(self.path)
+
+
+class _Writer:
+    def __init__(self, writer):
+        self.writer = writer
+
+    def __enter__(self):
+        return self.writer
+
+    def __exit__(self, *exc_info):
+        self.writer.close()
+
+
+def open_writer(file_path, output=OUTPUT_CSV, append=False):
+    """
+    Open a row writer for `file_path` (a ".csv" path) in the given output type.
+
+    Use as a context manager; the writer has writerow, writerows and the `path`
+    actually written. `append` adds to an existing CSV file (not supported for XLSX).
+    """
+    if output not in OUTPUTS:
+        raise ValueError(f"Unsupported output: {output}")
+    if append and output == OUTPUT_XLSX:
+        raise ValueError("XLSX reports cannot be appended to")
+    path = output_path(file_path, output)
+    writer = XlsxWriter(path) if output == OUTPUT_XLSX else CsvWriter(path, output, append)
+    return _Writer(writer)
+
+
+def select_output(outputs, format):
+    """
+    Pick the output type for a report format from {format or "*": output}.
+    """
+    outputs = outputs or {}
+    return outputs.get(format, outputs.get("*", OUTPUT_CSV))
+
+
+def _sample_rows(count):
+    for i in range(count):
+        yield [
+            "2024-03-01 12:00:00", "", "VOI", f"{i % 977}.{i % 1000000:06d}", "VOI", "0.001", "VOI", "",
+            "USD", "reward", "Transaction involving VOI",
+            f"{i:052d}".replace("0", "Q"), 0,
+        ]
+
+
+def benchmark(directory, rows=200000):
+    """
+    Write the same synthetic Koinly rows in every available output type and time it.
+    """
+    header = ["Date", "Sent Amount", "Sent Currency", "Received Amount", "Received Currency", "Fee Amount",
+              "Fee Currency", "Net Worth Amount", "Net Worth Currency", "Label", "Description", "TxHash",
+              "Asset ID"]
+    results = []
+    for output in OUTPUTS:
+        file_path = os.path.join(directory, "benchmark.csv")
+        start = time.perf_counter()
+        try:
+            with open_writer(file_path, output) as writer:
+                writer.writerow(header)
+                writer.writerows(_sample_rows(rows))
+        except ImportError as e:
+            print(f"{output:8} skipped: {e}")
+            continue
+        elapsed = time.perf_counter() - start
+        size = os.path.getsize(writer.path)
+        os.remove(writer.path)
+        results.append((output, elapsed, size))
+        print(f"{output:8} {elapsed:6.2f}s {rows / elapsed:10.0f} rows/s {size / 1e6:8.1f} MB")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark report output writers")
+    parser.add_argument("--rows", type=int, default=200000, help="Number of synthetic rows to write")
+    parser.add_argument("--dir", default=".", help="Directory for the temporary output files")
+    args = parser.parse_args()
+    benchmark(args.dir, args.rows)
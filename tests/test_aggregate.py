@@ -0,0 +1,46 @@
+from aggregate import WINDOWS, RewardAggregator
+from ExporterTypes import TX_TYPE_STAKING, TX_TYPE_TRANSFER
+
+
+def _row(timestamp, tx_type, raw_amount, txid, asset_id="0"):
+    return {
+        "timestamp": timestamp, "tx_type": tx_type, "asset_id": asset_id, "currency": "VOI", "decimals": 6,
+        "raw_amount": raw_amount, "received_amount": raw_amount / 1e6, "fee": 0.001, "tx_hash": txid,
+        "description": "",
+    }
+
+
+def test_rewards_merge_per_day_and_other_rows_pass_through():
+    day = WINDOWS["day"]
+    # Newest first, as returned by the indexer
+    rows = [
+        _row(2 * day + 50, TX_TYPE_STAKING, 300, "C"),
+        _row(day + 90, TX_TYPE_STAKING, 200, "B2"),
+        _row(day + 80, TX_TYPE_TRANSFER, 999, "T"),
+        _row(day + 10, TX_TYPE_STAKING, 100, "B1"),
+        _row(day + 5, TX_TYPE_STAKING, 7, "X", asset_id="42"),
+    ]
+    aggregator = RewardAggregator(day)
+    out = list(aggregator.aggregate(rows))
+
+    assert [row["tx_hash"] for row in out] == ["C", "T", "B2", "X"]
+    merged = out[2]
+    assert merged["raw_amount"] == 300
+    assert merged["received_amount"] == 0.0003
+    assert merged["timestamp"] == day + 90
+    assert merged["fee"] == ""
+    assert aggregator.txids == {f"{TX_TYPE_STAKING}-0-{day}": ["B2", "B1"]}
+    assert aggregator.rows_in == 5 and aggregator.rows_out == 4
+    assert aggregator.compression_ratio() == 1.25
+
+
+def test_buckets_are_emitted_before_rows_of_later_windows():
+    day = WINDOWS["day"]
+    rows = [
+        _row(10, TX_TYPE_STAKING, 100, "R1"),
+        _row(2 * day, TX_TYPE_TRANSFER, 5, "T2"),
+        _row(5 * day, TX_TYPE_TRANSFER, 5, "T5"),
+        _row(6 * day, TX_TYPE_STAKING, 100, "R6"),
+    ]
+    out = list(RewardAggregator(day).aggregate(rows))
+    assert [row["tx_hash"] for row in out] == ["R1", "T2", "T5", "R6"]
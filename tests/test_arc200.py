@@ -0,0 +1,72 @@
+import base64
+
+import voi_exporter
+from arc200 import (
+    ZERO_ADDRESS, decode_address, decode_log, encode_address, encode_event, event_selector, iter_events,
+    transfer_events,
+)
+
+WALLET = encode_address(bytes(31) + b"\x01")
+POOL = encode_address(bytes(range(32)))
+TOKENS = {"0": {"unit-name": "VOI", "decimals": 6}, "390001": {"unit-name": "wVOI", "decimals": 6}}
+
+
+def test_selectors_and_addresses():
+    # Published ARC-200 Transfer selector
+    assert event_selector("arc200_Transfer(address,address,uint256)").hex() == "7983c35c"
+    assert ZERO_ADDRESS == "A" * 52 + "Y5HFKQ"
+    assert decode_address(encode_address(bytes(range(32)))) == bytes(range(32))
+
+
+def test_decodes_known_events_and_skips_other_logs():
+    approval = encode_event("arc200_Approval", {"owner": WALLET, "spender": POOL, "value": 7})
+    event = decode_log(5, approval)
+    assert (event.app_id, event.standard, event.name) == (5, "arc200", "arc200_Approval")
+    assert event.values == {"owner": WALLET, "spender": POOL, "value": 7}
+
+    assert decode_log(5, base64.b64encode(b"plain log message").decode()) is None
+    # A known selector with the wrong payload length is not an event
+    assert decode_log(5, base64.b64encode(base64.b64decode(approval)[:-1]).decode()) is None
+
+
+def test_swap_logs_become_token_rows():
+    tx = {
+        "id": "SWAP", "confirmed-round": 10, "round-time": 1700000000, "fee": 2000, "sender": WALLET,
+        "application-transaction": {"application-id": 777},
+        "logs": [base64.b64encode(b"swap").decode()],
+        "inner-txns": [
+            {"application-transaction": {"application-id": 390001}, "logs": [
+                encode_event("arc200_Transfer", {"from": WALLET, "to": POOL, "value": 2500000}),
+                encode_event("arc200_Transfer", {"from": POOL, "to": POOL, "value": 1}),
+            ]},
+            {"application-transaction": {"application-id": 888}, "logs": [
+                encode_event("arc200_Transfer", {"from": ZERO_ADDRESS, "to": WALLET, "value": 42}),
+                encode_event("arc72_Transfer", {"from": POOL, "to": WALLET, "token_id": 9}),
+            ]},
+        ],
+    }
+    assert [event.name for event in iter_events(tx)] == ["arc200_Transfer"] * 3 + ["arc72_Transfer"]
+    assert len(list(transfer_events(tx, WALLET))) == 3
+
+    tokens = dict(TOKENS)
+    rows = voi_exporter.transaction_rows(tx, WALLET, tokens)
+    assert [(row["label"], row["currency"], row["sent_amount"], row["received_amount"], row["fee"])
+            for row in rows] == [
+        ("sent", "VOI", 0.0, "", 0.002),
+        ("sent", "wVOI", 2.5, "", 0),
+        ("received", "ARC200-888", "", 42.0, 0),
+        ("received", "ARC200-888#9", "", 1.0, 0),
+    ]
+    assert rows[2]["description"] == "ARC200 mint of ARC200-888 (app 888)"
+    assert {row["tx_hash"] for row in rows} == {"SWAP"}
+    assert tokens["888"] == {"unit-name": "ARC200-888", "decimals": 0}
+
+
+def test_nfts_are_separate_assets_named_by_standard():
+    tx = {"id": "NFT", "confirmed-round": 10, "round-time": 1700000000, "fee": 1000, "sender": POOL,
+          "application-transaction": {"application-id": 999}, "logs": [
+              encode_event("arc72_Transfer", {"from": POOL, "to": WALLET, "token_id": 1}),
+              encode_event("arc72_Transfer", {"from": POOL, "to": WALLET, "token_id": 2}),
+          ]}
+    rows = voi_exporter.token_rows(tx, WALLET, dict(TOKENS))
+    assert [(row["asset_id"], row["currency"]) for row in rows] == [("999#1", "ARC72-999#1"), ("999#2", "ARC72-999#2")]
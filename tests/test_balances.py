@@ -0,0 +1,44 @@
+from balances import BalanceEngine, balance_rows
+
+WALLET = "WALLET"
+
+
+def _tx(round_number, offset, **fields):
+    tx = {"confirmed-round": round_number, "intra-round-offset": offset, "round-time": 1000 + 3 * round_number}
+    tx.update(fields)
+    return tx
+
+
+def test_fees_close_remainders_and_inner_transactions():
+    transactions = [
+        # Newest first, as returned by the indexer
+        _tx(30, 0, sender="APP", fee=1000, **{
+            "application-transaction": {},
+            "inner-txns": [
+                {"sender": "APP", "fee": 0, "asset-transfer-transaction": {"asset-id": 7, "amount": 40, "receiver": WALLET}},
+            ],
+        }),
+        _tx(20, 1, sender=WALLET, fee=1000, **{
+            "payment-transaction": {"amount": 2000000, "receiver": "OTHER", "close-amount": 500, "close-remainder-to": "OTHER"},
+        }),
+        _tx(20, 0, sender="OTHER", fee=1000, **{"asset-transfer-transaction": {"asset-id": 7, "amount": 100, "receiver": WALLET}}),
+        _tx(10, 0, sender="OTHER", fee=1000, **{"payment-transaction": {"amount": 5000000, "receiver": WALLET}}),
+    ]
+    engine = BalanceEngine(WALLET)
+    engine.add_transactions(transactions)
+
+    assert engine.final_balances() == {0: 5000000 - 2000000 - 500 - 1000, 7: 140}
+    assert engine.balances_at_round(19) == {0: 5000000, 7: 0}
+    assert engine.balances_at_round(20) == {0: 2998500, 7: 100}
+    assert engine.balances_at_time(1000 + 3 * 30 - 1) == {0: 2998500, 7: 100}
+
+
+def test_balance_rows_use_asset_decimals_and_skip_zero_balances():
+    engine = BalanceEngine(WALLET)
+    engine.add_transactions([
+        _tx(10, 0, sender="OTHER", **{"payment-transaction": {"amount": 1234567, "receiver": WALLET}}),
+        _tx(12, 0, sender="OTHER", **{"asset-transfer-transaction": {"asset-id": 9, "amount": 5, "receiver": WALLET}}),
+    ])
+    info = {0: {"unit-name": "VOI", "decimals": 6}, 9: {"unit-name": "NFT", "decimals": 0}}
+    rows = balance_rows(engine, [("2024-12-31", 1000 + 3 * 11)], info.get)
+    assert rows == [["2024-12-31", 0, "VOI", "1.234567", 1234567, 10]]
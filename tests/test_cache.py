@@ -0,0 +1,90 @@
+import io
+
+import pytest
+
+from cache import NS_ASSETS, NS_PAGES, Cache, LocalDirCache, S3Cache, SQLiteCache, open_cache
+from exporter_koinly import NullMap
+
+
+class MissingKey(Exception):
+    response = {"Error": {"Code": "NoSuchKey"}}
+
+
+class FakeS3Client:
+    """
+    In-memory stand-in for the get_object/put_object calls of an S3-compatible store.
+    """
+    def __init__(self):
+        self.objects = {}
+
+    def get_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise MissingKey(Key)
+        return {"Body": io.BytesIO(self.objects[(Bucket, Key)])}
+
+    def put_object(self, Bucket, Key, Body):
+        self.objects[(Bucket, Key)] = Body
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_700_000_000
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(params=["dir", "sqlite", "s3"])
+def make_cache(request, tmp_path):
+    client = FakeS3Client()
+
+    def make(**kwargs):
+        if request.param == "dir":
+            return LocalDirCache(str(tmp_path / "cache"), **kwargs)
+        if request.param == "sqlite":
+            return SQLiteCache(str(tmp_path / "cache.sqlite"), **kwargs)
+        return S3Cache("bucket", "voi/", client=client, **kwargs)
+    return make
+
+
+def test_batched_round_trip(make_cache):
+    cache = make_cache()
+    cache.set_many(NS_PAGES, {"a/b?next=1": {"transactions": [{"id": "T1"}]}, "c": [1, 2]})
+    assert cache.get_many(NS_PAGES, ["a/b?next=1", "c", "missing"]) == {
+        "a/b?next=1": {"transactions": [{"id": "T1"}]},
+        "c": [1, 2],
+    }
+    # Shared with other instances on the same backend
+    assert make_cache().get(NS_PAGES, "c") == [1, 2]
+    assert cache.get(NS_ASSETS, "c") is None
+
+
+def test_entries_expire_per_namespace(make_cache):
+    clock = Clock()
+    cache = make_cache(ttls={NS_ASSETS: 60}, clock=clock)
+    cache.set(NS_ASSETS, "6779767", {"unit-name": "VIA", "decimals": 6})
+    cache.set(NS_PAGES, "page", {"transactions": []})
+    clock.now += 61
+    assert cache.get(NS_ASSETS, "6779767") is None
+    assert cache.get(NS_PAGES, "page") == {"transactions": []}
+
+
+def test_incomplete_backend_fails_at_construction():
+    class ReadOnlyCache(Cache):
+        def _get_raw_many(self, namespace, keys):
+            return {}
+
+    with pytest.raises(TypeError):
+        ReadOnlyCache()
+
+
+def test_null_map_is_shared_through_the_cache(tmp_path):
+    cache = open_cache(f"dir:{tmp_path}")
+    null_map = NullMap(cache=cache)
+    assert null_map.get_null_symbol("VIA") == "NULL1"
+    null_map.flush()
+
+    other = NullMap(cache=open_cache(f"dir:{tmp_path}"))
+    other.load()
+    assert other.get_null_symbol("VIA") == "NULL1"
+    assert other.get_null_symbol("aUSDC") == "NULL2"
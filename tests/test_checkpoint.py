@@ -0,0 +1,46 @@
+import os
+
+from checkpoint import FetchCheckpoint
+
+
+def _page(first, count):
+    return [{"id": f"T{i}", "confirmed-round": 100 - i} for i in range(first, first + count)]
+
+
+def test_resume_restores_pages_and_token(tmp_path):
+    checkpoint = FetchCheckpoint(str(tmp_path), "W", {"start_date": "2024-01-01"})
+    assert not checkpoint.load()
+    checkpoint.query_params = {"limit": 2, "after-time": "2024-01-01T00:00:00Z"}
+    checkpoint.record_page(_page(0, 2), "token-1")
+    checkpoint.record_page(_page(2, 2), "token-2")
+
+    resumed = FetchCheckpoint(str(tmp_path), "W", {"start_date": "2024-01-01"})
+    assert resumed.load()
+    assert resumed.next_token == "token-2"
+    assert resumed.query_params == {"limit": 2, "after-time": "2024-01-01T00:00:00Z"}
+    assert resumed.pages == 2
+    assert resumed.last_round == 97
+    assert resumed.transactions() == _page(0, 4)
+
+
+def test_page_written_after_last_state_save_is_dropped(tmp_path):
+    checkpoint = FetchCheckpoint(str(tmp_path), "W")
+    checkpoint.query_params = {}
+    checkpoint.record_page(_page(0, 2), "token-1")
+    # Simulate a crash between spooling a page and saving the state
+    with open(checkpoint.spool_path, "a") as f:
+        f.write('{"id": "partial"}\n')
+
+    resumed = FetchCheckpoint(str(tmp_path), "W")
+    assert resumed.load()
+    assert resumed.transactions() == _page(0, 2)
+
+
+def test_different_options_start_over(tmp_path):
+    checkpoint = FetchCheckpoint(str(tmp_path), "W", {"tx_type": "pay"})
+    checkpoint.query_params = {}
+    checkpoint.record_page(_page(0, 2), "token-1")
+
+    other = FetchCheckpoint(str(tmp_path), "W", {"tx_type": "axfer"})
+    assert not other.load()
+    assert not os.path.exists(other.spool_path)
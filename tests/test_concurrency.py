@@ -0,0 +1,113 @@
+import threading
+import time
+
+import requests
+
+import voi_exporter
+from concurrency import THROUGHPUT_WINDOW, AimdLimiter
+from endpoints import EndpointPool
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_increases_additively_and_halves_once_per_burst():
+    clock = FakeClock()
+    limiter = AimdLimiter(initial=2, maximum=8, clock=clock)
+    for _ in range(3):
+        limiter.release(limiter.acquire())
+    assert int(limiter.limit) == 3
+
+    starts = [limiter.acquire() for _ in range(3)]
+    clock.now = 1.0
+    for start in starts:
+        limiter.release(start, success=False, throttled=True)
+    # The three throttled requests were in flight together: one decrease
+    assert 1 < limiter.limit < 2
+    assert limiter.metrics()["throttled"] == 3
+    limiter.release(limiter.acquire(), success=False, throttled=True)
+    assert limiter.limit == 1
+
+
+def test_budget_is_shared_across_threads():
+    limiter = AimdLimiter(initial=2, maximum=2)
+
+    def request():
+        with limiter.slot():
+            time.sleep(0.01)
+
+    threads = [threading.Thread(target=request) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    metrics = limiter.metrics()
+    assert metrics["peak_in_flight"] == 2
+    assert metrics["requests"] == 8 and metrics["in_flight"] == 0
+
+
+def test_indexer_get_backs_off_on_429(monkeypatch):
+    limiter = AimdLimiter(initial=4)
+    monkeypatch.setattr(voi_exporter, "_limiter", limiter)
+    monkeypatch.setattr(voi_exporter, "_endpoints", EndpointPool(["http://indexer.test"]))
+    monkeypatch.setattr(voi_exporter, "RETRY_BACKOFF", 0)
+    responses = [429, 200]
+
+    def get_with_retries(session, url, params=None, **kwargs):
+        status = responses.pop(0)
+        if status == 429:
+            response = requests.Response()
+            response.status_code = status
+            raise requests.HTTPError(response=response)
+        return {"round": 7}
+
+    monkeypatch.setattr(voi_exporter, "get_with_retries", get_with_retries)
+    assert voi_exporter.fetch_latest_round(None) == 7
+    metrics = voi_exporter.fetch_metrics()
+    assert metrics["throttled"] == 1 and metrics["requests"] == 2
+    assert metrics["concurrency"] == 2
+
+
+def test_each_attempt_takes_its_own_slot(monkeypatch):
+    from requests.exceptions import Timeout
+
+    clock = FakeClock()
+    limiter = AimdLimiter(initial=8, clock=clock)
+    monkeypatch.setattr(voi_exporter, "_limiter", limiter)
+    monkeypatch.setattr(voi_exporter, "_endpoints", EndpointPool(["http://indexer.test"]))
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(limiter.in_flight)
+        clock.now += seconds
+
+    monkeypatch.setattr(voi_exporter.time, "sleep", sleep)
+    calls = []
+
+    def get_with_retries(session, url, params=None, retries=4, **kwargs):
+        calls.append(retries)
+        if len(calls) < 3:
+            raise Timeout("slow")
+        return {"round": 7}
+
+    monkeypatch.setattr(voi_exporter, "get_with_retries", get_with_retries)
+    assert voi_exporter.fetch_latest_round(None) == 7
+    # Single HTTP attempts; no slot is held while backing off; both timeouts decreased the limit
+    assert calls == [1, 1, 1]
+    assert sleeps == [0, 0]
+    assert limiter.metrics()["throttled"] == 2
+    assert int(limiter.limit) == 2
+
+
+def test_completions_outside_the_window_are_dropped():
+    clock = FakeClock()
+    limiter = AimdLimiter(clock=clock)
+    for second in range(100):
+        clock.now = float(second)
+        limiter.release(limiter.acquire())
+    assert len(limiter.completed) <= THROUGHPUT_WINDOW + 1
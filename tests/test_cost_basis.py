@@ -0,0 +1,78 @@
+import pytest
+
+from ExporterTypes import TX_TYPE_SELF_TRANSFER, TX_TYPE_STAKING, TX_TYPE_TRANSFER
+from cost_basis import METHOD_FIFO, METHOD_HIFO, METHOD_LIFO, CostBasisEngine
+from price_store import PriceStore
+
+DAY = 86400
+# 2024-01-01 and 2025-01-01 00:00 UTC
+Y2024 = 1704067200
+Y2025 = 1735689600
+
+
+def _row(day, amount, received, tx_hash, tx_type=TX_TYPE_TRANSFER, fee=0.0, start=Y2024):
+    return {
+        "timestamp": start + day * DAY, "tx_hash": tx_hash, "tx_type": tx_type, "asset_id": "0", "currency": "VOI",
+        "decimals": 6, "raw_amount": amount * 10 ** 6, "fee": fee,
+        "received_amount": amount if received else "", "sent_amount": "" if received else amount,
+    }
+
+
+@pytest.fixture
+def prices():
+    store = PriceStore()
+    # VOI trades at 1, 3 and 2 USD on days 0, 1 and 2, and 4 USD from 2025
+    store.add("VOI", [(Y2024, 1.0), (Y2024 + DAY, 3.0), (Y2024 + 2 * DAY, 2.0), (Y2025, 4.0)])
+    return store
+
+
+def _sell_after_two_buys(method, prices):
+    engine = CostBasisEngine(method, prices)
+    rows = [_row(0, 10, True, "B1"), _row(1, 10, True, "B2", TX_TYPE_STAKING), _row(2, 15, False, "S1")]
+    assert list(engine.consume(rows)) == rows
+    engine.finish()
+    return engine
+
+
+@pytest.mark.parametrize("method, cost_basis, remaining_cost", [
+    (METHOD_FIFO, 10 * 1.0 + 5 * 3.0, 15.0),
+    (METHOD_LIFO, 10 * 3.0 + 5 * 1.0, 5.0),
+    (METHOD_HIFO, 10 * 3.0 + 5 * 1.0, 5.0),
+])
+def test_disposal_matches_lots_by_method(prices, method, cost_basis, remaining_cost):
+    engine = _sell_after_two_buys(method, prices)
+    (disposal,) = engine.disposals
+    assert disposal.amount == 15 * 10 ** 6
+    assert disposal.proceeds == pytest.approx(30.0)
+    assert disposal.cost_basis == pytest.approx(cost_basis)
+    assert disposal.unmatched == 0
+    (position,) = engine.positions
+    assert (position.year, position.amount) == (2024, 5 * 10 ** 6)
+    assert position.cost_basis == pytest.approx(remaining_cost)
+
+
+def test_hifo_picks_the_most_expensive_lot_first(prices):
+    engine = CostBasisEngine(METHOD_HIFO, prices)
+    for row in [_row(0, 5, True, "B1"), _row(1, 5, True, "B2"), _row(2, 5, True, "B3"), _row(3, 12, False, "S1")]:
+        engine.add_row(row)
+    # 5 at 3 USD, 5 at 2 USD, then 2 of the 1 USD lot
+    assert engine.disposals[0].cost_basis == pytest.approx(15.0 + 10.0 + 2.0)
+
+
+def test_fees_unmatched_disposals_and_year_end_positions(prices):
+    engine = CostBasisEngine(METHOD_FIFO, prices)
+    rows = [
+        _row(0, 10, True, "B1"),
+        _row(1, 2, False, "T1", TX_TYPE_SELF_TRANSFER, fee=0.001),
+        _row(2, 12, False, "S1", fee=0.001),
+        _row(0, 1, True, "B2", start=Y2025),
+    ]
+    for row in rows:
+        engine.add_row(row)
+    engine.finish()
+
+    assert [(d.tx_hash, d.kind, d.amount) for d in engine.disposals] == [
+        ("T1", "fee", 1000), ("S1", "sent", 12 * 10 ** 6), ("S1", "fee", 1000)]
+    # The self-transfer moved nothing, so the sale exhausts the lots and 2 VOI have no known cost
+    assert engine.disposals[1].unmatched == 2 * 10 ** 6 + 1000
+    assert [(p.year, p.amount, p.market_value) for p in engine.positions] == [(2025, 10 ** 6, 4.0)]
@@ -0,0 +1,54 @@
+import json
+import os
+
+import voi_exporter
+from counterparties import CATEGORY_EXCHANGE, CATEGORY_STAKING, CounterpartyIndex, application_address
+from ExporterTypes import TX_TYPE_STAKING, TX_TYPE_TRANSFER
+
+WALLET = "W" * 58
+EXCHANGE = "E" * 58
+STAKING = "S" * 58
+TOKENS = {"0": {"unit-name": "VOI", "decimals": 6}}
+
+
+def _write(path, data, mtime):
+    with open(path, "w") as f:
+        json.dump(data, f)
+    os.utime(path, ns=(mtime, mtime))
+
+
+def test_index_covers_apps_their_accounts_and_overrides(tmp_path):
+    base = tmp_path / "base.json"
+    local = tmp_path / "local.json"
+    _write(base, {"apps": {"395509": {"label": "DEX pool wVOI/GM", "category": "dex_pool"}},
+                  "addresses": {EXCHANGE: {"label": "Old name", "category": CATEGORY_EXCHANGE}}}, 10 ** 18)
+    _write(local, {"addresses": {EXCHANGE: {"label": "Exchange", "category": CATEGORY_EXCHANGE}}}, 10 ** 18)
+
+    index = CounterpartyIndex([str(base), str(local), str(tmp_path / "missing.json")])
+    assert index.refresh()
+    assert index.app(395509).label == "DEX pool wVOI/GM"
+    assert index.address(application_address(395509)) is index.app(395509)
+    assert index.address(EXCHANGE).label == "Exchange"
+    assert not index.refresh()
+
+    _write(local, {"addresses": {EXCHANGE: {"label": "Renamed", "category": CATEGORY_EXCHANGE}}}, 2 * 10 ** 18)
+    assert index.refresh()
+    assert index.address(EXCHANGE).label == "Renamed"
+
+
+def test_classification_uses_categories(tmp_path):
+    path = tmp_path / "counterparties.json"
+    _write(path, {"addresses": {EXCHANGE: {"label": "Exchange", "category": CATEGORY_EXCHANGE},
+                                STAKING: {"label": "Staking pool", "category": CATEGORY_STAKING}}}, 10 ** 18)
+    index = CounterpartyIndex([str(path)])
+    index.refresh()
+
+    deposit = {"id": "T1", "sender": WALLET, "fee": 1000, "note": "",
+               "payment-transaction": {"receiver": EXCHANGE, "amount": 10 ** 6}}
+    reward = {"id": "T2", "sender": STAKING, "fee": 1000, "payment-transaction": {"receiver": WALLET, "amount": 5}}
+    rows = [voi_exporter.classify_transaction(tx, WALLET, TOKENS, None, (), index) for tx in (deposit, reward)]
+
+    assert [(row["tx_type"], row["description"], row["category"]) for row in rows] == [
+        (TX_TYPE_TRANSFER, "Deposit to Exchange", CATEGORY_EXCHANGE),
+        (TX_TYPE_STAKING, "Staking reward from Staking pool", CATEGORY_STAKING),
+    ]
@@ -0,0 +1,122 @@
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+import voi_exporter
+from endpoints import EndpointPool, HEDGE_MIN_SAMPLES
+from query import get_with_retries
+
+
+class StandIn:
+    """
+    Local indexer stand-in answering /health after `delay` seconds, or with `status`.
+    """
+    def __init__(self, name):
+        self.delay = 0.0
+        self.status = 200
+        self.hits = 0
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stand_in.hits += 1
+                time.sleep(stand_in.delay)
+                body = json.dumps({"round": 1, "server": name}).encode()
+                self.send_response(stand_in.status)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stand_ins():
+    servers = [StandIn("a"), StandIn("b")]
+    yield servers
+    for server in servers:
+        server.close()
+
+
+def health(pool, session):
+    return pool.call(lambda base_url, s: get_with_retries(s, f"{base_url}/health", retries=1, timeout=2),
+                     session, session_factory=requests.Session)["server"]
+
+
+def closed_port_url():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+
+def test_fails_over_from_dead_endpoint(stand_ins):
+    pool = EndpointPool([closed_port_url(), stand_ins[0].url])
+    with requests.Session() as session:
+        assert health(pool, session) == "a"
+        assert health(pool, session) == "a"
+    dead, live = pool.stats()
+    assert dead["errors"] == 1 and live["requests"] == 2
+    # The failed endpoint is cooling down, so it is not tried again
+    assert pool.ranked()[0].url == stand_ins[0].url
+
+
+def test_routes_to_lowest_latency_and_keeps_client_errors(stand_ins):
+    slow, fast = stand_ins
+    slow.delay = 0.05
+    pool = EndpointPool([slow.url, fast.url])
+    with requests.Session() as session:
+        servers = [health(pool, session) for _ in range(5)]
+        assert servers[2:] == ["b"] * 3
+
+        fast.status = 404
+        with pytest.raises(requests.HTTPError):
+            health(pool, session)
+    # A 404 is the same on every indexer: neither failed over nor counted as an error
+    assert slow.hits == 1
+    assert pool.stats()[1]["errors"] == 0
+
+
+def test_hedges_slow_request_to_second_endpoint(stand_ins):
+    primary, secondary = stand_ins
+    secondary.delay = 0.02
+    pool = EndpointPool([primary.url, secondary.url], hedge=True)
+    with requests.Session() as session:
+        # Both are tried once, then the faster primary serves until it has enough samples to hedge
+        servers = [health(pool, session) for _ in range(HEDGE_MIN_SAMPLES + 1)]
+        assert servers.count("a") == HEDGE_MIN_SAMPLES
+        primary.delay = 1.0
+        start = time.monotonic()
+        assert health(pool, session) == "b"
+    assert time.monotonic() - start < 0.5
+    assert pool.stats()[1]["hedges"] == 1
+
+
+def test_timeout_from_failover_stops_fetch_with_its_progress(monkeypatch):
+    pages = [{"transactions": [{"id": "T1", "confirmed-round": 9}], "next-token": "n1"}]
+
+    def indexer_get(session, path, params=None, stream=False, retries=None):
+        if not pages:
+            # What a hedged call raises when every endpoint timed out
+            raise TimeoutError("indexer timed out")
+        return pages.pop(0)
+
+    monkeypatch.setattr(voi_exporter, "indexer_get", indexer_get)
+    with pytest.raises(voi_exporter.FetchError) as excinfo:
+        voi_exporter.fetch_transactions("W")
+    assert (excinfo.value.pages, excinfo.value.transactions_fetched, excinfo.value.last_round) == (1, 1, 9)
+    assert isinstance(excinfo.value.cause, TimeoutError)
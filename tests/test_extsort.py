@@ -0,0 +1,35 @@
+import random
+
+import extsort
+from extsort import ROW_ORDER, external_sort
+
+
+def _rows(count, seed=7):
+    rng = random.Random(seed)
+    rows = [{"round": rng.randrange(50), "intra_round_offset": rng.randrange(4), "tx_hash": f"T{i:05d}"}
+            for i in range(count)]
+    rng.shuffle(rows)
+    return rows
+
+
+def test_spilled_runs_merge_to_the_in_memory_order(tmp_path, monkeypatch):
+    rows = _rows(1000)
+    written = []
+    write_run = extsort._write_run
+    monkeypatch.setattr(extsort, "_write_run", lambda items, tmp_dir: written.append(len(items))
+                        or write_run(items, tmp_dir))
+
+    assert list(external_sort(rows, run_size=64, tmp_dir=str(tmp_path))) == sorted(rows, key=ROW_ORDER)
+    assert written == [64] * 15 + [40]
+
+
+def test_small_inputs_are_sorted_in_memory(monkeypatch):
+    monkeypatch.setattr(extsort, "_write_run", None)
+    rows = _rows(10)
+    assert list(external_sort(rows, run_size=64)) == sorted(rows, key=ROW_ORDER)
+    assert list(external_sort([], run_size=64)) == []
+
+
+def test_sort_is_stable_across_runs():
+    items = [(i % 3, i) for i in range(100)]
+    assert list(external_sort(items, key=lambda item: item[0], run_size=7)) == sorted(items, key=lambda item: item[0])
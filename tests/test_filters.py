@@ -0,0 +1,33 @@
+import argparse
+
+from cli_options import APP_CALL_PAYLOAD_FIELDS, add_filter_arguments, filter_options
+from voi_exporter import build_query_params, project_transaction
+
+
+def _parse(*argv):
+    parser = argparse.ArgumentParser()
+    add_filter_arguments(parser)
+    return filter_options(parser.parse_args(list(argv)))
+
+
+def test_filter_options_become_indexer_params():
+    options = _parse("--tx-type", "axfer", "--asset-id", "302190", "--currency-greater-than", "1000",
+                     "--currency-less-than", "5000", "--exclude", "app-payloads", "--exclude", "note")
+    assert options["exclude_fields"] == frozenset(APP_CALL_PAYLOAD_FIELDS) | {"note"}
+    assert build_query_params(options) == {
+        "tx-type": "axfer", "asset-id": 302190, "currency-greater-than": 1000, "currency-less-than": 5000,
+    }
+    assert _parse() == {}
+    assert build_query_params({}) == {}
+
+
+def test_projection_drops_fields_of_inner_transactions():
+    tx = {
+        "id": "T1", "note": "aGk=", "logs": ["AA=="],
+        "application-transaction": {"application-id": 5},
+        "inner-txns": [{"id": "I1", "logs": ["AQ=="], "inner-txns": [{"id": "I2", "global-state-delta": []}]}],
+    }
+    projected = project_transaction(tx, frozenset(APP_CALL_PAYLOAD_FIELDS))
+    assert projected == {"id": "T1", "note": "aGk=", "inner-txns": [{"id": "I1", "inner-txns": [{"id": "I2"}]}]}
+    # The fetched transaction is left unchanged
+    assert tx["inner-txns"][0]["logs"] == ["AQ=="]
@@ -0,0 +1,83 @@
+import csv
+import gzip
+
+import pytest
+
+import voi_exporter
+
+WALLET = "W" * 58
+OTHER = "O" * 58
+
+
+def _tx(txid, round_number, sender=OTHER, receiver=WALLET):
+    return {"id": txid, "confirmed-round": round_number, "round-time": 1700000000 + round_number, "fee": 1000,
+            "sender": sender, "payment-transaction": {"receiver": receiver, "amount": 2000000}}
+
+
+@pytest.fixture
+def indexer(monkeypatch):
+    history = [_tx("T2", 12), _tx("T1", 10, WALLET, OTHER)]
+    chain = {"round": 12, "transactions": []}
+    queries = []
+
+    def fetch_transactions(wallet_address, query_params=None, *args, **kwargs):
+        queries.append(query_params)
+        return [tx for tx in chain["transactions"]
+                if query_params["min-round"] <= tx["confirmed-round"] <= query_params["max-round"]]
+
+    monkeypatch.setattr(voi_exporter, "fetch_latest_round", lambda session: chain["round"])
+    monkeypatch.setattr(voi_exporter, "load_transactions", lambda wallet_address, options, reports_dir: history)
+    monkeypatch.setattr(voi_exporter, "fetch_transactions", fetch_transactions)
+    monkeypatch.setattr(voi_exporter, "load_tokens", lambda: {"0": {"unit-name": "VOI", "decimals": 6}})
+    monkeypatch.setattr(voi_exporter, "get_registry", lambda: None)
+    monkeypatch.setattr(voi_exporter, "get_cache", lambda: None)
+
+    def sleep(seconds):
+        # Each poll finds one new round holding one new transaction
+        chain["round"] += 1
+        chain["transactions"].append(_tx(f"T{chain['round']}", chain["round"]))
+    monkeypatch.setattr(voi_exporter.time, "sleep", sleep)
+    return queries
+
+
+def test_follow_appends_only_new_rounds(tmp_path, indexer):
+    voi_exporter.follow_reports("koinly", [WALLET], {}, str(tmp_path), poll_interval=0, max_polls=2)
+
+    with open(tmp_path / f"voi_{WALLET}_koinly.csv", newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0][0] == "Date"
+    assert [row[rows[0].index("TxHash")] for row in rows[1:]] == ["T1", "T2", "T13", "T14"]
+    assert [(query["min-round"], query["max-round"]) for query in indexer] == [(13, 13), (14, 14)]
+
+
+def test_follow_rewrites_balances(tmp_path, indexer):
+    voi_exporter.follow_reports("balances_calculated", [WALLET], {}, str(tmp_path), poll_interval=0, max_polls=3)
+
+    with open(tmp_path / f"voi_{WALLET}_balances.csv", newline="") as f:
+        rows = list(csv.DictReader(f))
+    # Received 2 VOI in rounds 12-15, sent 2 VOI plus the fee in round 10
+    assert [(row["Asset ID"], row["Balance (base units)"], row["Round"]) for row in rows] == [("0", "5999000", "15")]
+
+
+def test_follow_rejects_a_closed_range():
+    with pytest.raises(ValueError, match="end_date"):
+        voi_exporter.check_follow_options("koinly", {"end_date": "2024-12-31"})
+    with pytest.raises(ValueError, match="XLSX"):
+        voi_exporter.check_follow_options("koinly", {"outputs": {"*": "xlsx"}})
+
+
+def test_compressed_report_is_readable_between_updates(tmp_path, indexer, monkeypatch):
+    path = tmp_path / f"voi_{WALLET}_koinly.csv.gz"
+    seen = []
+    poll = voi_exporter.time.sleep
+
+    def sleep(seconds):
+        # Read the report while the follow is still running
+        with gzip.open(path, "rt", newline="") as f:
+            seen.append(len(list(csv.reader(f))))
+        poll(seconds)
+    monkeypatch.setattr(voi_exporter.time, "sleep", sleep)
+
+    voi_exporter.follow_reports("koinly", [WALLET], {"outputs": {"*": "csv.gz"}}, str(tmp_path), poll_interval=0,
+                                max_polls=2)
+    assert seen == [3, 4]
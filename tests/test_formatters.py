@@ -0,0 +1,55 @@
+from datetime import datetime, timezone
+
+from ExporterTypes import FORMAT_COINLEDGER, FORMAT_COINPANDA, FORMAT_DIVLY, FORMAT_KOINLY, FORMATS, KOINLY_FIELDS
+from format_specs import FORMAT_COLUMNS, get_formatter
+from formatters import Column, columns_from_fields, compile_formatter, date_transform, mapping_transform
+
+COLUMNS = [
+    Column("Date", "timestamp", 0, str),
+    Column("Amount", "amount"),
+    Column("Currency", "currency", "VOI"),
+    Column("Exchange", None, "VOI"),
+    Column("Kind", "label", "transfer", mapping_transform({"reward": "staking"}, "transfer")),
+    Column("Raw Label", "label", "none"),
+]
+
+
+def test_compiled_formatter_matches_dict_lookups():
+    format_row = compile_formatter(COLUMNS)
+    assert format_row.header == ["Date", "Amount", "Currency", "Exchange", "Kind", "Raw Label"]
+    complete = {"timestamp": 5, "amount": 1.5, "currency": "VIA", "label": "reward", "extra": 1}
+    assert format_row(complete) == ["5", 1.5, "VIA", "VOI", "staking", "reward"]
+    # Missing keys take each column's own default
+    assert format_row({"amount": 2}) == ["0", 2, "VOI", "VOI", "transfer", "none"]
+
+
+def test_columns_follow_exporter_types_fields():
+    columns = columns_from_fields(KOINLY_FIELDS, {"TxHash": "tx_hash"})
+    assert [column.header for column in columns] == KOINLY_FIELDS
+    assert compile_formatter(columns)({"tx_hash": "T1"})[-1] == "T1"
+
+    assert set(FORMAT_COLUMNS) <= set(FORMATS)
+    koinly = get_formatter(FORMAT_KOINLY)
+    assert koinly.header[:len(KOINLY_FIELDS)] == KOINLY_FIELDS
+    assert get_formatter(FORMAT_KOINLY) is koinly
+
+
+def test_cached_date_transform_matches_strftime():
+    for date_format in ("%Y-%m-%d %H:%M:%S", "%m/%d/%Y %H:%M:%S", "%Y-%m-%d", "%H:%M:%S"):
+        transform = date_transform(date_format)
+        for timestamp in (0, 86399, 1700000000, 1735689599, 4102444800):
+            expected = datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime(date_format)
+            assert transform(timestamp) == expected
+    assert date_transform("%Y-%m-%d")(None) == "1970-01-01 00:00:00"
+
+
+def test_fee_only_rows_are_outgoing_in_every_format():
+    row = {"timestamp": 1700000000, "label": "cost", "sent_amount": "", "received_amount": "", "fee": 0.001,
+           "fee_currency": "VOI", "tx_hash": "T1"}
+    coinpanda = get_formatter(FORMAT_COINPANDA)
+    values = dict(zip(coinpanda.header, coinpanda(row)))
+    assert values["Type"] == "Send" and values["Label"] == "Cost"
+    coinledger = get_formatter(FORMAT_COINLEDGER)
+    assert dict(zip(coinledger.header, coinledger(row)))["Type"] == "Withdrawal"
+    divly = get_formatter(FORMAT_DIVLY)
+    assert dict(zip(divly.header, divly(row)))["transaction_type"] == "withdrawal"
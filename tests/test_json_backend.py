@@ -0,0 +1,39 @@
+import json
+
+import pytest
+
+import json_backend
+from json_backend import PageStream
+
+
+def _chunks(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+def test_page_stream_matches_full_decode(chunk_size):
+    page = json_backend._benchmark_page(20)
+    stream = PageStream(_chunks(page, chunk_size))
+
+    assert list(stream) == json.loads(page)["transactions"]
+    assert stream.fields == {"current-round": 2000000, "next-token": "abc"}
+
+
+def test_page_stream_handles_multibyte_text_and_empty_array():
+    page = json.dumps({"transactions": [{"note": "déjà vu ✓"}], "next-token": 12}, ensure_ascii=False).encode("utf-8")
+    stream = PageStream(_chunks(page, 1))
+    assert list(stream) == [{"note": "déjà vu ✓"}]
+    assert stream.fields["next-token"] == 12
+
+    empty = PageStream([b'{"current-round": 5, "transactions": []}'])
+    assert list(empty) == []
+    assert empty.fields == {"current-round": 5}
+
+
+def test_page_stream_rejects_truncated_page():
+    with pytest.raises(json_backend.JSONDecodeError):
+        list(PageStream([b'{"transactions": [{"id": 1}, {"id"']))
+
+
+def test_loads_accepts_bytes():
+    assert json_backend.loads(b'{"a": [1, 2]}') == {"a": [1, 2]}
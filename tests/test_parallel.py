@@ -0,0 +1,69 @@
+import threading
+
+import voi_exporter
+from price_store import PriceStore
+from parallel import _pool_context, chunk_bounds, classify_parallel
+
+WALLET = "W" * 58
+OTHER = "O" * 58
+ASSETS = {"0": {"unit-name": "VOI", "decimals": 6}, "7": {"unit-name": "TKN", "decimals": 2}}
+
+
+def _transactions(count):
+    transactions = []
+    for i in range(count):
+        tx = {"id": f"T{i}", "confirmed-round": 1000 - i // 3, "round-time": 1700000000 - i, "fee": 1000,
+              "sender": WALLET if i % 2 else OTHER}
+        if i % 5:
+            tx["payment-transaction"] = {"receiver": WALLET, "amount": i * 1000}
+        else:
+            tx["asset-transfer-transaction"] = {"asset-id": 7, "receiver": OTHER, "amount": i}
+        transactions.append(tx)
+    return transactions
+
+
+def test_chunks_are_cut_only_between_rounds():
+    transactions = _transactions(100)
+    bounds = list(chunk_bounds(transactions, chunk_size=10))
+    assert bounds[0] == (0, 12)
+    assert [start for start, _ in bounds[1:]] == [end for _, end in bounds[:-1]]
+    assert bounds[-1][1] == len(transactions)
+    for start, end in bounds[1:]:
+        assert transactions[start]["confirmed-round"] != transactions[start - 1]["confirmed-round"]
+
+
+def test_parallel_rows_match_serial_classification():
+    transactions = _transactions(300)
+    serial = [voi_exporter.classify_transaction(tx, WALLET, dict(ASSETS), None, {OTHER}) for tx in transactions]
+    parallel = list(classify_parallel(transactions, WALLET, ASSETS, {OTHER}, workers=2, chunk_size=16))
+    assert parallel == serial
+
+
+def test_workers_value_rows_from_the_shared_price_table():
+    prices = PriceStore()
+    prices.add("VOI", [(1699999000, 0.5), (1699999900, 0.25)])
+    transactions = _transactions(100)
+    serial = [row for tx in transactions
+              for row in voi_exporter.transaction_rows(tx, WALLET, dict(ASSETS), None, {OTHER}, prices=prices)]
+    parallel = list(classify_parallel(transactions, WALLET, ASSETS, {OTHER}, workers=2, chunk_size=16,
+                                      prices=prices))
+    assert parallel == serial
+    assert serial[1]["net_worth_amount"] == serial[1]["sent_amount"] * 0.25
+    # No TKN prices: its rows stay unvalued
+    assert serial[0]["currency"] == "TKN" and serial[0]["net_worth_amount"] == ""
+
+
+def test_workers_are_not_forked_while_other_threads_run():
+    stop = threading.Event()
+    # Holds a lock the way the limiter or caches do while a request is in flight
+    with voi_exporter._round_index_lock:
+        background = threading.Thread(target=stop.wait)
+        background.start()
+        try:
+            assert _pool_context().get_start_method() != "fork"
+            transactions = _transactions(60)
+            serial = [voi_exporter.classify_transaction(tx, WALLET, dict(ASSETS)) for tx in transactions]
+            assert list(classify_parallel(transactions, WALLET, ASSETS, workers=2, chunk_size=16)) == serial
+        finally:
+            stop.set()
+            background.join()
@@ -0,0 +1,49 @@
+from ExporterTypes import TX_TYPE_SELF_TRANSFER, TX_TYPE_SPEND, TX_TYPE_STAKING, TX_TYPE_TRANSFER
+from portfolio import PortfolioIndex, self_transfer_fees
+
+
+def _row(tx_hash, sender, receiver, wallet, tx_type=TX_TYPE_TRANSFER, fee=0.001):
+    sent = sender == wallet
+    return {
+        "tx_hash": tx_hash, "sender": sender, "receiver": receiver, "tx_type": tx_type,
+        "sent_amount": 5.0 if sent else "", "received_amount": "" if sent else 5.0,
+        "fee": fee, "label": "sent" if sent else "received", "description": "", "raw_amount": 5000000,
+    }
+
+
+def test_internal_moves_are_marked_from_both_sides():
+    index = PortfolioIndex({"A", "B"})
+    rows_a = list(index.mark("A", [_row("T1", "A", "B", "A"), _row("T2", "A", "X", "A"),
+                                   _row("T3", "R", "A", "A", TX_TYPE_STAKING)]))
+    rows_b = list(index.mark("B", [_row("T1", "A", "B", "B"), _row("T4", "B", "A", "B")]))
+
+    assert [row["tx_type"] for row in rows_a] == [TX_TYPE_SELF_TRANSFER, TX_TYPE_TRANSFER, TX_TYPE_STAKING]
+    assert [row["tx_type"] for row in rows_b] == [TX_TYPE_SELF_TRANSFER, TX_TYPE_SELF_TRANSFER]
+    assert index.txids == {"T1": {"A", "B"}, "T4": {"B"}}
+    assert index.pairs == {("A", "B"): 1, ("B", "A"): 1}
+
+
+def test_tax_rows_keep_only_the_senders_fee():
+    index = PortfolioIndex({"A", "B"})
+    sent_side = list(self_transfer_fees(index.mark("A", [_row("T1", "A", "B", "A"), _row("T2", "A", "X", "A")])))
+    received_side = list(self_transfer_fees(index.mark("B", [_row("T1", "A", "B", "B")])))
+
+    assert received_side == []
+    fee_row, transfer = sent_side
+    assert fee_row["tx_type"] == TX_TYPE_SPEND and fee_row["label"] == "cost"
+    assert fee_row["sent_amount"] == "" and fee_row["fee"] == 0.001
+    assert transfer["tx_hash"] == "T2"
+
+
+def test_wallet_exports_share_the_runs_index():
+    from voi_exporter import portfolio_index
+
+    shared = PortfolioIndex({"A", "B"})
+    options = {"portfolio": ["A", "B"], "portfolio_index": shared}
+    assert portfolio_index("A", options) is shared and portfolio_index("B", options) is shared
+    list(shared.mark("A", [_row("T1", "A", "B", "A")]))
+    list(shared.mark("B", [_row("T1", "A", "B", "B")]))
+    assert shared.txids == {"T1": {"A", "B"}}
+    assert shared.summary() == "Found 1 self-transfers between 1 pairs of own wallets."
+    assert portfolio_index("A", {"portfolio": ["B"]}).wallets == {"A", "B"}
+    assert portfolio_index("A", {}) is None
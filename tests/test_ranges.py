@@ -0,0 +1,49 @@
+import voi_exporter
+from voi_exporter import build_query_params, filter_range, parse_date, range_bounds
+
+DAY = 86400
+
+
+class FixedRoundIndex:
+    """
+    Maps any dates to fixed rounds without the network.
+    """
+    def __init__(self, min_round, max_round):
+        self.bounds = (min_round, max_round)
+        self.calls = []
+
+    def round_bounds(self, start_ts, end_ts, block_time_lookup=None, latest_round=None):
+        self.calls.append((start_ts, end_ts))
+        return self.bounds
+
+
+def test_dates_and_rounds_become_indexer_params(monkeypatch):
+    options = {"start_date": "2024-01-01", "end_date": "2024-01-31"}
+    assert build_query_params(options) == {"after-time": "2024-01-01T00:00:00Z", "before-time": "2024-02-01T00:00:00Z"}
+    assert build_query_params({"min_round": 10, "max_round": 20}) == {"min-round": 10, "max-round": 20}
+
+    # Rounds mapped from the dates narrow explicit rounds, never widen them
+    monkeypatch.setattr(voi_exporter, "fetch_latest_round", lambda session: 10 ** 7)
+    round_index = FixedRoundIndex(100, 900)
+    params = build_query_params(dict(options, min_round=50, max_round=500), round_index)
+    assert (params["min-round"], params["max-round"]) == (100, 500)
+    assert round_index.calls == [(parse_date("2024-01-01"), parse_date("2024-02-01"))]
+
+
+def test_range_bounds_are_inclusive():
+    start = parse_date("2024-01-01")
+    assert range_bounds({"start_date": "2024-01-01", "end_date": "2024-01-01", "min_round": 5}) == (
+        start, start + DAY, 5, None)
+    assert range_bounds(None) == (None, None, None, None)
+
+    transactions = [
+        {"id": "before", "round-time": start - 1, "confirmed-round": 10},
+        {"id": "first", "round-time": start, "confirmed-round": 10},
+        {"id": "last", "round-time": start + DAY - 1, "confirmed-round": 20},
+        {"id": "next day", "round-time": start + DAY, "confirmed-round": 20},
+        {"id": "late round", "round-time": start + 5, "confirmed-round": 21},
+    ]
+    kept = filter_range(transactions, {"start_date": "2024-01-01", "end_date": "2024-01-01", "min_round": 10,
+                                       "max_round": 20})
+    assert [tx["id"] for tx in kept] == ["first", "last"]
+    assert filter_range(transactions, {}) is transactions
@@ -0,0 +1,51 @@
+from balances import BalanceEngine
+from reconcile import Reconciler, compare_balances, find_missing_window
+
+WALLET = "WALLET"
+
+
+def _history(count):
+    return [
+        {"id": f"T{i}", "confirmed-round": 10 * i, "round-time": 1000 + 30 * i, "sender": "OTHER",
+         "payment-transaction": {"amount": 1000 + i, "receiver": WALLET}}
+        for i in range(1, count + 1)
+    ]
+
+
+def test_compare_balances_reports_only_differences():
+    assert compare_balances({0: 5, 7: 1}, {0: 5, 7: 2, 9: 3}) == {7: (1, 2), 9: (0, 3)}
+
+
+def test_find_missing_window_narrows_to_first_divergence():
+    # Computed balances lose 1 from round 437 onwards
+    lo, hi = find_missing_window(lambda r: r - (r >= 437), lambda r: r, 0, 10000, min_window=8)
+    assert hi - lo <= 8 and lo < 437 <= hi
+
+
+def test_reconciler_refetches_only_missing_window():
+    history = _history(200)
+    truth = BalanceEngine(WALLET)
+    truth.add_transactions(history)
+    truth_series = truth.build()[0]
+
+    # Pagination gap: transactions in rounds 1200-1290 were never fetched
+    fetched = [tx for tx in history if not 1200 <= tx["confirmed-round"] <= 1290]
+    requested_ranges = []
+
+    def fetch_range(min_round, max_round):
+        requested_ranges.append((min_round, max_round))
+        return [tx for tx in history if min_round <= tx["confirmed-round"] <= max_round]
+
+    reconciler = Reconciler(
+        WALLET,
+        fetch_holdings=lambda: (2000, {0: truth_series.final()}),
+        fetch_balance_at_round=lambda asset_id, round_number: truth_series.at_round(round_number),
+        fetch_range=fetch_range,
+        min_window=100,
+    )
+    repaired, mismatches, windows = reconciler.run(fetched)
+
+    assert not mismatches
+    assert len(repaired) == len(history)
+    assert all(max_round - min_round < 100 for min_round, max_round in requested_ranges)
+    assert sum(found for _, _, found in windows) == 10
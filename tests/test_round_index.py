@@ -0,0 +1,70 @@
+from round_index import RoundIndex
+
+
+def _block_times(round_number):
+    # One block every 3 seconds starting at t=1000
+    return 1000 + 3 * round_number
+
+
+def test_round_bounds_with_block_lookup():
+    index = RoundIndex()
+    lookups = []
+
+    def lookup(round_number):
+        lookups.append(round_number)
+        return _block_times(round_number)
+
+    # [1030, 1060) covers rounds 10..19
+    assert index.round_bounds(1030, 1060, block_time_lookup=lookup, latest_round=1000) == (10, 19)
+
+    # Probed rounds are remembered, so the same query needs far fewer lookups
+    first_pass = len(lookups)
+    assert index.round_bounds(1030, 1060, block_time_lookup=lookup, latest_round=1000) == (10, 19)
+    assert len(lookups) - first_pass < first_pass
+
+
+def test_round_bounds_from_known_points_are_conservative():
+    index = RoundIndex()
+    index.add_transactions([
+        {"confirmed-round": 5, "round-time": _block_times(5)},
+        {"confirmed-round": 25, "round-time": _block_times(25)},
+    ])
+    assert index.round_bounds(1030, 1060) == (6, 24)
+    assert index.round_bounds(2000, None) == (26, None)
+
+
+def test_flush_and_load(tmp_path):
+    path = str(tmp_path / "index.json")
+    index = RoundIndex(path)
+    index.add(7, 1021)
+    index.add(3, 1009)
+    index.flush()
+
+    loaded = RoundIndex(path)
+    loaded.load()
+    assert loaded.rounds == [3, 7]
+    assert loaded.timestamps == [1009, 1021]
+
+
+def test_newest_first_pages_keep_a_sparse_index():
+    # Newest first, as the indexer pages them: one transaction a round over three days
+    index = RoundIndex()
+    index.add_transactions({"confirmed-round": r, "round-time": 3 * r} for r in range(3 * 28800 - 1, -1, -1))
+    assert index.rounds == [0, 28799, 28800, 57599, 57600, 86399]
+    # Day boundaries are still bracketed by adjacent rounds
+    assert index.round_bounds(86400, 2 * 86400) == (28800, 57599)
+
+
+def test_flush_failure_keeps_previous_file(tmp_path, monkeypatch):
+    path = tmp_path / "index.json"
+    path.write_text('{"points": [[3, 1009]]}')
+    index = RoundIndex(str(path))
+    index.add(7, 1021)
+
+    def fail(*args):
+        raise OSError("No space left on device")
+
+    monkeypatch.setattr("json.dump", fail)
+    index.flush()
+    assert path.read_text() == '{"points": [[3, 1009]]}'
+    assert [p.name for p in tmp_path.iterdir()] == ["index.json"]
@@ -0,0 +1,55 @@
+import pickle
+
+from ExporterTypes import TX_TYPE_STAKING, TX_TYPE_TRADE, TX_TYPE_TRANSFER
+from format_specs import FORMAT_COLUMNS
+from row_buffer import RowBuffer, exchange, received, sent
+from TxInfo import TxInfo
+
+
+def _txinfo(txid="T1"):
+    txinfo = TxInfo(txid, 1700000000, 0.001, "VOI", "W", "voi_blockchain", f"https://explorer/{txid}")
+    txinfo.comment = "note"
+    return txinfo
+
+
+def test_batch_matches_builder_values_without_mutating_txinfo():
+    txinfo = _txinfo()
+    buffer = RowBuffer(capacity=2)
+    buffer.add_events([
+        received(txinfo, TX_TYPE_TRANSFER, 5, "VOI", empty_fee=True),
+        sent(txinfo, TX_TYPE_TRANSFER, 2, "VOI", z_index=1),
+        exchange(txinfo, TX_TYPE_TRADE, 2, "VOI", 7, "VIA", txid="T1-swap", z_index=2),
+    ])
+    buffer.add_events(received(_txinfo(f"R{i}"), TX_TYPE_STAKING, i, "VOI") for i in range(5))
+
+    assert len(buffer) == 8
+    assert txinfo.fee == 0.001 and txinfo.fee_currency == "VOI"
+    rows = buffer.to_dicts()
+    assert rows[0]["fee"] == "" and rows[0]["fee_currency"] == "" and rows[0]["received_amount"] == 5
+    assert rows[1]["fee"] == 0.001 and rows[1]["sent_amount"] == 2 and rows[1]["z_index"] == 1
+    assert rows[2]["txid"] == "T1-swap" and rows[2]["received_currency"] == "VIA"
+    assert buffer.column("txid")[3:] == ["R0", "R1", "R2", "R3", "R4"]
+
+    buffer.clear()
+    assert len(buffer) == 0 and buffer.capacity == 8
+
+
+def test_buffer_rows_use_report_formats():
+    buffer = RowBuffer()
+    buffer.add_events([received(_txinfo(), TX_TYPE_STAKING, 5, "VOI")])
+    (row,) = buffer.format(FORMAT_COLUMNS["default"])
+    assert row == ["2023-11-14 22:13:20", TX_TYPE_STAKING, 5, "VOI", "", "", 0.001, "VOI", "note", "T1", "", "", ""]
+
+
+def test_row_dicts_round_trip_through_a_pickled_buffer():
+    rows = [{"timestamp": i, "tx_hash": f"T{i}", "label": "sent"} for i in range(3)]
+    buffer = RowBuffer(capacity=16, fields=["timestamp", "tx_hash", "label"])
+    buffer.add_rows(rows)
+
+    copy = pickle.loads(pickle.dumps(buffer))
+    assert copy.capacity == 3 and all(len(column) == 3 for column in copy.columns)
+    assert copy.to_dicts() == rows
+    copy.add_rows(rows)
+    assert copy.column("tx_hash") == ["T0", "T1", "T2"] * 2
+    (row, *_) = copy.format(FORMAT_COLUMNS["default"])
+    assert row[0] == "1970-01-01 00:00:00" and row[9] == "T0"
@@ -0,0 +1,50 @@
+import threading
+import time
+
+from service import STATUS_DONE, STATUS_QUEUED, STATUS_RUNNING, JobStore, SingleFlight
+
+
+def test_concurrent_calls_share_one_fetch():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        started.set()
+        release.wait()
+        return ["tx"]
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("W", fetch)))
+    leader.start()
+    started.wait()
+    followers = [threading.Thread(target=lambda: results.append(flight.do("W", fetch))) for _ in range(3)]
+    for thread in followers:
+        thread.start()
+    # Released only once every follower has joined the call in flight
+    deadline = time.monotonic() + 5
+    while flight.calls["W"]["waiters"] < len(followers):
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+    release.set()
+    for thread in [leader] + followers:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [["tx"]] * 4
+    # Finished calls are not cached
+    assert flight.do("W", lambda: ["new"]) == ["new"]
+
+
+def test_unfinished_jobs_are_pending_after_restart(tmp_path):
+    store = JobStore(str(tmp_path))
+    queued = store.create("W1", ["koinly"], {})
+    running = store.update(store.create("W2", ["koinly"], {}), status=STATUS_RUNNING)
+    store.update(store.create("W3", ["koinly"], {}), status=STATUS_DONE)
+
+    restarted = JobStore(str(tmp_path))
+    assert {job["id"] for job in restarted.pending()} == {queued["id"], running["id"]}
+    assert restarted.get(queued["id"])["status"] == STATUS_QUEUED
+    assert restarted.get("../etc") is None
@@ -0,0 +1,44 @@
+import pickle
+
+import pytest
+
+from price_store import PriceStore
+from shared_tables import AssetTable, PriceTable
+
+ASSETS = {"0": {"unit-name": "VOI", "decimals": 6}, "302190": {"unit-name": "aUSDC", "decimals": 6},
+          "7": {"unit-name": "ARC200-7", "decimals": 0}}
+
+
+def test_asset_table_reads_like_the_dict(tmp_path):
+    table = AssetTable.write(str(tmp_path / "assets"), ASSETS)
+    for asset_id, info in ASSETS.items():
+        assert table.get(asset_id) == info
+        assert table[int(asset_id)] == info
+    assert len(table) == 3
+    assert table.get("8") is None and "8" not in table
+    with pytest.raises(KeyError):
+        table["abc"]
+    # Memoized lookups stay local to the process
+    table["8"] = {"unit-name": "Asset-8", "decimals": 0}
+    assert table["8"]["unit-name"] == "Asset-8"
+
+    # Only the path is pickled; the copy maps the same file
+    data = pickle.dumps(table)
+    assert len(data) < 200
+    copy = pickle.loads(data)
+    assert copy.get("302190") == ASSETS["302190"] and "8" not in copy
+    copy.close()
+    table.close()
+
+
+def test_price_table_matches_price_store(tmp_path):
+    store = PriceStore()
+    store.add("VOI", [(100, 0.01), (200, 0.02), (300, 0.03)])
+    store.add("USDC", [(150, 1.0)])
+    table = PriceTable.write(str(tmp_path / "prices"), store)
+    for currency in ["VOI", "USDC", "GM"]:
+        assert (currency in table) == (currency in store)
+        for timestamp in [50, 100, 150, 199, 200, 250, 300, 1000]:
+            assert table.price_at(currency, timestamp) == store.price_at(currency, timestamp)
+            assert table.price_span(currency, timestamp) == store.price_span(currency, timestamp)
+    table.close()
@@ -0,0 +1,42 @@
+import os
+import subprocess
+import sys
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+# Modules a plain Koinly export must not load at startup
+HEAVY_MODULES = ["pandas", "numpy", "boto3", "botocore", "algosdk", "staketaxcsv"]
+
+# Cold-start budget for importing everything a plain export needs, in microseconds
+PLAIN_EXPORT_IMPORT_BUDGET_US = 500000
+
+
+def _import_times(statement):
+    """
+    Run `statement` in a fresh interpreter with -X importtime; return {module: cumulative_us}.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=SRC_DIR, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_report_util_startup_skips_exporter_and_heavy_modules():
+    times = _import_times("import report_util")
+    assert "report_util" in times
+    assert "voi_exporter" not in times
+    assert not [name for name in times if name.split(".")[0] in HEAVY_MODULES]
+
+
+def test_plain_export_cold_start_budget():
+    times = _import_times("import report_util, voi_exporter")
+    assert not [name for name in times if name.split(".")[0] in HEAVY_MODULES]
+    assert times["report_util"] + times["voi_exporter"] < PLAIN_EXPORT_IMPORT_BUDGET_US
@@ -0,0 +1,62 @@
+import csv
+import json
+
+import voi_exporter
+from ExporterTypes import TX_TYPE_STAKING, TX_TYPE_TRANSFER
+from summary import TaxSummary
+
+WALLET = "W" * 58
+REWARDS = "R" * 58
+OTHER = "O" * 58
+TOKENS = {"0": {"unit-name": "VOI", "decimals": 6}, "7": {"unit-name": "TKN", "decimals": 2}}
+# 2023-12-31 12:00 and 2024-06-01 00:00 UTC
+DEC_2023 = 1704024000
+JUN_2024 = 1717200000
+
+
+def _payment(txid, timestamp, sender, receiver, amount):
+    return {"id": txid, "round-time": timestamp, "confirmed-round": timestamp // 10, "fee": 1000, "sender": sender,
+            "payment-transaction": {"receiver": receiver, "amount": amount}}
+
+
+def test_summary_groups_by_year_asset_and_type():
+    summary = TaxSummary()
+    rows = [
+        {"timestamp": DEC_2023, "asset_id": "0", "currency": "VOI", "decimals": 6, "tx_type": TX_TYPE_STAKING,
+         "received_amount": 1.5, "sent_amount": "", "raw_amount": 1500000, "fee": 0.001},
+        {"timestamp": JUN_2024, "asset_id": "7", "currency": "TKN", "decimals": 2, "tx_type": TX_TYPE_TRANSFER,
+         "received_amount": "", "sent_amount": 0.25, "raw_amount": 25, "fee": 0.001},
+        {"timestamp": DEC_2023 + 60, "asset_id": "0", "currency": "VOI", "decimals": 6, "tx_type": TX_TYPE_STAKING,
+         "received_amount": 0.5, "sent_amount": "", "raw_amount": 500000, "fee": 0.001},
+    ]
+    assert list(summary.consume(rows)) == rows
+
+    assert summary.totals() == [
+        {"year": 2023, "asset_id": "0", "currency": "VOI", "tx_type": TX_TYPE_STAKING, "transactions": 2,
+         "received": 2.0, "sent": 0.0, "fees": 0.0},
+        {"year": 2024, "asset_id": "7", "currency": "TKN", "tx_type": TX_TYPE_TRANSFER, "transactions": 1,
+         "received": 0.0, "sent": 0.25, "fees": 0.001},
+    ]
+
+
+def test_export_writes_the_summary_in_the_same_pass(tmp_path):
+    transactions = [
+        _payment("T3", JUN_2024, WALLET, OTHER, 3000000),
+        _payment("T2", JUN_2024 - 60, REWARDS, WALLET, 1000000),
+        _payment("T1", DEC_2023, REWARDS, WALLET, 2000000),
+    ]
+    options = {"summary": True, "reward_senders": [REWARDS]}
+    paths = voi_exporter.export_rows("koinly", transactions, WALLET, TOKENS, str(tmp_path), None, options)
+
+    assert [path.rsplit("/", 1)[-1] for path in paths] == [
+        f"voi_{WALLET}_koinly.csv", f"voi_{WALLET}_koinly_summary.csv", f"voi_{WALLET}_koinly_summary.json"]
+    with open(paths[1], newline="") as f:
+        summary_rows = list(csv.reader(f))
+    assert summary_rows == [
+        ["Year", "Asset ID", "Currency", "Type", "Transactions", "Received", "Sent", "Fees (VOI)"],
+        ["2023", "0", "VOI", TX_TYPE_STAKING, "1", "2.0", "0.0", "0.0"],
+        ["2024", "0", "VOI", TX_TYPE_STAKING, "1", "1.0", "0.0", "0.0"],
+        ["2024", "0", "VOI", TX_TYPE_TRANSFER, "1", "0.0", "3.0", "0.001"],
+    ]
+    with open(paths[2]) as f:
+        assert [total["transactions"] for total in json.load(f)] == [1, 1, 1]
@@ -0,0 +1,53 @@
+from token_registry import KIND_ARC200, TokenRegistry, build_registry, load_arc200_list
+
+
+def _asset(asset_id, created_round):
+    return {
+        "index": asset_id,
+        "created-at-round": created_round,
+        "params": {"name": f"Token {asset_id}", "unit-name": f"T{asset_id}", "decimals": 6},
+    }
+
+
+class FakeAssetListing:
+    """
+    Stand-in for /v2/assets: ordered by id, `next` is the last id returned.
+    """
+    def __init__(self, assets, limit=2):
+        self.assets = assets
+        self.limit = limit
+        self.calls = []
+
+    def __call__(self, params):
+        self.calls.append(dict(params))
+        after = int(params.get("next", 0))
+        page = [asset for asset in self.assets if asset["index"] > after][:self.limit]
+        result = {"assets": page}
+        if page:
+            result["next-token"] = str(page[-1]["index"])
+        return result
+
+
+def test_build_then_incremental_refresh(tmp_path):
+    registry = TokenRegistry(str(tmp_path / "registry.sqlite"))
+    listing = FakeAssetListing([_asset(i, 100 + i) for i in (1, 5, 9)])
+    assert build_registry(registry, listing, refresh=False) == 3
+    assert registry.get(5) == {"name": "Token 5", "unit-name": "T5", "decimals": 6}
+    assert registry.get(6) is None
+
+    listing.assets.append(_asset(12, 120))
+    listing.calls.clear()
+    assert build_registry(registry, listing) == 1
+    assert listing.calls[0]["next"] == "9"
+    assert registry.get("12")["unit-name"] == "T12"
+    assert registry.get_meta("max_created_round") == "120"
+
+
+def test_arc200_contracts(tmp_path):
+    contracts = tmp_path / "arc200.json"
+    contracts.write_text('{"contracts": {"390001": {"name": "Wrapped Voi", "symbol": "wVOI", "decimals": 6}}}')
+    registry = TokenRegistry(str(tmp_path / "registry.sqlite"))
+    assert load_arc200_list(registry, str(contracts)) == 1
+    assert registry.get(390001)["unit-name"] == "wVOI"
+    kind = registry._connect().execute("SELECT kind FROM assets WHERE asset_id = 390001").fetchone()[0]
+    assert kind == KIND_ARC200
@@ -0,0 +1,39 @@
+import csv
+import gzip
+
+import pytest
+
+from writers import OUTPUT_CSV, OUTPUT_GZIP, OUTPUT_XLSX, open_writer, output_path, select_output
+
+HEADER = ["Date", "Received Amount", "TxHash"]
+ROWS = [["2024-03-01 12:00:00", "1.5", "T1"], ["2024-03-02 12:00:00", "", "T2"]]
+
+
+def test_output_paths_and_selection():
+    assert output_path("reports/voi_W_koinly.csv", OUTPUT_GZIP) == "reports/voi_W_koinly.csv.gz"
+    assert output_path("reports/voi_W_koinly.csv", OUTPUT_XLSX) == "reports/voi_W_koinly.xlsx"
+    outputs = {"*": OUTPUT_GZIP, "koinly": OUTPUT_XLSX}
+    assert select_output(outputs, "koinly") == OUTPUT_XLSX
+    assert select_output(outputs, "balances_calculated") == OUTPUT_GZIP
+    assert select_output(None, "koinly") == OUTPUT_CSV
+
+
+def test_gzip_output_matches_plain_csv(tmp_path):
+    paths = []
+    for output in (OUTPUT_CSV, OUTPUT_GZIP):
+        with open_writer(str(tmp_path / "report.csv"), output) as writer:
+            writer.writerow(HEADER)
+            writer.writerows(iter(ROWS))
+        paths.append(writer.path)
+
+    with open(paths[0], newline="") as plain, gzip.open(paths[1], "rt", newline="") as compressed:
+        assert list(csv.reader(compressed)) == list(csv.reader(plain)) == [HEADER] + ROWS
+
+
+def test_xlsx_output(tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    with open_writer(str(tmp_path / "report.csv"), OUTPUT_XLSX) as writer:
+        writer.writerow(HEADER)
+        writer.writerows(ROWS)
+    sheet = openpyxl.load_workbook(writer.path).active
+    assert [[cell or "" for cell in row] for row in sheet.iter_rows(values_only=True)] == [HEADER] + ROWS